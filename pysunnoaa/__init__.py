@@ -1,5 +1,39 @@
 """Top-level package for pysunNOAA."""
 
+import importlib
+
 __author__ = """Santosh Philip"""
 __email__ = "nemail@email.com"
 __version__ = "0.1.8"
+
+# imported on first use as pysunnoaa.<name>, so that importing the package
+# does not load numpy or the process pool
+_SUBMODULES = (
+    "aio",
+    "bench",
+    "cellgraph",
+    "cli",
+    "ephemeris",
+    "incidence",
+    "instrument",
+    "loadgen",
+    "lru",
+    "noaa",
+    "parallel",
+    "server",
+    "stepper",
+    "sunpath",
+    "suntable",
+    "suntimes",
+    "vnoaa",
+)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_SUBMODULES])
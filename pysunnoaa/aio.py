@@ -0,0 +1,147 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""Sun positions for asyncio programs
+
+A long computation in a coroutine blocks the event loop, and every other
+request waits for it. The functions here compute small requests (at most
+INLINE_MAX times) directly, which is faster than handing them to a thread,
+and run bigger ones in an executor (the default thread pool of the loop,
+or any executor, such as a ProcessPoolExecutor)::
+
+    from pysunnoaa import aio
+
+    positions = await aio.sunpositions_async(latitude, longitude, timezone, thedates)
+    async for altitude, azimuth in aio.asunpositions(
+        latitude, longitude, timezone, thedates
+    ):
+        ...
+
+Requests for the same site and times that arrive while one is being
+computed are coalesced: they wait for that computation and get its result,
+instead of computing it again."""
+
+import asyncio
+
+from pysunnoaa import noaa, parallel
+
+# requests with at most this many times are computed in the event loop
+INLINE_MAX = 256
+# number of times computed in each executor call of asunpositions
+CHUNKSIZE = 1 << 14
+
+# {(loop, key): future} of the computations in flight
+_inflight = {}
+
+
+def _key(latitude, longitude, timezone, thedates, atm_corr):
+    """return a hashable key for the request"""
+    if isinstance(thedates, noaa.DateTimeRange):
+        times = ("range", thedates.start, len(thedates), thedates.step)
+    else:
+        times = tuple(thedates)
+    return latitude, longitude, timezone, times, atm_corr
+
+
+async def coalesce(key, func, *args, executor=None):
+    """return func(*args) run in executor, shared by the callers with same key
+
+    A caller that is cancelled does not cancel the computation for the
+    others"""
+    loop = asyncio.get_running_loop()
+    inflight_key = (loop, key)
+    future = _inflight.get(inflight_key)
+    if future is None:
+        future = asyncio.ensure_future(loop.run_in_executor(executor, func, *args))
+        _inflight[inflight_key] = future
+        future.add_done_callback(lambda _: _inflight.pop(inflight_key, None))
+    return await asyncio.shield(future)
+
+
+async def sunposition_async(latitude, longitude, timezone, thedate, atm_corr=True):
+    """noaa.sunposition as a coroutine. It is fast enough to run inline"""
+    return noaa.sunposition(latitude, longitude, timezone, thedate, atm_corr)
+
+
+async def sunpositions_async(
+    latitude,
+    longitude,
+    timezone,
+    thedates,
+    atm_corr=True,
+    executor=None,
+    inline_max=INLINE_MAX,
+):
+    """return the list of (altitude, azimuth) for all the times in thedates
+
+    Up to inline_max times are computed in the event loop. More are
+    computed in executor (None is the default executor of the loop), and
+    the same request made while it runs shares the computation"""
+    if not isinstance(thedates, noaa.DateTimeRange):
+        thedates = list(thedates)
+    if len(thedates) <= inline_max:
+        return list(
+            noaa.sunpositions(latitude, longitude, timezone, thedates, atm_corr)
+        )
+    key = _key(latitude, longitude, timezone, thedates, atm_corr)
+    result = await coalesce(
+        key,
+        parallel._sunpositions_chunk,
+        latitude,
+        longitude,
+        timezone,
+        thedates,
+        atm_corr,
+        executor=executor,
+    )
+    return list(result)  # every caller gets its own list
+
+
+async def asunpositions(
+    latitude,
+    longitude,
+    timezone,
+    thedates,
+    atm_corr=True,
+    executor=None,
+    chunksize=CHUNKSIZE,
+    inline_max=INLINE_MAX,
+):
+    """yield (altitude, azimuth) for all the times in thedates, asynchronously
+
+    The times are computed chunksize at a time in executor. The next chunk
+    is computed while the current one is being used, and only one chunk
+    is kept ahead, so any length of time takes bounded memory. At most
+    inline_max times (with a known length) are computed in the event loop"""
+    if hasattr(thedates, "__len__") and len(thedates) <= inline_max:
+        for position in noaa.sunpositions(
+            latitude, longitude, timezone, thedates, atm_corr
+        ):
+            yield position
+        return
+    loop = asyncio.get_running_loop()
+    pending = None
+    try:
+        for chunk in parallel.chunks(thedates, chunksize):
+            previous, pending = pending, loop.run_in_executor(
+                executor,
+                parallel._sunpositions_chunk,
+                latitude,
+                longitude,
+                timezone,
+                chunk,
+                atm_corr,
+            )
+            if previous is not None:
+                for position in await previous:
+                    yield position
+        previous, pending = pending, None
+        if previous is not None:
+            for position in await previous:
+                yield position
+    finally:
+        if pending is not None:
+            pending.cancel()
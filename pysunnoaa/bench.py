@@ -0,0 +1,539 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""Benchmarks for pysunnoaa
+
+Run them with::
+
+    python -m pysunnoaa.bench
+    python -m pysunnoaa.bench --json results.json  # to compare releases
+    python -m pysunnoaa.bench --only sunposition sunrise_sunset_year
+
+Each benchmark in BENCHMARKS reports the operations per second (an
+operation is one sun position, one datetime, one sunrise ...), the
+percentiles of the time of one call and the peak memory of one call,
+measured with tracemalloc. The time to import the modules in
+IMPORT_MODULES in a new python is measured too, since short-lived
+command lines pay it on every run. Nothing is fetched from the network."""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pysunnoaa
+from pysunnoaa import noaa
+
+LATITUDE = 40
+LONGITUDE = -105
+TIMEZONE = -6
+THEDATE = datetime.datetime(2010, 6, 21, 9, 54)
+
+
+def random_sites(count, seed=0):
+    """return count (latitude, longitude, timezone) between 60S and 60N
+
+    Each site is in the whole hour timezone of its longitude"""
+    rng = random.Random(seed)
+    sites = []
+    for _ in range(count):
+        longitude = rng.uniform(-180, 180)
+        sites.append((rng.uniform(-60, 60), longitude, round(longitude / 15)))
+    return sites
+
+
+def bench_parallel(workers=(1, 2, 4, 8), days=30, minutes=1, chunksize=4096):
+    """return {workers: seconds} for parallel.sunpositions over days of times
+
+    The times are a list, so each chunk is computed with the scalar code"""
+    from pysunnoaa import parallel
+
+    start = datetime.datetime(2024, 1, 1)
+    thedates = list(
+        noaa.datetimerange(start, start + datetime.timedelta(days=days), minutes)
+    )
+    results = {}
+    for nworkers in workers:
+        tstart = time.perf_counter()
+        for _ in parallel.sunpositions(
+            LATITUDE,
+            LONGITUDE,
+            TIMEZONE,
+            thedates,
+            workers=nworkers,
+            chunksize=chunksize,
+        ):
+            pass
+        results[nworkers] = time.perf_counter() - tstart
+    return results
+
+
+def bench_sunpath(sites=10000, chunksize=500, year=2024):
+    """return the seconds to make the sun path diagrams of random sites
+
+    Each diagram is sunpath.sunpath: the 24 hourly analemmas of year and
+    the arcs of its 4 key dates every 10 minutes, cut at the horizon, in
+    float32. The sites are done chunksize at a time to bound the memory"""
+    from pysunnoaa import sunpath
+
+    latitudes, longitudes, timezones = zip(*random_sites(sites))
+    tstart = time.perf_counter()
+    for start in range(0, sites, chunksize):
+        stop = start + chunksize
+        sunpath.sunpath(
+            latitudes[start:stop],
+            longitudes[start:stop],
+            timezones[start:stop],
+            year,
+            dtype="float32",
+        )
+    seconds = time.perf_counter() - tstart
+    return {"sites": sites, "seconds": seconds, "sites_per_sec": sites / seconds}
+
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values, percent):
+    """return the nearest-rank percentile of the sorted list values"""
+    rank = max(1, -(-percent * len(values) // 100))
+    return values[rank - 1]
+
+
+def measure(func, ops=1, repeat=100, maxtime=2.0):
+    """time the calls of func() and return a dict of the results
+
+    func is called repeat times, or until maxtime seconds have passed
+    (at least 3 times). ops is the number of operations in one call.
+    The peak memory is of one more call, traced by tracemalloc"""
+    func()  # warm up
+    seconds = []
+    tstop = time.perf_counter() + maxtime
+    for _ in range(repeat):
+        tstart = time.perf_counter()
+        func()
+        tend = time.perf_counter()
+        seconds.append(tend - tstart)
+        if tend > tstop and len(seconds) >= 3:
+            break
+    seconds.sort()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result = {
+        "ops": ops,
+        "calls": len(seconds),
+        "ops_per_sec": ops / percentile(seconds, 50),
+        "min_s": seconds[0],
+    }
+    for percent in PERCENTILES:
+        result[f"p{percent}_s"] = percentile(seconds, percent)
+    result["max_s"] = seconds[-1]
+    result["peak_memory_bytes"] = peak
+    return result
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _consume(iterable):
+    for _ in iterable:
+        pass
+
+
+def _year_range(minutes):
+    start = datetime.datetime(2024, 1, 1)
+    return noaa.datetimerange(start, datetime.datetime(2025, 1, 1), minutes)
+
+
+def _day_range(minutes):
+    start = datetime.datetime(2024, 6, 21)
+    return noaa.datetimerange(start, datetime.datetime(2024, 6, 22), minutes)
+
+
+def _sunpositions(thedates):
+    return (
+        lambda: _consume(noaa.sunpositions(LATITUDE, LONGITUDE, TIMEZONE, thedates)),
+        len(thedates),
+    )
+
+
+def _daylightpositions(thedates):
+    return (
+        lambda: _consume(
+            noaa.daylightpositions(LATITUDE, LONGITUDE, TIMEZONE, thedates)
+        ),
+        len(thedates),
+    )
+
+
+def _stepper(thedates):
+    from pysunnoaa import stepper
+
+    return (
+        lambda: _consume(stepper.sunpositions(LATITUDE, LONGITUDE, TIMEZONE, thedates)),
+        len(thedates),
+    )
+
+
+def _sunrise_sunset_year():
+    thedates = _year_range(60 * 24)
+
+    def func():
+        for thedate in thedates:
+            noaa.sunrise(LATITUDE, LONGITUDE, TIMEZONE, thedate)
+            noaa.sunset(LATITUDE, LONGITUDE, TIMEZONE, thedate)
+
+    return func, len(thedates)
+
+
+def _sun_times_year():
+    thedates = _year_range(60 * 24)
+
+    def func():
+        for thedate in thedates:
+            noaa.sun_times(LATITUDE, LONGITUDE, TIMEZONE, thedate)
+
+    return func, len(thedates)
+
+
+# a grid of 10 x 10 sites across the United States
+GRID_SITES = [
+    (latitude, longitude, round(longitude / 15))
+    for latitude in range(25, 50, 25 // 10)
+    for longitude in range(-125, -65, 60 // 10)
+]
+
+
+def _grid_day():
+    """the sun positions of GRID_SITES every 10 minutes of a day
+
+    With numpy this is vnoaa.sunposition_grid, else noaa.sunpositions for
+    each site"""
+    thedates = _day_range(10)
+    ops = len(GRID_SITES) * len(thedates)
+    if _numpy() is None:
+
+        def func():
+            for latitude, longitude, timezone in GRID_SITES:
+                _consume(noaa.sunpositions(latitude, longitude, timezone, thedates))
+
+        return func, ops
+    from pysunnoaa import vnoaa
+
+    latitudes, longitudes, timezones = zip(*GRID_SITES)
+    times = thedates.to_numpy()
+    return (
+        lambda: vnoaa.sunposition_grid(latitudes, longitudes, timezones, times),
+        ops,
+    )
+
+
+def _sunvectors(thedates):
+    """the sun unit vectors of thedates
+
+    With numpy this is vnoaa.sunvector_array, else noaa.sunvector for each
+    time"""
+    if _numpy() is None:
+        return (
+            lambda: [
+                noaa.sunvector(LATITUDE, LONGITUDE, TIMEZONE, thedate)
+                for thedate in thedates
+            ],
+            len(thedates),
+        )
+    from pysunnoaa import vnoaa
+
+    return (
+        lambda: vnoaa.sunvector_array(LATITUDE, LONGITUDE, TIMEZONE, thedates),
+        len(thedates),
+    )
+
+
+# 360 surfaces: tilts 0 to 90 by 10 degrees, facing every 10 degrees
+SURFACES = [
+    (tilt, azimuth) for tilt in range(0, 91, 10) for azimuth in range(0, 360, 10)
+]
+
+
+def _incidence_year():
+    """the cosines of incidence on SURFACES every hour of a year
+
+    With numpy this is incidence.cos_incidence_site, else the cosine
+    computed from the sun positions for each surface"""
+    thedates = _year_range(60)
+    ops = len(SURFACES) * len(thedates)
+    if _numpy() is None:
+
+        def func():
+            positions = [
+                (math.radians(90 - altitude), math.radians(azimuth))
+                for altitude, azimuth in noaa.sunpositions(
+                    LATITUDE, LONGITUDE, TIMEZONE, thedates
+                )
+            ]
+            for tilt, azimuth in SURFACES:
+                tilt = math.radians(tilt)
+                azimuth = math.radians(azimuth)
+                [
+                    math.cos(zenith) * math.cos(tilt)
+                    + math.sin(zenith) * math.sin(tilt) * math.cos(sunazm - azimuth)
+                    for zenith, sunazm in positions
+                ]
+
+        return func, ops
+    from pysunnoaa import incidence
+
+    tilts, azimuths = zip(*SURFACES)
+    return (
+        lambda: incidence.cos_incidence_site(
+            LATITUDE, LONGITUDE, TIMEZONE, thedates, tilts, azimuths
+        ),
+        ops,
+    )
+
+
+def _sunpath_sites(count):
+    """the sun path diagrams of count random_sites
+
+    With numpy this is sunpath.sunpath, else noaa.sunposition at the same
+    times for each site. An operation is one position"""
+    sites = random_sites(count)
+    hours = [datetime.timedelta(hours=hour) for hour in range(24)]
+    days = [
+        datetime.datetime(2024, 1, 1) + datetime.timedelta(days=d) for d in range(366)
+    ]
+    arcs = [
+        datetime.datetime(2024, month, day) + datetime.timedelta(minutes=10 * i)
+        for month, day in ((3, 20), (6, 21), (9, 22), (12, 21))
+        for i in range(145)
+    ]
+    thedates = [day + hour for hour in hours for day in days] + arcs
+    ops = count * len(thedates)
+    if _numpy() is None:
+
+        def func():
+            for latitude, longitude, timezone in sites:
+                _consume(noaa.sunpositions(latitude, longitude, timezone, thedates))
+
+        return func, ops
+    from pysunnoaa import sunpath
+
+    latitudes, longitudes, timezones = zip(*sites)
+    return (
+        lambda: sunpath.sunpath(
+            latitudes, longitudes, timezones, 2024, dtype="float32"
+        ),
+        ops,
+    )
+
+
+# name: function returning (func, operations per call of func)
+BENCHMARKS = {
+    "sunposition": lambda: (
+        lambda: noaa.sunposition(LATITUDE, LONGITUDE, TIMEZONE, THEDATE),
+        1,
+    ),
+    "sunposition_cells": lambda: (
+        lambda: noaa.sunposition_cells(LATITUDE, LONGITUDE, TIMEZONE, THEDATE),
+        1,
+    ),
+    "sunpositions_day_1min": lambda: _sunpositions(list(_day_range(1))),
+    "sunpositions_day_1h": lambda: _sunpositions(list(_day_range(60))),
+    "sunpositions_year_1h": lambda: _sunpositions(list(_year_range(60))),
+    "sunpositions_year_1min": lambda: _sunpositions(list(_year_range(1))),
+    "sunpositions_range_year_1min": lambda: _sunpositions(_year_range(1)),
+    "daylightpositions_year_1h": lambda: _daylightpositions(list(_year_range(60))),
+    "daylightpositions_range_year_1min": lambda: _daylightpositions(_year_range(1)),
+    "stepper_day_1s": lambda: _stepper(
+        noaa.datetimerange(
+            datetime.datetime(2024, 6, 21),
+            datetime.datetime(2024, 6, 22),
+            minutes=0,
+            seconds=1,
+        )
+    ),
+    "datetimerange_year_1min": lambda: (
+        lambda: _consume(_year_range(1)),
+        len(_year_range(1)),
+    ),
+    "sunrise_sunset_year": _sunrise_sunset_year,
+    "sun_times_year": _sun_times_year,
+    "grid_100_sites_day_10min": _grid_day,
+    "sunvectors_range_year_1min": lambda: _sunvectors(_year_range(1)),
+    "incidence_360_surfaces_year_1h": _incidence_year,
+    "sunpath_100_sites": lambda: _sunpath_sites(100),
+}
+
+
+IMPORT_MODULES = ("pysunnoaa.noaa", "pysunnoaa.cli", "pysunnoaa.vnoaa")
+
+
+def import_time(module, repeat=5):
+    """return the best time in seconds to import module in a new python
+
+    It is the cumulative time that ``python -X importtime`` reports for
+    the module, so the start of python itself is not counted. The first
+    run is not counted, it may have to write the bytecode"""
+    packagedir = os.path.dirname(os.path.dirname(os.path.abspath(pysunnoaa.__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [packagedir, env.get("PYTHONPATH")])
+    )
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    microseconds = []
+    for _ in range(repeat + 1):
+        completed = subprocess.run(
+            command, capture_output=True, text=True, check=True, env=env
+        )
+        for line in completed.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                microseconds.append(int(fields[1]))
+    return min(microseconds[1:]) / 1e6
+
+
+def run(names=None, repeat=100, maxtime=2.0, imports=IMPORT_MODULES):
+    """run the benchmarks and return the results as a dict for json
+
+    names are the keys of BENCHMARKS to run, all of them by default.
+    imports are the modules to time the import of"""
+    if names is None:
+        names = list(BENCHMARKS)
+    numpy = _numpy()
+    if numpy is None:
+        imports = [module for module in imports if module != "pysunnoaa.vnoaa"]
+    results = {
+        "pysunnoaa": pysunnoaa.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "numpy": None if numpy is None else numpy.__version__,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "import_seconds": {module: import_time(module) for module in imports},
+        "benchmarks": {},
+    }
+    for name in names:
+        func, ops = BENCHMARKS[name]()
+        results["benchmarks"][name] = measure(func, ops, repeat, maxtime)
+    return results
+
+
+def _seconds(value):
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if value >= 1 / scale:
+            return f"{value * scale:7.2f} {unit:<2}"
+    return f"{value * 1e9:7.0f} ns"
+
+
+def format_results(results):
+    """return the results of run as a text table"""
+    lines = [
+        f"pysunnoaa {results['pysunnoaa']}, {results['implementation']}"
+        f" {results['python']}, numpy {results['numpy']}",
+        f"{'benchmark':<30} {'ops/sec':>12} {'p50':>10} {'p90':>10} {'p99':>10}"
+        f" {'peak mem':>10}",
+    ]
+    for name, result in results["benchmarks"].items():
+        lines.append(
+            f"{name:<30} {result['ops_per_sec']:12.0f}"
+            f" {_seconds(result['p50_s'])} {_seconds(result['p90_s'])}"
+            f" {_seconds(result['p99_s'])}"
+            f" {result['peak_memory_bytes'] / 1024:7.0f} kB"
+        )
+    for module, seconds in results["import_seconds"].items():
+        lines.append(f"{'import ' + module:<30} {_seconds(seconds)}")
+    return "\n".join(lines)
+
+
+def build_parser():
+    """return the argparse parser for python -m pysunnoaa.bench"""
+    parser = argparse.ArgumentParser(
+        prog="python -m pysunnoaa.bench", description="Benchmarks for pysunnoaa"
+    )
+    parser.add_argument(
+        "--only", nargs="+", choices=list(BENCHMARKS), help="run only these"
+    )
+    parser.add_argument("--json", help="also write the results to this json file")
+    parser.add_argument(
+        "--repeat", type=int, default=100, help="most calls per benchmark"
+    )
+    parser.add_argument(
+        "--maxtime",
+        type=float,
+        default=2.0,
+        help="seconds after which a benchmark stops repeating (default 2)",
+    )
+    parser.add_argument(
+        "--no-imports",
+        dest="imports",
+        action="store_const",
+        const=(),
+        default=IMPORT_MODULES,
+        help="do not time the imports",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="also time parallel.sunpositions with 1, 2, 4 and 8 workers",
+    )
+    parser.add_argument(
+        "--sunpath",
+        type=int,
+        nargs="?",
+        const=10000,
+        metavar="SITES",
+        help="also time the sun path diagrams of SITES sites (default 10000)",
+    )
+    return parser
+
+
+def main(argv=None):
+    """print the benchmark results"""
+    args = build_parser().parse_args(argv)
+    results = run(args.only, args.repeat, args.maxtime, args.imports)
+    benchmarks = results["benchmarks"]
+    print(format_results(results))
+    if "sunposition" in benchmarks and "sunposition_cells" in benchmarks:
+        speedup = (
+            benchmarks["sunposition"]["ops_per_sec"]
+            / benchmarks["sunposition_cells"]["ops_per_sec"]
+        )
+        print(f"fused speedup {speedup:.2f}x")
+    if args.parallel:
+        results["parallel_seconds"] = bench_parallel()
+        for nworkers, seconds in results["parallel_seconds"].items():
+            speedup = results["parallel_seconds"][1] / seconds
+            print(f"parallel workers={nworkers:<3} {seconds:8.3f} s  {speedup:5.2f}x")
+    if args.sunpath:
+        results["sunpath"] = bench_sunpath(args.sunpath)
+        print(
+            f"sunpath {args.sunpath} sites {results['sunpath']['seconds']:8.3f} s"
+            f"  {results['sunpath']['sites_per_sec']:.0f} sites/s"
+        )
+    if args.json:
+        with open(args.json, "w") as jsonfile:
+            json.dump(results, jsonfile, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # pragma: no cover
@@ -0,0 +1,225 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""The dependency graph of the cells in the NOAA spreadsheet
+
+CELLS lists every cell function of noaa.py with its spreadsheet column and
+the names of its arguments, in the order of the arguments. An argument is
+either another cell or one of the INPUTS. evaluate computes only the
+cells needed for the requested outputs, each of them once::
+
+    from pysunnoaa import cellgraph
+
+    values = cellgraph.evaluate(
+        ["sunrise_time_lst", "sunlight_duration_minutes"],
+        latitude=40, longitude=-105, timezone=-6,
+        thedate=datetime.datetime(2010, 6, 21),
+    )
+
+With ``vectorized=True`` the cells of vnoaa are used, and thedate can be
+an array of times."""
+
+from pysunnoaa import noaa
+
+INPUTS = ("latitude", "longitude", "timezone", "thedate")
+
+CELLS = {
+    "julianday": ("f2", ("thedate", "timezone")),
+    "juliancentury": ("g2", ("julianday",)),
+    "geom_mean_long_sun_deg": ("i2", ("juliancentury",)),
+    "geom_mean_anom_sun_deg": ("j2", ("juliancentury",)),
+    "eccent_earth_orbit": ("k2", ("juliancentury",)),
+    "sun_eq_of_ctr": ("l2", ("juliancentury", "geom_mean_anom_sun_deg")),
+    "sun_true_long_deg": ("m2", ("geom_mean_long_sun_deg", "sun_eq_of_ctr")),
+    "sun_true_anom_deg": ("n2", ("geom_mean_anom_sun_deg", "sun_eq_of_ctr")),
+    "sun_rad_vector_AUs": ("o2", ("eccent_earth_orbit", "sun_true_anom_deg")),
+    "sun_app_long_deg": ("p2", ("juliancentury", "sun_true_long_deg")),
+    "mean_obliq_ecliptic_deg": ("q2", ("juliancentury",)),
+    "obliq_corr_deg": ("r2", ("juliancentury", "mean_obliq_ecliptic_deg")),
+    "sun_rt_ascen_deg": ("s2", ("sun_app_long_deg", "obliq_corr_deg")),
+    "sun_declin_deg": ("t2", ("sun_app_long_deg", "obliq_corr_deg")),
+    "var_y": ("u2", ("obliq_corr_deg",)),
+    "eq_of_time_minutes": (
+        "v2",
+        (
+            "geom_mean_long_sun_deg",
+            "geom_mean_anom_sun_deg",
+            "eccent_earth_orbit",
+            "var_y",
+        ),
+    ),
+    "ha_sunrise_deg": ("w2", ("latitude", "sun_declin_deg")),
+    "solar_noon_lst": ("x2", ("longitude", "timezone", "eq_of_time_minutes")),
+    "sunrise_time_lst": ("y2", ("ha_sunrise_deg", "solar_noon_lst")),
+    "sunset_time_lst": ("z2", ("ha_sunrise_deg", "solar_noon_lst")),
+    "sunlight_duration_minutes": ("aa2", ("ha_sunrise_deg",)),
+    "true_solar_time_min": (
+        "ab2",
+        ("thedate", "eq_of_time_minutes", "longitude", "timezone"),
+    ),
+    "hour_angle_deg": ("ac2", ("true_solar_time_min",)),
+    "solar_zenith_angle_deg": (
+        "ad2",
+        ("latitude", "sun_declin_deg", "hour_angle_deg"),
+    ),
+    "solar_elevation_angle_deg": ("ae2", ("solar_zenith_angle_deg",)),
+    "approx_atmospheric_refraction_deg": ("af2", ("solar_elevation_angle_deg",)),
+    "solar_elevation_corrected_for_atm_refraction_deg": (
+        "ag2",
+        ("solar_elevation_angle_deg", "approx_atmospheric_refraction_deg"),
+    ),
+    "solar_azimuth_angle_deg_cw_from_n": (
+        "ah2",
+        (
+            "latitude",
+            "hour_angle_deg",
+            "solar_zenith_angle_deg",
+            "sun_declin_deg",
+        ),
+    ),
+}
+
+# spreadsheet column -> cell name, so that "t2" can be asked for
+COLUMNS = {column: name for name, (column, _) in CELLS.items()}
+
+
+def cellname(name):
+    """return the cell name for a cell name or a spreadsheet column"""
+    if name in CELLS:
+        return name
+    try:
+        return COLUMNS[name]
+    except KeyError:
+        raise KeyError(f"{name!r} is not a cell name or a column") from None
+
+
+def dependencies(outputs):
+    """return the cells needed for outputs, each one after its arguments
+
+    outputs is a cell name or a list of cell names (or columns)"""
+    if isinstance(outputs, str):
+        outputs = [outputs]
+    ordered = []
+    seen = set()
+
+    def visit(name):
+        if name in seen or name in INPUTS:
+            return
+        seen.add(name)
+        for argname in CELLS[name][1]:
+            visit(argname)
+        ordered.append(name)
+
+    for output in outputs:
+        visit(cellname(output))
+    return ordered
+
+
+def inputs_needed(outputs):
+    """return the set of INPUTS needed to compute outputs"""
+    return {
+        argname
+        for name in dependencies(outputs)
+        for argname in CELLS[name][1]
+        if argname in INPUTS
+    }
+
+
+def evaluate(
+    outputs,
+    latitude=None,
+    longitude=None,
+    timezone=0,
+    thedate=None,
+    vectorized=False,
+):
+    """return {cell name: value} for the requested outputs
+
+    Only the cells that outputs depend on are computed, each one once. The
+    result also holds those intermediate cells. With vectorized=True the
+    cells of vnoaa are used and thedate can be an array of times"""
+    ordered = dependencies(outputs)
+    values = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "timezone": timezone,
+        "thedate": thedate,
+    }
+    missing = sorted(name for name in inputs_needed(outputs) if values[name] is None)
+    if missing:
+        raise ValueError(f"{', '.join(missing)} needed for {outputs!r}")
+    if vectorized:
+        from pysunnoaa import vnoaa as backend
+
+        if thedate is not None:
+            # convert the times once rather than in every cell that uses them
+            values["thedate"] = backend.epochseconds(thedate)
+    else:
+        backend = noaa
+    for name in ordered:
+        func = getattr(backend, name)
+        values[name] = func(*[values[argname] for argname in CELLS[name][1]])
+    return {name: values[name] for name in ordered}
+
+
+class SunRow:
+    """all the cells of one row of the spreadsheet, as attributes
+
+    row() makes these. __slots__ keeps them small"""
+
+    __slots__ = INPUTS + tuple(CELLS)
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def asdict(self):
+        """return {name: value} for the inputs and all the cells"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if not isinstance(other, SunRow):
+            return NotImplemented
+        return self.asdict() == other.asdict()
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"SunRow({values})"
+
+
+def row(latitude, longitude, timezone, thedate):
+    """return a SunRow with every cell for one site and time"""
+    values = evaluate(list(CELLS), latitude, longitude, timezone, thedate)
+    return SunRow(
+        latitude=latitude,
+        longitude=longitude,
+        timezone=timezone,
+        thedate=thedate,
+        **values,
+    )
+
+
+def rows(latitude, longitude, timezone, thedates, structured=False):
+    """return every cell for all the times in thedates
+
+    By default the result is {cell name: array}, one contiguous float array
+    per cell. With structured=True it is a numpy structured array with one
+    float64 field per cell, in spreadsheet order"""
+    import numpy as np
+
+    with np.errstate(invalid="ignore"):
+        # ha_sunrise_deg is nan when the sun does not rise or set that day
+        values = evaluate(
+            list(CELLS), latitude, longitude, timezone, thedates, vectorized=True
+        )
+    if not structured:
+        return {
+            name: np.ascontiguousarray(values[name], dtype=np.float64) for name in CELLS
+        }
+    result = np.empty(len(values["julianday"]), dtype=[(name, "f8") for name in CELLS])
+    for name in CELLS:
+        result[name] = values[name]
+    return result
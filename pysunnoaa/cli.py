@@ -1,19 +1,305 @@
-"""Console script for pysunnoaa."""
+"""Console script for pysunnoaa.
+
+Examples::
+
+    pysunnoaa positions --lat 40 --lon -105 --tz -6 \\
+        --start 2024-06-21 --stop 2024-06-22 --step 10 --format csv
+
+    pysunnoaa batch --sites sites.csv --jobs 8 \\
+        --start 2024-01-01 --stop 2025-01-01 --step 1h --output-dir out"""
 
 import argparse
+import datetime
+import os
 import sys
 
+from pysunnoaa import noaa
 
-def main():
-    """Console script for pysunnoaa."""
-    parser = argparse.ArgumentParser()
-    parser.add_argument("_", nargs="*")
-    args = parser.parse_args()
+FORMATS = ("csv", "tsv", "jsonl")
+# number of rows joined into one write
+BUFFER_ROWS = 4096
+# number of rows of a site in one task of the combined batch output
+BATCH_ROWS = 65536
+
+_STEP_UNITS = {"s": "seconds", "m": "minutes", "h": "hours"}
+
+
+def parse_step(text):
+    """return the timedelta for a step like "10", "30s", "5m" or "1h"
+
+    A number without a unit is in minutes"""
+    unit = "minutes"
+    if text and text[-1] in _STEP_UNITS:
+        unit = _STEP_UNITS[text[-1]]
+        text = text[:-1]
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid step: {text!r}") from None
+    step = datetime.timedelta(**{unit: value})
+    if step <= datetime.timedelta(0):
+        raise argparse.ArgumentTypeError("step must be positive")
+    return step
+
+
+def parse_latitude(text):
+    """return the latitude for text, a number from -90 to 90"""
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid latitude: {text!r}") from None
+    if not -90 <= value <= 90:
+        raise argparse.ArgumentTypeError(
+            f"latitude must be from -90 to 90, not {text!r}"
+        )
+    return value
+
+
+def parse_datetime(text):
+    """return the datetime for an ISO format date or date and time"""
+    try:
+        return datetime.datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {text!r}") from None
+
+
+def _quotefield(text, sep):
+    """return text quoted for a csv (or tsv) field, as the csv module does
+
+    Only a field with sep, a quote or a line break needs the quotes"""
+    if any(char in text for char in (sep, '"', "\n", "\r")):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def formatrows(thedates, positions, fmt, header=True, siteid=None):
+    """yield the lines of output for the datetimes and their positions
+
+    With a siteid, every line starts with an id column"""
+    if fmt == "jsonl":
+        start = "{"
+        if siteid is not None:
+            import json  # only the ids need escaping
+
+            start = f'{{"id": {json.dumps(siteid)}, '
+        for thedate, (altitude, azimuth) in zip(thedates, positions):
+            yield (
+                f'{start}"datetime": "{thedate.isoformat()}", '
+                f'"altitude": {altitude!r}, "azimuth": {azimuth!r}}}\n'
+            )
+        return
+    sep = "," if fmt == "csv" else "\t"
+    start = "" if siteid is None else f"{_quotefield(siteid, sep)}{sep}"
+    if header:
+        idheader = "" if siteid is None else f"id{sep}"
+        yield f"{idheader}datetime{sep}altitude{sep}azimuth\n"
+    for thedate, (altitude, azimuth) in zip(thedates, positions):
+        yield f"{start}{thedate.isoformat()}{sep}{altitude!r}{sep}{azimuth!r}\n"
+
+
+def writelines(lines, out, buffer_rows=BUFFER_ROWS):
+    """write the lines to out, buffer_rows lines at a time"""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= buffer_rows:
+            out.write("".join(buffer))
+            buffer.clear()
+    if buffer:
+        out.write("".join(buffer))
+
+
+def positions(args, out):
+    """the positions command"""
+    thedates = noaa.DateTimeRange(args.start, args.stop, args.step)
+    sunpositions = noaa.sunpositions(
+        args.lat, args.lon, args.tz, thedates, atm_corr=args.atm_corr
+    )
+    writelines(formatrows(thedates, sunpositions, args.format), out)
+    return 0
+
+
+def _isnumber(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def readsites(path):
+    """return a list of (id, latitude, longitude, timezone) from a csv file
+
+    The columns are id, lat, lon, tz. A first row of four fields whose
+    lat, lon and tz are not numbers is taken to be a header and skipped.
+    The ids must be unique"""
+    import csv  # only the batch command needs it
+
+    sites = []
+    siteids = set()
+    with open(path, newline="") as sitefile:
+        for rownumber, row in enumerate(csv.reader(sitefile), start=1):
+            if not row or row[0].startswith("#"):
+                continue
+            fields = [field.strip() for field in row]
+            if rownumber == 1 and len(fields) == 4:
+                if not any(_isnumber(field) for field in fields[1:]):
+                    continue  # the header
+            try:
+                siteid, latitude, longitude, timezone = fields
+                site = (siteid, float(latitude), float(longitude), float(timezone))
+            except ValueError:
+                raise ValueError(
+                    f"{path} row {rownumber}: expected id, lat, lon, tz, got {row}"
+                ) from None
+            if not -90 <= site[1] <= 90:
+                raise ValueError(
+                    f"{path} row {rownumber}: lat must be from -90 to 90, got {row}"
+                )
+            if siteid in siteids:
+                raise ValueError(f"{path} row {rownumber}: duplicate id {siteid!r}")
+            siteids.add(siteid)
+            sites.append(site)
+    return sites
+
+
+def _checkfilename(siteid):
+    """raise ValueError if siteid cannot name a file in the output directory"""
+    separators = ["/", "\\", "\0", os.sep] + ([os.altsep] if os.altsep else [])
+    if not siteid or any(sep in siteid for sep in separators):
+        raise ValueError(f"id {siteid!r} cannot be used as a file name")
+
+
+def _batch_site(site, thedates, atm_corr, fmt, output_dir):
+    """compute one site of the batch command, or some of its times
+
+    Write the site's file in output_dir and return "", or return the lines
+    for the combined output when there is no output_dir"""
+    siteid, latitude, longitude, timezone = site
+    sunpositions = noaa.sunpositions(
+        latitude, longitude, timezone, thedates, atm_corr=atm_corr
+    )
+    if output_dir is None:
+        return "".join(formatrows(thedates, sunpositions, fmt, False, siteid))
+    path = os.path.join(output_dir, f"{siteid}.{fmt}")
+    with open(path, "w") as out:
+        writelines(formatrows(thedates, sunpositions, fmt), out)
+    return ""
 
-    print("Arguments: " + str(args._))
-    print("Replace this message by putting your code into " "pysunnoaa.cli.main")
+
+def batch(args, out):
+    """the batch command"""
+    sites = readsites(args.sites)
+    thedates = noaa.DateTimeRange(args.start, args.stop, args.step)
+    siteargs = (args.atm_corr, args.format)
+    if args.output_dir is not None:
+        for siteid, *_ in sites:
+            _checkfilename(siteid)
+        os.makedirs(args.output_dir, exist_ok=True)
+        argtuples = ((site, thedates, *siteargs, args.output_dir) for site in sites)
+    else:
+        if args.format != "jsonl":
+            sep = "," if args.format == "csv" else "\t"
+            out.write(sep.join(["id", "datetime", "altitude", "azimuth"]) + "\n")
+        # a long range of times is done (and sent back from the processes)
+        # in parts, so the output of a site is never one string
+        argtuples = (
+            (site, thedates[start : start + BATCH_ROWS], *siteargs, None)
+            for site in sites
+            for start in range(0, len(thedates), BATCH_ROWS)
+        )
+    if args.jobs > 1:
+        from pysunnoaa import parallel
+
+        results = parallel.ordered_map(_batch_site, argtuples, workers=args.jobs)
+    else:
+        results = (_batch_site(*argtuple) for argtuple in argtuples)
+    for text in results:
+        out.write(text)
     return 0
 
 
+def _add_time_arguments(parser):
+    parser.add_argument(
+        "--start", type=parse_datetime, required=True, help="first local time"
+    )
+    parser.add_argument(
+        "--stop", type=parse_datetime, required=True, help="end (not included)"
+    )
+    parser.add_argument(
+        "--step",
+        type=parse_step,
+        default=datetime.timedelta(minutes=1),
+        help="step in minutes, or with a unit: 30s, 5m, 1h (default 1)",
+    )
+    parser.add_argument(
+        "--no-atm-corr",
+        dest="atm_corr",
+        action="store_false",
+        help="do not correct the altitude for atmospheric refraction",
+    )
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+
+
+def build_parser():
+    """return the argparse parser for the console script"""
+    parser = argparse.ArgumentParser(
+        prog="pysunnoaa", description="Sun positions from the NOAA calculations"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    positions_parser = subparsers.add_parser(
+        "positions", help="sun positions for one site over a range of times"
+    )
+    positions_parser.add_argument(
+        "--lat", type=parse_latitude, required=True, help="latitude (+ to N)"
+    )
+    positions_parser.add_argument(
+        "--lon", type=float, required=True, help="longitude (+ to E)"
+    )
+    positions_parser.add_argument(
+        "--tz", type=float, required=True, help="time zone (+ to E)"
+    )
+    _add_time_arguments(positions_parser)
+    positions_parser.set_defaults(func=positions)
+
+    batch_parser = subparsers.add_parser(
+        "batch", help="sun positions for every site in a csv file"
+    )
+    batch_parser.add_argument(
+        "--sites", required=True, help="csv file with the columns id, lat, lon, tz"
+    )
+    _add_time_arguments(batch_parser)
+    batch_parser.add_argument(
+        "--jobs", type=int, default=1, help="number of processes (default 1)"
+    )
+    batch_parser.add_argument(
+        "--output-dir",
+        help="write one file per site, named <id>.<format>, in this directory"
+        " (the ids must not contain path separators)."
+        " Without it all the sites go to stdout with an id column",
+    )
+    batch_parser.set_defaults(func=batch)
+    return parser
+
+
+def main(argv=None, out=None):
+    """Console script for pysunnoaa."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if (args.start.tzinfo is None) != (args.stop.tzinfo is None):
+        parser.error("--start and --stop must both have a UTC offset, or neither")
+    if out is None:
+        out = sys.stdout
+    try:
+        return args.func(args, out)
+    except BrokenPipeError:
+        # the reader went away, as with `pysunnoaa positions ... | head`
+        return 0
+    except (ValueError, OSError) as error:
+        # a bad sites file or id, or one that cannot be read or written
+        parser.error(str(error))
+
+
 if __name__ == "__main__":
     sys.exit(main())  # pragma: no cover
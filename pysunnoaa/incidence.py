@@ -0,0 +1,84 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""Angles of incidence of the sun on tilted surfaces (needs NumPy)
+
+A surface is given by its tilt from the horizontal (0 is flat, 90 is a
+wall) and the azimuth it faces, in degrees clockwise from north (180
+faces south). The cosine of the angle of incidence is the dot product of
+the unit normal of the surface with the unit vector to the sun
+(vnoaa.sunvector_array), so the cosines of all the surfaces at all the
+times are one matrix product::
+
+    from pysunnoaa import incidence
+
+    cosines = incidence.cos_incidence_site(
+        latitude, longitude, timezone, thedates, tilts, azimuths
+    )  # shape (surfaces, times)
+
+A negative cosine means that the sun is behind the surface. The cosine
+does not say whether the sun is above the horizon; the up component of
+the sun vectors (the last column) is negative when it is not."""
+
+import numpy as np
+
+from pysunnoaa import vnoaa
+
+
+def surface_normals(tilts, azimuths, dtype=np.float64):
+    """return the (surfaces, 3) unit normals (east, north, up) of surfaces
+
+    tilts and azimuths are in degrees, one value per surface (or one for
+    all of them)"""
+    tilts, azimuths = np.broadcast_arrays(
+        np.atleast_1d(np.radians(np.asarray(tilts, dtype=np.float64))),
+        np.atleast_1d(np.radians(np.asarray(azimuths, dtype=np.float64))),
+    )
+    sin_tilts = np.sin(tilts)
+    normals = np.empty(tilts.shape + (3,), dtype=dtype)
+    normals[..., 0] = sin_tilts * np.sin(azimuths)
+    normals[..., 1] = sin_tilts * np.cos(azimuths)
+    normals[..., 2] = np.cos(tilts)
+    return normals
+
+
+def cos_incidence(normals, sunvectors, clip=False, dtype=np.float64):
+    """return the (surfaces, times) cosines of the angle of incidence
+
+    normals are the (surfaces, 3) surface_normals and sunvectors the
+    (times, 3) vnoaa.sunvector_array. With clip=True the cosines of the
+    times when the sun is behind a surface are 0 instead of negative.
+    With dtype=np.float32 the product is computed and returned in float32,
+    half the memory of float64"""
+    normals = np.asarray(normals, dtype=dtype)
+    sunvectors = np.asarray(sunvectors, dtype=dtype)
+    result = normals @ sunvectors.T
+    if clip:
+        np.maximum(result, 0, out=result)
+    return result
+
+
+def cos_incidence_site(
+    latitude,
+    longitude,
+    timezone,
+    thedates,
+    tilts,
+    azimuths,
+    atm_corr=True,
+    clip=False,
+    dtype=np.float64,
+):
+    """return the (surfaces, times) cosines of the angle of incidence
+
+    The sun vectors of the site at thedates are computed once and shared by
+    all the surfaces (tilts, azimuths). See cos_incidence for clip and
+    dtype"""
+    sunvectors = vnoaa.sunvector_array(
+        latitude, longitude, timezone, thedates, atm_corr=atm_corr, dtype=dtype
+    )
+    normals = surface_normals(tilts, azimuths, dtype=dtype)
+    return cos_incidence(normals, sunvectors, clip=clip, dtype=dtype)
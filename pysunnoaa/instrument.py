@@ -0,0 +1,209 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""Count and time the calls of the cells and of the API functions
+
+Profile is a context manager. While it is active, every cell function
+(cellgraph.CELLS) and every API function (API) of noaa, and of vnoaa if
+it is imported, is replaced by a wrapper that counts its calls and adds
+up their time::
+
+    from pysunnoaa import instrument
+
+    with instrument.Profile() as prof:
+        noaa.sunrise(40, -105, -6, datetime.datetime(2010, 6, 21))
+        list(noaa.sunpositions(40, -105, -6, thedates))
+    print(prof.asdict()["noaa.julianday"])  # {"calls": ..., "seconds": ...}
+    prof.write_chrome_trace("trace.json")  # open it in chrome://tracing
+
+When no Profile is active the functions are the original ones, so it
+costs nothing. The times are inclusive: the time of sunrise includes the
+time of the cells it calls. For a generator (sunpositions) only the time
+spent inside it is counted, not the time of the loop that uses it.
+
+noaa.sunposition is a fused kernel that does not call the cells. With
+cells=True (the default) it is replaced by noaa.sunposition_cells while
+profiling, which gives the same numbers, so the cells show up.
+
+The wrappers are module attributes, so functions imported with
+``from pysunnoaa.noaa import sunposition`` before the Profile started are
+not seen, and the work done in other processes (workers) is not seen.
+Only one Profile can be active at a time, and it is meant to be used
+from one thread."""
+
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+
+from pysunnoaa import cellgraph, noaa
+
+# the API functions that are timed, besides the cells
+API = {
+    "noaa": (
+        "sunposition",
+        "sunposition_cells",
+        "sunpositions",
+        "sun_ephemeris",
+        "sunposition_from_ephemeris",
+        "sunrise",
+        "sunset",
+        "sun_times",
+    ),
+    "vnoaa": (
+        "sunposition_array",
+        "sunposition_grid",
+        "sun_ephemeris",
+        "sunposition_from_ephemeris",
+        "sun_times",
+    ),
+}
+
+_active = None
+
+
+class Profile:
+    """call counts and cumulative times of the cells and the API
+
+    With trace=True every call is also kept as an event for
+    chrome_trace. With cells=False noaa.sunposition stays the fused
+    kernel, and only its total time is seen"""
+
+    def __init__(self, cells=True, trace=False):
+        self.cells = cells
+        self.events = [] if trace else None
+        # name: [calls, seconds]
+        self.stats = {}
+        self._originals = []
+
+    def __enter__(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("a Profile is already active")
+        _active = self
+        modules = [("noaa", noaa)]
+        if "pysunnoaa.vnoaa" in sys.modules:
+            modules.append(("vnoaa", sys.modules["pysunnoaa.vnoaa"]))
+        for modulename, module in modules:
+            for name in (*cellgraph.CELLS, *API[modulename]):
+                func = getattr(module, name, None)
+                if func is None or any(
+                    module is patched and name == patchedname
+                    for patched, patchedname, _ in self._originals
+                ):
+                    continue
+                self._originals.append((module, name, func))
+                if module is noaa and name == "sunposition" and self.cells:
+                    func = noaa.sunposition_cells
+                setattr(module, name, self._wrap(f"{modulename}.{name}", func))
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+        for module, name, func in reversed(self._originals):
+            setattr(module, name, func)
+        self._originals = []
+        _active = None
+        return False
+
+    def _wrap(self, name, func):
+        record = self.stats.setdefault(name, [0, 0.0])
+        events = self.events
+        perf_counter = time.perf_counter
+
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def generatorwrapper(*args, **kwargs):
+                record[0] += 1
+                iterator = func(*args, **kwargs)
+                first = perf_counter()
+                inside = 0.0
+                try:
+                    while True:
+                        tstart = perf_counter()
+                        try:
+                            value = next(iterator)
+                        except StopIteration:
+                            inside += perf_counter() - tstart
+                            return
+                        inside += perf_counter() - tstart
+                        yield value
+                finally:
+                    record[1] += inside
+                    if events is not None:
+                        events.append((name, first, inside, threading.get_ident()))
+
+            return generatorwrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tstart = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - tstart
+                record[0] += 1
+                record[1] += elapsed
+                if events is not None:
+                    events.append((name, tstart, elapsed, threading.get_ident()))
+
+        return wrapper
+
+    def asdict(self):
+        """return {name: {"calls": calls, "seconds": seconds}}
+
+        Only the functions that were called are in it, the most time first"""
+        called = [(name, record) for name, record in self.stats.items() if record[0]]
+        called.sort(key=lambda item: item[1][1], reverse=True)
+        return {
+            name: {"calls": calls, "seconds": seconds}
+            for name, (calls, seconds) in called
+        }
+
+    def write_json(self, path):
+        """write asdict to a json file"""
+        with open(path, "w") as jsonfile:
+            json.dump(self.asdict(), jsonfile, indent=2)
+
+    def chrome_trace(self):
+        """return the events in the Chrome trace event format
+
+        Needs trace=True. Load the json of it in chrome://tracing or
+        https://ui.perfetto.dev"""
+        if self.events is None:
+            raise ValueError("chrome_trace needs Profile(trace=True)")
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "cat": name.split(".")[0],
+                    "ph": "X",
+                    "ts": tstart * 1e6,
+                    "dur": elapsed * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                }
+                for name, tstart, elapsed, tid in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, path):
+        """write chrome_trace to a json file"""
+        with open(path, "w") as jsonfile:
+            json.dump(self.chrome_trace(), jsonfile)
+
+    def report(self, limit=None):
+        """return asdict as a text table"""
+        lines = [f"{'function':<60} {'calls':>10} {'seconds':>12}"]
+        for name, stats in list(self.asdict().items())[:limit]:
+            lines.append(f"{name:<60} {stats['calls']:>10} {stats['seconds']:12.6f}")
+        return "\n".join(lines)
@@ -0,0 +1,189 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""Load generator for pysunnoaa.server
+
+Start a server, then send it requests from many connections at once::
+
+    python -m pysunnoaa.server --port 8080 &
+    python -m pysunnoaa.loadgen --port 8080 --requests 20000 --concurrency 32
+    python -m pysunnoaa.loadgen --unix /tmp/pysunnoaa.sock --endpoint sunrise
+
+Every connection sends its requests one after the other and waits for
+each answer, and the latency of every request is kept. The report has the
+requests per second and the percentiles of the latency. ``--distinct``
+is the number of different requests (different sites and times) that are
+cycled through, so a small number measures the cache and a large one the
+computation. The client threads share the GIL of one python, so for the
+best numbers run the server in another process."""
+
+import argparse
+import datetime
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+import urllib.parse
+
+from pysunnoaa.bench import percentile
+from pysunnoaa.server import UnixHTTPConnection
+
+ENDPOINTS = ("sunposition", "sunpositions", "sunrise", "sunset")
+
+
+def make_paths(endpoint, count, seed=0):
+    """return count request paths for endpoint, at random sites and times
+
+    The sites are between latitudes 60S and 60N, in the timezone of
+    their longitude, and the times are in 2024"""
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    paths = []
+    for _ in range(count):
+        longitude = round(rng.uniform(-180, 180), 4)
+        query = {
+            "lat": round(rng.uniform(-60, 60), 4),
+            "lon": longitude,
+            "tz": round(longitude / 15),
+        }
+        thedate = start + datetime.timedelta(minutes=rng.randrange(366 * 1440))
+        if endpoint == "sunpositions":
+            day = thedate.date()
+            query.update(
+                start=day.isoformat(),
+                stop=(day + datetime.timedelta(days=1)).isoformat(),
+                step="10m",
+            )
+        else:
+            query["date"] = thedate.isoformat()
+        paths.append(f"/{endpoint}?{urllib.parse.urlencode(query)}")
+    return paths
+
+
+def run(connect, paths, requests=10000, concurrency=16):
+    """send requests paths (cycling through paths) on concurrency connections
+
+    connect() returns a new http.client connection. Return a dict with the
+    requests per second, the latency percentiles in seconds and the number
+    of errors"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counts = [
+        requests // concurrency + (i < requests % concurrency)
+        for i in range(concurrency)
+    ]
+
+    def client(number, count):
+        connection = connect()
+        mine = []
+        failed = 0
+        try:
+            for index in range(number, number + count * concurrency, concurrency):
+                path = paths[index % len(paths)]
+                tstart = time.perf_counter()
+                connection.request("GET", path)
+                response = connection.getresponse()
+                response.read()
+                mine.append(time.perf_counter() - tstart)
+                if response.status != 200:
+                    failed += 1
+        finally:
+            connection.close()
+            with lock:
+                latencies.extend(mine)
+                errors.append(failed)
+
+    threads = [
+        threading.Thread(target=client, args=(number, count))
+        for number, count in enumerate(counts)
+    ]
+    tstart = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - tstart
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "seconds": seconds,
+        "requests_per_sec": len(latencies) / seconds,
+        "min": latencies[0],
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "max": latencies[-1],
+        "errors": sum(errors),
+    }
+
+
+def format_results(results):
+    """return the results of run as lines of text"""
+    milliseconds = "  ".join(
+        f"{name} {results[name] * 1e3:.3f}"
+        for name in ("min", "p50", "p90", "p99", "max")
+    )
+    return (
+        f"{results['requests']} requests on {results['concurrency']} connections"
+        f" in {results['seconds']:.2f} s, {results['errors']} errors\n"
+        f"{results['requests_per_sec']:.0f} requests/s\n"
+        f"latency ms: {milliseconds}"
+    )
+
+
+def build_parser():
+    """return the argparse parser for python -m pysunnoaa.loadgen"""
+    parser = argparse.ArgumentParser(
+        prog="python -m pysunnoaa.loadgen",
+        description="Measure the throughput and latency of pysunnoaa.server",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="connect to this Unix socket instead")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="sunposition")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--distinct",
+        type=int,
+        default=1000,
+        help="number of different requests (default 1000)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this json file")
+    return parser
+
+
+def main(argv=None):
+    """print the load test results"""
+    args = build_parser().parse_args(argv)
+    if args.unix:
+
+        def connect():
+            return UnixHTTPConnection(args.unix)
+
+    else:
+
+        def connect():
+            return http.client.HTTPConnection(args.host, args.port)
+
+    paths = make_paths(args.endpoint, args.distinct, args.seed)
+    results = run(connect, paths, args.requests, args.concurrency)
+    results["endpoint"] = args.endpoint
+    results["distinct"] = args.distinct
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w") as jsonfile:
+            json.dump(results, jsonfile, indent=2)
+    return 0 if results["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # pragma: no cover
@@ -6,11 +6,10 @@
 # =======================================================================
 """All the functions to calculate the sun postion using the NOAA spreadsheet"""
 
+import collections
 import datetime
-import itertools
 import operator
 import math
-import julian
 
 
 def add2(a):
@@ -51,12 +50,30 @@ def datetime2dayfraction(dt):
     return (hour + hminute + hsecond + hmicrosecond) / 24.0
 
 
+def datetime2epochseconds(dt):
+    """return the seconds since 1970-01-01 00:00:00 for the datetime"""
+    return (
+        (dt.toordinal() - 719163) * 86400
+        + dt.hour * 3600
+        + dt.minute * 60
+        + dt.second
+        + dt.microsecond / 1e6
+    )
+
+
+def epoch2julianday(seconds, timezone=0):
+    """return the julian day for the seconds since 1970-01-01 00:00:00
+
+    seconds are in local time. Works on numbers and on numpy arrays"""
+    return (seconds - timezone * 3600) / 86400 + 2440587.5
+
+
 def julianday(dt, timezone=0):
     """return the julain day for the datetime
 
     1. f2"""
-    dt_tz = dt - datetime.timedelta(hours=timezone)
-    return julian.to_jd(dt_tz)
+    # 1721424.5 is the julian day of ordinal day 0 at midnight
+    return dt.toordinal() + 1721424.5 + (datetime2dayfraction(dt) - timezone / 24)
 
 
 def juliancentury(jul_day):
@@ -194,6 +211,36 @@ def ha_sunrise_deg(latitude, sun_declin_deg_value):
     )
 
 
+# what the sun does on a day, from polar_status
+NORMAL = 0
+POLAR_DAY = 1  # the sun does not set
+POLAR_NIGHT = -1  # the sun does not rise
+
+# how sun_times handles polar days and nights
+POLAR_MODES = ("raise", "nan", "clip")
+
+
+def ha_sunrise_cos(latitude, sun_declin_deg_value):
+    """return the cosine of ha_sunrise_deg
+
+    It is below -1 when the sun does not set that day and above 1 when it
+    does not rise. ha_sunrise_deg raises a ValueError for those"""
+    fixed_b3 = latitude
+    t2 = sun_declin_deg_value
+    return math.cos(math.radians(90.833)) / (
+        math.cos(math.radians(fixed_b3)) * math.cos(math.radians(t2))
+    ) - math.tan(math.radians(fixed_b3)) * math.tan(math.radians(t2))
+
+
+def polar_status(ha_sunrise_cos_value):
+    """return NORMAL, POLAR_DAY or POLAR_NIGHT for the value of ha_sunrise_cos"""
+    if ha_sunrise_cos_value > 1:
+        return POLAR_NIGHT
+    if ha_sunrise_cos_value < -1:
+        return POLAR_DAY
+    return NORMAL
+
+
 def solar_noon_lst(longitude, timezone, eq_of_time_minutes_value):
     """18. x2"""
     fixed_b4 = longitude
@@ -307,17 +354,118 @@ def solar_azimuth_angle_deg_cw_from_n(
         return operator.mod(540 - math.degrees(math.acos(temp1)), 360)
 
 
-def datetimerange(start, stop, minutes=1):
-    endlesstime = (
-        start + datetime.timedelta(minutes=m)
-        for m in itertools.count(start=0, step=minutes)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+class DateTimeRange:
+    """a range of datetimes from start up to (not including) stop
+
+    It works like python's range: it has a length, can be indexed and
+    sliced, and can be looped over any number of times. step is a
+    datetime.timedelta and can be negative, but not zero"""
+
+    def __init__(self, start, stop, step):
+        step_us = step // _MICROSECOND
+        if step_us == 0:
+            raise ValueError("DateTimeRange step must not be zero")
+        self._start = start
+        # offsets from start in microseconds. All the arithmetic is done on
+        # this range, so it is exact and O(1)
+        self._offsets = range(0, (stop - start) // _MICROSECOND, step_us)
+
+    @classmethod
+    def _fromoffsets(cls, start, offsets):
+        self = cls.__new__(cls)
+        self._start = start
+        self._offsets = offsets
+        return self
+
+    @property
+    def start(self):
+        return self._start + datetime.timedelta(microseconds=self._offsets.start)
+
+    @property
+    def stop(self):
+        return self._start + datetime.timedelta(microseconds=self._offsets.stop)
+
+    @property
+    def step(self):
+        return datetime.timedelta(microseconds=self._offsets.step)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DateTimeRange._fromoffsets(self._start, self._offsets[index])
+        return self._start + datetime.timedelta(microseconds=self._offsets[index])
+
+    def __iter__(self):
+        # adding the step each time avoids making a timedelta per datetime
+        step = self.step
+        current = self.start
+        for _ in self._offsets:
+            yield current
+            current += step
+
+    def __eq__(self, other):
+        if not isinstance(other, DateTimeRange):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        if len(self) == 0:
+            return True
+        return self[0] == other[0] and (len(self) == 1 or self.step == other.step)
+
+    def __hash__(self):
+        # equal ranges have the same datetimes, as with range, so the hash
+        # is of those and not of start, stop and step
+        if len(self) == 0:
+            return hash((0, None, None))
+        if len(self) == 1:
+            return hash((1, self[0], None))
+        return hash((len(self), self[0], self.step))
+
+    def __repr__(self):
+        return f"DateTimeRange({self.start!r}, {self.stop!r}, {self.step!r})"
+
+    def to_numpy(self, epoch=False):
+        """return the datetimes as a numpy datetime64[us] array
+
+        With epoch=True return float seconds since 1970-01-01 00:00:00
+        instead. Needs numpy"""
+        import numpy as np
+
+        offsets = np.arange(
+            self._offsets.start,
+            self._offsets.stop,
+            self._offsets.step,
+            dtype=np.int64,
+        )
+        # the datetimes are local wall-clock times. numpy would convert an
+        # aware start to UTC, so its tzinfo is dropped first
+        start_us = np.datetime64(self._start.replace(tzinfo=None), "us")
+        start_us = start_us.astype(np.int64)
+        if epoch:
+            return (offsets + start_us) / 1e6
+        return (offsets + start_us).astype("datetime64[us]")
+
+
+def datetimerange(start, stop, minutes=1, seconds=0):
+    """return a DateTimeRange from start to stop
+
+    The step is minutes plus seconds. For a step of 30 seconds use
+    minutes=0, seconds=30"""
+    return DateTimeRange(
+        start, stop, datetime.timedelta(minutes=minutes, seconds=seconds)
     )
-    generator = itertools.takewhile(lambda x: x < stop, endlesstime)
-    return generator
 
 
-def sunposition(latitude, longitude, timezone, thedate, atm_corr=True):
-    jul_day = julianday(thedate, timezone)
+def sun_ephemeris(jul_day):
+    """return (sun_declin_deg, eq_of_time_minutes) for the julian day
+
+    These are the cells that depend only on the instant and not on the
+    site. All sites at the same instant share them"""
     juliancentury_value = juliancentury(jul_day)
     geom_mean_long_sun_deg_value = geom_mean_long_sun_deg(juliancentury_value)
     geom_mean_anom_sun_deg_value = geom_mean_anom_sun_deg(juliancentury_value)
@@ -333,10 +481,6 @@ def sunposition(latitude, longitude, timezone, thedate, atm_corr=True):
         eccent_earth_orbit_value,
         var_y_value,
     )
-    true_solar_time_min_value = true_solar_time_min(
-        thedate, eq_of_time_minutes_value, longitude, timezone
-    )
-    geom_mean_anom_sun_deg_value = geom_mean_anom_sun_deg(juliancentury_value)
     sun_eq_of_ctr_value = sun_eq_of_ctr(
         juliancentury_value, geom_mean_anom_sun_deg_value
     )
@@ -347,11 +491,28 @@ def sunposition(latitude, longitude, timezone, thedate, atm_corr=True):
         juliancentury_value, sun_true_long_deg_value
     )
     sun_declin_deg_value = sun_declin_deg(sun_app_long_deg_value, obliq_corr_deg_value)
+    return sun_declin_deg_value, eq_of_time_minutes_value
+
+
+def sunposition_from_ephemeris(
+    latitude,
+    longitude,
+    timezone,
+    thedate,
+    sun_declin_deg_value,
+    eq_of_time_minutes_value,
+    atm_corr=True,
+):
+    """return (altitude, azimuth) from the values given by sun_ephemeris
+
+    These are the cheap cells that depend on the site and the time of day"""
+    true_solar_time_min_value = true_solar_time_min(
+        thedate, eq_of_time_minutes_value, longitude, timezone
+    )
     hour_angle_deg_value = hour_angle_deg(true_solar_time_min_value)
     solar_zenith_angle_deg_value = solar_zenith_angle_deg(
         latitude, sun_declin_deg_value, hour_angle_deg_value
     )
-    sun_declin_deg_value = sun_declin_deg(sun_app_long_deg_value, obliq_corr_deg_value)
     solar_elevation_angle_deg_value = solar_elevation_angle_deg(
         solar_zenith_angle_deg_value
     )
@@ -374,11 +535,358 @@ def sunposition(latitude, longitude, timezone, thedate, atm_corr=True):
         return sunalt_nocorr, sunazm
 
 
-def sunpositions(latitude, longitude, timezone, thedates, atm_corr=True):
+def sunposition_cells(latitude, longitude, timezone, thedate, atm_corr=True):
+    """sunposition computed by calling each cell function in turn
+
+    This follows the spreadsheet step by step. sunposition gives the same
+    results faster"""
+    jul_day = julianday(thedate, timezone)
+    sun_declin_deg_value, eq_of_time_minutes_value = sun_ephemeris(jul_day)
+    return sunposition_from_ephemeris(
+        latitude,
+        longitude,
+        timezone,
+        thedate,
+        sun_declin_deg_value,
+        eq_of_time_minutes_value,
+        atm_corr=atm_corr,
+    )
+
+
+def sunposition(latitude, longitude, timezone, thedate, atm_corr=True):
+    """return (altitude, azimuth) of the sun
+
+    The cells of sunposition_cells are fused into straight-line code: no
+    function calls per cell, each angle converted to radians once and no
+    cell computed twice. The expressions are the same as in the cells, so
+    the results are identical to sunposition_cells"""
+    radians = math.radians
+    degrees = math.degrees
+    sin = math.sin
+    cos = math.cos
+    # datetime2dayfraction, used by f2 and ab2
+    e2 = (
+        thedate.hour
+        + thedate.minute / 60.0
+        + thedate.second / 60.0 / 60.0
+        + thedate.microsecond / 1e6 / 60.0 / 60.0
+    ) / 24.0
+    f2 = thedate.toordinal() + 1721424.5 + (e2 - timezone / 24)
+    g2 = (f2 - 2451545) / 36525
+    i2 = (280.46646 + g2 * (36000.76983 + g2 * 0.0003032)) % 360
+    j2 = 357.52911 + g2 * (35999.05029 - 0.0001537 * g2)
+    k2 = 0.016708634 - g2 * (0.000042037 + 0.0000001267 * g2)
+    i2_rad = radians(i2)
+    j2_rad = radians(j2)
+    sin_j2 = sin(j2_rad)
+    sin_2j2 = sin(radians(2 * j2))
+    l2 = (
+        sin_j2 * (1.914602 - g2 * (0.004817 + 0.000014 * g2))
+        + sin_2j2 * (0.019993 - 0.000101 * g2)
+        + sin(radians(3 * j2)) * 0.000289
+    )
+    m2 = i2 + l2
+    omega_rad = radians(125.04 - 1934.136 * g2)
+    p2 = m2 - 0.00569 - 0.00478 * sin(omega_rad)
+    q2 = (
+        23
+        + (26 + ((21.448 - g2 * (46.815 + g2 * (0.00059 - g2 * 0.001813)))) / 60) / 60
+    )
+    r2 = q2 + 0.00256 * cos(omega_rad)
+    t2 = degrees(math.asin(sin(radians(r2)) * sin(radians(p2))))
+    tan_half_r2 = math.tan(radians(r2 / 2))
+    u2 = tan_half_r2 * tan_half_r2
+    v2 = 4 * degrees(
+        u2 * sin(2 * i2_rad)
+        - 2 * k2 * sin_j2
+        + 4 * k2 * u2 * sin_j2 * cos(2 * i2_rad)
+        - 0.5 * u2 * u2 * sin(4 * i2_rad)
+        - 1.25 * k2 * k2 * sin_2j2
+    )
+    ab2 = (e2 * 1440 + v2 + 4 * longitude - 60 * timezone) % 1440
+    ac2 = ab2 / 4
+    if ac2 < 0:
+        ac2 = ac2 + 180
+    else:
+        ac2 = ac2 - 180
+    latitude_rad = radians(latitude)
+    sin_latitude = sin(latitude_rad)
+    cos_latitude = cos(latitude_rad)
+    t2_rad = radians(t2)
+    sin_t2 = sin(t2_rad)
+    ad2 = degrees(
+        math.acos(
+            sin_latitude * sin_t2 + cos_latitude * cos(t2_rad) * cos(radians(ac2))
+        )
+    )
+    ad2_rad = radians(ad2)
+    ae2 = 90 - ad2
+    acos_deg = degrees(
+        math.acos(
+            ((sin_latitude * cos(ad2_rad)) - sin_t2) / (cos_latitude * sin(ad2_rad))
+        )
+    )
+    if ac2 > 0:
+        ah2 = (acos_deg + 180) % 360
+    else:
+        ah2 = (540 - acos_deg) % 360
+    if not atm_corr:
+        return ae2, ah2
+    if ae2 > 85:
+        af2 = 0
+    elif ae2 > 5:
+        tan_ae2 = math.tan(radians(ae2))
+        af2 = (
+            58.1 / tan_ae2
+            - 0.07 / math.pow(tan_ae2, 3)
+            + 0.000086 / math.pow(tan_ae2, 5)
+        )
+    elif ae2 > -0.575:
+        af2 = 1735 + ae2 * (-518.2 + ae2 * (103.4 + ae2 * (-12.79 + ae2 * 0.711)))
+    else:
+        af2 = -20.772 / math.tan(radians(ae2))
+    return ae2 + af2 / 3600, ah2
+
+
+def refract_vector(east, north, up):
+    """return the unit vector (east, north, up) with the altitude corrected
+    for the atmospheric refraction, as in sunposition. The azimuth is kept"""
+    altitude = math.degrees(math.asin(max(-1.0, min(1.0, up))))
+    altitude_rad = math.radians(altitude + approx_atmospheric_refraction_deg(altitude))
+    horizontal = math.hypot(east, north)
+    if horizontal > 0:
+        scale = math.cos(altitude_rad) / horizontal
+        east, north = east * scale, north * scale
+    return east, north, math.sin(altitude_rad)
+
+
+def sunvector_from_ephemeris(
+    latitude,
+    longitude,
+    timezone,
+    thedate,
+    sun_declin_deg_value,
+    eq_of_time_minutes_value,
+    atm_corr=True,
+):
+    """return the unit vector (east, north, up) pointing to the sun
+
+    It is computed from the latitude, the declination and the hour angle,
+    without the zenith and azimuth angles in between"""
+    hour_angle_rad = math.radians(
+        hour_angle_deg(
+            true_solar_time_min(thedate, eq_of_time_minutes_value, longitude, timezone)
+        )
+    )
+    latitude_rad = math.radians(latitude)
+    declin_rad = math.radians(sun_declin_deg_value)
+    sin_latitude = math.sin(latitude_rad)
+    cos_latitude = math.cos(latitude_rad)
+    sin_declin = math.sin(declin_rad)
+    cos_declin = math.cos(declin_rad)
+    cos_hour = math.cos(hour_angle_rad)
+    east = -cos_declin * math.sin(hour_angle_rad)
+    north = cos_latitude * sin_declin - sin_latitude * cos_declin * cos_hour
+    up = sin_latitude * sin_declin + cos_latitude * cos_declin * cos_hour
+    if atm_corr:
+        return refract_vector(east, north, up)
+    return east, north, up
+
+
+def sunvector(latitude, longitude, timezone, thedate, atm_corr=True):
+    """return the unit vector (east, north, up) pointing to the sun
+
+    It points at the (altitude, azimuth) of sunposition, for renderers and
+    shading code that work with directions"""
+    sun_declin_deg_value, eq_of_time_minutes_value = sun_ephemeris(
+        julianday(thedate, timezone)
+    )
+    return sunvector_from_ephemeris(
+        latitude,
+        longitude,
+        timezone,
+        thedate,
+        sun_declin_deg_value,
+        eq_of_time_minutes_value,
+        atm_corr=atm_corr,
+    )
+
+
+# a DateTimeRange at least this long is computed with vnoaa, if numpy is there
+VECTORIZE_MIN = 64
+# number of times computed in one vnoaa call
+VECTORIZE_CHUNK = 1 << 16
+
+
+def sunpositions(latitude, longitude, timezone, thedates, atm_corr=True, workers=None):
+    """yield (altitude, azimuth) for all the times in thedates
+
+    A long DateTimeRange is computed in chunks with vnoaa.sunposition_array
+    when numpy is installed. With workers, the work is shared by that many
+    processes (see parallel.sunpositions)"""
+    if workers is not None:
+        from pysunnoaa import parallel
+
+        yield from parallel.sunpositions(
+            latitude, longitude, timezone, thedates, atm_corr, workers=workers
+        )
+        return
+    vnoaa = _vectorizer(thedates)
+    if vnoaa is not None:
+        yield from _sunpositions_vectorized(
+            vnoaa, latitude, longitude, timezone, thedates, atm_corr
+        )
+        return
     for thedate in thedates:
         yield sunposition(latitude, longitude, timezone, thedate, atm_corr=atm_corr)
 
 
+def _vectorizer(thedates):
+    """return vnoaa if sunpositions computes thedates with it, else None"""
+    if isinstance(thedates, DateTimeRange) and len(thedates) >= VECTORIZE_MIN:
+        try:
+            from pysunnoaa import vnoaa
+        except ImportError:
+            return None
+        return vnoaa
+    return None
+
+
+def _sunpositions_vectorized(vnoaa, latitude, longitude, timezone, thedates, atm_corr):
+    for start in range(0, len(thedates), VECTORIZE_CHUNK):
+        chunk = thedates[start : start + VECTORIZE_CHUNK]
+        sunalt, sunazm = vnoaa.sunposition_array(
+            latitude, longitude, timezone, chunk.to_numpy(epoch=True), atm_corr
+        )
+        yield from zip(sunalt.tolist(), sunazm.tolist())
+
+
+# how long before sunrise and after sunset daylightpositions still computes.
+# The sunrise and sunset are computed at midnight, so they are off by up to
+# a minute or so from those of the time itself
+DAYLIGHT_MARGIN = datetime.timedelta(minutes=10)
+
+
+def daylightpositions(
+    latitude,
+    longitude,
+    timezone,
+    thedates,
+    atm_corr=True,
+    margin=DAYLIGHT_MARGIN,
+    night=None,
+    skip=False,
+):
+    """like sunpositions, but the night times are not computed
+
+    The sunrise and sunset are computed once for each local day. For a
+    time more than margin before sunrise or after sunset, yield night
+    instead of (altitude, azimuth). With skip=True the night times are left
+    out and (thedate, (altitude, azimuth)) is yielded for the others. The
+    daylight values are the same, bit for bit, as those of sunpositions"""
+    vnoaa = _vectorizer(thedates)
+    if vnoaa is not None:
+        yield from _daylightpositions_vectorized(
+            vnoaa,
+            latitude,
+            longitude,
+            timezone,
+            thedates,
+            atm_corr,
+            margin,
+            night,
+            skip,
+        )
+        return
+    cache = {}
+    windowsday = None
+    for thedate in thedates:
+        day = thedate.date()
+        if day != windowsday:
+            windowsday = day
+            windows = _daylight_windows(
+                latitude, longitude, timezone, day, margin, cache
+            )
+        for start, stop in windows:
+            if start <= thedate <= stop:
+                position = sunposition(
+                    latitude, longitude, timezone, thedate, atm_corr=atm_corr
+                )
+                yield (thedate, position) if skip else position
+                break
+        else:
+            if not skip:
+                yield night
+
+
+def _daylight_edges(latitude, longitude, timezone, day):
+    """return (sunrise, sunset) of the date day, computed at its midnight
+
+    On a polar day they cover the whole date and the whole solar day"""
+    midnight = datetime.datetime(day.year, day.month, day.day)
+    times, day_status = sun_times(
+        latitude, longitude, timezone, midnight, polar="clip", status=True
+    )
+    if day_status == POLAR_DAY:
+        return (
+            min(times.sunrise, midnight),
+            max(times.sunset, midnight + datetime.timedelta(days=1)),
+        )
+    return times.sunrise, times.sunset
+
+
+def _daylight_windows(latitude, longitude, timezone, day, margin, cache):
+    """return the daylight windows (start, stop) a time on the date day can be in
+
+    The sunset can be after midnight and the sunrise before it, so the
+    windows of the days before and after count too. The declination
+    changes during the day, which matters near the polar circles, so the
+    window of a day covers the sunrise and sunset computed at both its
+    midnights, and margin more. cache is a dict that keeps the edges that
+    were computed"""
+    oneday = datetime.timedelta(days=1)
+    edges = []
+    for shift in (-1, 0, 1, 2):
+        other = day + shift * oneday
+        if other not in cache:
+            if len(cache) > 8:
+                cache.clear()
+            cache[other] = _daylight_edges(latitude, longitude, timezone, other)
+        edges.append(cache[other])
+    windows = []
+    for (sunrise, sunset), (nextsunrise, nextsunset) in zip(edges, edges[1:]):
+        windows.append(
+            (
+                min(sunrise, nextsunrise - oneday) - margin,
+                max(sunset, nextsunset - oneday) + margin,
+            )
+        )
+    # the window of day first
+    return [windows[1], windows[0], windows[2]]
+
+
+def _daylightpositions_vectorized(
+    vnoaa, latitude, longitude, timezone, thedates, atm_corr, margin, night, skip
+):
+    margin_seconds = margin.total_seconds()
+    for start in range(0, len(thedates), VECTORIZE_CHUNK):
+        chunk = thedates[start : start + VECTORIZE_CHUNK]
+        seconds = chunk.to_numpy(epoch=True)
+        mask = vnoaa.daylight_mask(
+            latitude, longitude, timezone, seconds, margin_seconds
+        )
+        sunalt, sunazm = vnoaa.sunposition_array(
+            latitude, longitude, timezone, seconds[mask], atm_corr
+        )
+        positions = zip(sunalt.tolist(), sunazm.tolist())
+        if skip:
+            for index, position in zip(mask.nonzero()[0].tolist(), positions):
+                yield chunk[index], position
+        else:
+            for isday in mask.tolist():
+                yield next(positions) if isday else night
+
+
 def _forsunrisesunset(latitude, longitude, timezone, thedate):
 
     jul_day = julianday(thedate, timezone)
@@ -430,6 +938,50 @@ def sunset(latitude, longitude, timezone, thedate):
     )
 
 
+SunTimes = collections.namedtuple(
+    "SunTimes", ["sunrise", "sunset", "solar_noon", "sunlight_duration_minutes"]
+)
+
+
+def sun_times(latitude, longitude, timezone, thedate, polar="raise", status=False):
+    """return SunTimes(sunrise, sunset, solar_noon, sunlight_duration_minutes)
+
+    All four come from one pass of the cells, where calling sunrise and
+    sunset would compute them twice.
+
+    polar says what to do on days when the sun does not rise or set:
+    "raise" raises a ValueError (as sunrise and sunset do), "nan" gives
+    None for sunrise and sunset and nan for the duration, "clip" gives
+    sunrise and sunset 12 hours from solar noon (polar day) or both at
+    solar noon (polar night). With status=True return
+    (SunTimes, NORMAL or POLAR_DAY or POLAR_NIGHT)"""
+    if polar not in POLAR_MODES:
+        raise ValueError(f"polar must be one of {POLAR_MODES}, not {polar!r}")
+    jul_day = julianday(thedate, timezone)
+    sun_declin_deg_value, eq_of_time_minutes_value = sun_ephemeris(jul_day)
+    solar_noon_lst_value = solar_noon_lst(longitude, timezone, eq_of_time_minutes_value)
+    solar_noon = dayfraction2datetime(solar_noon_lst_value, thedate)
+    day_status = polar_status(ha_sunrise_cos(latitude, sun_declin_deg_value))
+    if day_status == NORMAL or polar == "raise":
+        ha_sunrise_deg_value = ha_sunrise_deg(latitude, sun_declin_deg_value)
+    elif polar == "nan":
+        result = SunTimes(None, None, solar_noon, math.nan)
+        return (result, day_status) if status else result
+    else:
+        ha_sunrise_deg_value = 180.0 if day_status == POLAR_DAY else 0.0
+    result = SunTimes(
+        dayfraction2datetime(
+            sunrise_time_lst(ha_sunrise_deg_value, solar_noon_lst_value), thedate
+        ),
+        dayfraction2datetime(
+            sunset_time_lst(ha_sunrise_deg_value, solar_noon_lst_value), thedate
+        ),
+        solar_noon,
+        sunlight_duration_minutes(ha_sunrise_deg_value),
+    )
+    return (result, day_status) if status else result
+
+
 def main():
     latitude = fixed_b3 = 40
     longitude = fixed_b4 = -105
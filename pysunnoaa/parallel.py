@@ -0,0 +1,110 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""Compute sun positions on several cores with a process pool
+
+The times (or the sites) are cut into chunks and each chunk is computed in
+a worker process. Results come back in the order of the input. Only a few
+chunks are in flight at a time, and the input is read lazily, so memory
+stays bounded even for very long time series."""
+
+import collections
+import concurrent.futures
+import itertools
+import os
+
+from pysunnoaa import noaa
+
+
+def chunks(iterable, chunksize):
+    """yield the items of iterable in lists of chunksize
+
+    A DateTimeRange is cut into smaller DateTimeRanges instead, which are
+    cheap to send to a worker and are computed with the vectorized code"""
+    if isinstance(iterable, noaa.DateTimeRange):
+        for start in range(0, len(iterable), chunksize):
+            yield iterable[start : start + chunksize]
+        return
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ordered_map(func, argtuples, workers=None, max_inflight=None, executor=None):
+    """yield func(*args) for each args in argtuples, in order
+
+    The calls run in a ProcessPoolExecutor with workers processes (by
+    default the number of CPUs), or in executor, if given. At most
+    max_inflight calls (by default twice the workers) are submitted ahead
+    of the one being yielded"""
+    workers = workers or os.cpu_count() or 1
+    own_executor = executor is None
+    if own_executor:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    if max_inflight is None:
+        max_inflight = 2 * workers
+    inflight = collections.deque()
+    try:
+        for args in argtuples:
+            inflight.append(executor.submit(func, *args))
+            if len(inflight) >= max_inflight:
+                yield inflight.popleft().result()
+        while inflight:
+            yield inflight.popleft().result()
+    finally:
+        for future in inflight:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=True)
+
+
+def _sunpositions_chunk(latitude, longitude, timezone, thedates, atm_corr):
+    return list(noaa.sunpositions(latitude, longitude, timezone, thedates, atm_corr))
+
+
+def sunpositions(
+    latitude,
+    longitude,
+    timezone,
+    thedates,
+    atm_corr=True,
+    workers=None,
+    chunksize=4096,
+    max_inflight=None,
+    executor=None,
+):
+    """same as noaa.sunpositions, computed in a process pool
+
+    thedates is cut into chunks of chunksize times. workers is the number
+    of processes (by default the number of CPUs)"""
+    argtuples = (
+        (latitude, longitude, timezone, chunk, atm_corr)
+        for chunk in chunks(thedates, chunksize)
+    )
+    for result in ordered_map(
+        _sunpositions_chunk, argtuples, workers, max_inflight, executor
+    ):
+        yield from result
+
+
+def sitepositions(
+    sites, thedates, atm_corr=True, workers=None, max_inflight=None, executor=None
+):
+    """yield a list of (altitude, azimuth) for each site, in order
+
+    sites is an iterable of (latitude, longitude, timezone). Each site is
+    computed in a worker process for all of thedates, so thedates should
+    be a DateTimeRange or a list, not a generator"""
+    argtuples = (
+        (latitude, longitude, timezone, thedates, atm_corr)
+        for latitude, longitude, timezone in sites
+    )
+    yield from ordered_map(
+        _sunpositions_chunk, argtuples, workers, max_inflight, executor
+    )
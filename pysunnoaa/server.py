@@ -0,0 +1,482 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""A local sun position server, with only the standard library
+
+Several programs on one machine can share one server, and its caches,
+instead of each computing the same sun positions::
+
+    python -m pysunnoaa.server --port 8080
+    python -m pysunnoaa.server --unix /tmp/pysunnoaa.sock
+
+It answers GET requests with json::
+
+    /sunposition?lat=40&lon=-105&tz=-6&date=2024-06-21T12:00
+    /sunpositions?lat=40&lon=-105&tz=-6&start=2024-06-21&stop=2024-06-22&step=10
+    /sunrise?lat=40&lon=-105&tz=-6&date=2024-06-21
+    /sunset?lat=40&lon=-105&tz=-6&date=2024-06-21
+
+The times are local times, as in noaa. ``atm_corr=0`` turns off the
+refraction correction of the positions. The step is written as on the
+command line: "10" or "10m" (minutes), "30s", "1h". Bad requests get the
+status 400 and ``{"error": message}``, and a request that fails when it
+is computed gets the status 500 and ``{"error": message}``.
+
+Every connection is served in its own thread. The sunposition requests
+that arrive within ``window`` seconds of each other are computed together
+as one batch, with vnoaa when numpy is installed and the batch is big
+enough. The json answers are kept in a shared LRU cache, and the sunrise
+and sunset in a suntimes.SunTimesCache, so a request that was asked
+before is not computed again. A cached sunrise or sunset is that of the
+calendar date (see suntimes). The sunpositions answers grow with the
+number of times, so they have a small cache of their own, and those of
+more than SERIES_CACHE_TIMES times are not kept.
+
+python -m pysunnoaa.loadgen measures the throughput and latency of a
+running server."""
+
+import argparse
+import concurrent.futures
+import http.client
+import http.server
+import json
+import math
+import os
+import queue
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+import urllib.parse
+
+from pysunnoaa import cli, noaa
+from pysunnoaa.lru import LRUCache
+from pysunnoaa.suntimes import SunTimesCache
+
+# seconds that a batch waits for more requests after its first one
+WINDOW = 0.002
+# most requests in one batch
+BATCH_MAX = 4096
+# number of answers kept in the cache
+CACHE_SIZE = 65536
+# number of sunpositions answers kept in their cache
+SERIES_CACHE_SIZE = 64
+# most times of a sunpositions answer that is kept (a day at 1 minute)
+SERIES_CACHE_TIMES = 1440
+# most times in one sunpositions request
+MAX_TIMES = 1 << 20
+
+# degrees from north or south within which a vnoaa azimuth is checked
+_AZIMUTH_CLIPPED = 1e-4
+
+STATUS_NAMES = {
+    noaa.NORMAL: "normal",
+    noaa.POLAR_DAY: "polar day",
+    noaa.POLAR_NIGHT: "polar night",
+}
+
+
+class BadRequest(ValueError):
+    """a request with missing or invalid parameters"""
+
+
+class Batcher:
+    """call func on lists of items submitted from many threads
+
+    submit(item) blocks until the result for item is ready. The items
+    submitted within window seconds of the first one (at most maxsize of
+    them) are given to func in one list, and func returns their results
+    in the same order. A result that is an exception is raised by the
+    submit of its item only, an exception raised by func by all of them.
+    batches counts the calls of func"""
+
+    def __init__(self, func, window=WINDOW, maxsize=BATCH_MAX):
+        self.func = func
+        self.window = window
+        self.maxsize = maxsize
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """return the result of func for item, computed in a batch"""
+        future = concurrent.futures.Future()
+        self._queue.put((item, future))
+        return future.result()
+
+    def close(self):
+        """compute what was submitted and stop the batching thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        closing = False
+        while not closing:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            batch = [entry]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.maxsize:
+                timeout = deadline - time.perf_counter()
+                try:
+                    entry = self._queue.get(timeout=max(timeout, 0))
+                except queue.Empty:
+                    break
+                if entry is None:
+                    closing = True
+                    break
+                batch.append(entry)
+            self._compute(batch)
+
+    def _compute(self, batch):
+        self.batches += 1
+        try:
+            results = self.func([item for item, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def _sunposition(item):
+    """return noaa.sunposition for item, or the exception it raised"""
+    try:
+        altitude, azimuth = noaa.sunposition(*item)
+    except Exception as error:
+        return error
+    if not (math.isfinite(altitude) and math.isfinite(azimuth)):
+        return ValueError(f"no sun position for {item}")
+    return altitude, azimuth
+
+
+def _checked(item, position):
+    """return the vnoaa position of item, or _sunposition where they differ
+
+    vnoaa clips the cosines that noaa.sunposition gives to math.acos, so
+    where noaa raises a math domain error vnoaa gives an azimuth of 0 or
+    180 degrees. The items with (about) those azimuths, or with values
+    that are not finite, are computed with noaa, so an item gets the same
+    answer in a batch of any size"""
+    altitude, azimuth = position
+    if not (math.isfinite(altitude) and math.isfinite(azimuth)):
+        return _sunposition(item)
+    if min(azimuth % 180, 180 - azimuth % 180) < _AZIMUTH_CLIPPED:
+        return _sunposition(item)
+    return position
+
+
+def sunposition_batch(items):
+    """return the (altitude, azimuth) for each item
+
+    The items are (latitude, longitude, timezone, thedate, atm_corr).
+    Repeated items are computed once. With numpy and at least
+    noaa.VECTORIZE_MIN distinct items, they are computed with vnoaa, whose
+    results can differ from noaa.sunposition in the last digits. The
+    result of an item that fails is the exception, so that it does not
+    fail the other items of the batch"""
+    distinct = list(dict.fromkeys(items))
+    vnoaa = None
+    if len(distinct) >= noaa.VECTORIZE_MIN:
+        try:
+            import numpy as np
+
+            from pysunnoaa import vnoaa
+        except ImportError:
+            pass
+    if vnoaa is None:
+        positions = {item: _sunposition(item) for item in distinct}
+        return [positions[item] for item in items]
+    positions = {}
+    for atm_corr in (True, False):
+        group = [item for item in distinct if item[4] == atm_corr]
+        if not group:
+            continue
+        latitudes, longitudes, timezones, thedates, _ = zip(*group)
+        try:
+            sunalt, sunazm = vnoaa.sunposition_array(
+                np.array(latitudes),
+                np.array(longitudes),
+                np.array(timezones),
+                list(thedates),
+                atm_corr,
+            )
+        except Exception:
+            # find the items that fail, one at a time
+            positions.update((item, _sunposition(item)) for item in group)
+            continue
+        positions.update(
+            (item, _checked(item, position))
+            for item, position in zip(group, zip(sunalt.tolist(), sunazm.tolist()))
+        )
+    return [positions[item] for item in items]
+
+
+def _number(query, name):
+    try:
+        value = float(query[name])
+    except KeyError:
+        raise BadRequest(f"missing parameter {name!r}") from None
+    except ValueError:
+        value = math.nan
+    if not math.isfinite(value):
+        raise BadRequest(f"{name} must be a number, not {query[name]!r}")
+    return value
+
+
+def _datetime(query, name):
+    try:
+        text = query[name]
+    except KeyError:
+        raise BadRequest(f"missing parameter {name!r}") from None
+    try:
+        # the times are local times, the offset of an aware time is dropped
+        return cli.parse_datetime(text).replace(tzinfo=None)
+    except argparse.ArgumentTypeError:
+        raise BadRequest(f"{name} must be an ISO date, not {text!r}") from None
+
+
+def _site(query):
+    latitude = _number(query, "lat")
+    if not -90 <= latitude <= 90:
+        raise BadRequest(f"lat must be from -90 to 90, not {query['lat']!r}")
+    return latitude, _number(query, "lon"), _number(query, "tz")
+
+
+def _atm_corr(query):
+    text = query.get("atm_corr", "1").lower()
+    if text not in ("0", "1", "true", "false"):
+        raise BadRequest(f"atm_corr must be 0 or 1, not {text!r}")
+    return text in ("1", "true")
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class SunService:
+    """the requests of the server, without the HTTP
+
+    One SunService is shared by all the connections of a server. It holds
+    the Batcher of the sunposition requests and the caches"""
+
+    def __init__(
+        self,
+        window=WINDOW,
+        batch_max=BATCH_MAX,
+        cache_size=CACHE_SIZE,
+        max_times=MAX_TIMES,
+        series_cache_size=SERIES_CACHE_SIZE,
+    ):
+        self.max_times = max_times
+        self.cache = LRUCache(cache_size)
+        self.seriescache = LRUCache(series_cache_size)
+        self.suntimes = SunTimesCache(cache_size)
+        self.batcher = Batcher(sunposition_batch, window, batch_max)
+        self.routes = {
+            "/sunposition": self.sunposition,
+            "/sunpositions": self.sunpositions,
+            "/sunrise": self.sunrise,
+            "/sunset": self.sunset,
+        }
+
+    def close(self):
+        """stop the batching thread"""
+        self.batcher.close()
+
+    def handle(self, path, query):
+        """return (status, json bytes) for the path and the query string"""
+        route = self.routes.get(path)
+        if route is None:
+            return 404, _encode({"error": f"unknown path {path!r}"})
+        query = dict(urllib.parse.parse_qsl(query))
+        try:
+            return 200, route(query)
+        except BadRequest as error:
+            return 400, _encode({"error": str(error)})
+        except Exception as error:
+            # the connection still gets an answer
+            return 500, _encode({"error": f"{type(error).__name__}: {error}"})
+
+    @staticmethod
+    def _cached(cache, key, compute):
+        body = cache.get(key)
+        if body is None:
+            body = _encode(compute())
+            cache.put(key, body)
+        return body
+
+    def sunposition(self, query):
+        item = (*_site(query), _datetime(query, "date"), _atm_corr(query))
+
+        def compute():
+            altitude, azimuth = self.batcher.submit(item)
+            return {"altitude": altitude, "azimuth": azimuth}
+
+        return self._cached(self.cache, ("sunposition", item), compute)
+
+    def sunpositions(self, query):
+        site = _site(query)
+        start = _datetime(query, "start")
+        stop = _datetime(query, "stop")
+        try:
+            step = cli.parse_step(query.get("step", "1"))
+        except argparse.ArgumentTypeError as error:
+            raise BadRequest(str(error)) from None
+        atm_corr = _atm_corr(query)
+        thedates = noaa.DateTimeRange(start, stop, step)
+        if len(thedates) > self.max_times:
+            raise BadRequest(
+                f"{len(thedates)} times is more than the {self.max_times} allowed"
+            )
+
+        def compute():
+            positions = list(noaa.sunpositions(*site, thedates, atm_corr))
+            return {
+                "altitude": [altitude for altitude, _ in positions],
+                "azimuth": [azimuth for _, azimuth in positions],
+            }
+
+        if len(thedates) > SERIES_CACHE_TIMES:
+            return _encode(compute())
+        key = (site, start, stop, step, atm_corr)
+        return self._cached(self.seriescache, key, compute)
+
+    def _sun_time(self, query, name):
+        site = _site(query)
+        thedate = _datetime(query, "date")
+        times, day_status = self.suntimes.sun_times(
+            *site, thedate, polar="nan", status=True
+        )
+        value = getattr(times, name)
+        return _encode(
+            {
+                name: None if value is None else value.isoformat(),
+                "status": STATUS_NAMES[day_status],
+            }
+        )
+
+    def sunrise(self, query):
+        return self._sun_time(query, "sunrise")
+
+    def sunset(self, query):
+        return self._sun_time(query, "sunset")
+
+
+class SunRequestHandler(http.server.BaseHTTPRequestHandler):
+    """answer the GET requests with the SunService of the server"""
+
+    protocol_version = "HTTP/1.1"  # keep the connections open
+    # buffer the headers and the body into one send. Two small sends on a
+    # connection that is kept open wait for the delayed ack of the client
+    wbufsize = -1
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        status, body = self.server.service.handle(path, query)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # a line for every request would cost more than the request
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default 5 drops connections of a burst
+
+
+class ThreadingUnixHTTPServer(
+    socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_server(address, service=None):
+    """return a server of the SunService on address
+
+    address is a (host, port) tuple for TCP, or the path of a Unix socket.
+    A socket file left at that path is replaced. Call serve_forever() to
+    run it, and shutdown(), server_close() and service.close() to stop"""
+    if isinstance(address, tuple):
+        server = ThreadingHTTPServer(address, SunRequestHandler)
+    else:
+        if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+            os.unlink(address)
+        server = ThreadingUnixHTTPServer(address, SunRequestHandler)
+    server.service = SunService() if service is None else service
+    return server
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """an http.client connection to a server on a Unix socket"""
+
+    def __init__(self, path, timeout=socket._GLOBAL_DEFAULT_TIMEOUT):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+def build_parser():
+    """return the argparse parser for python -m pysunnoaa.server"""
+    parser = argparse.ArgumentParser(
+        prog="python -m pysunnoaa.server",
+        description="Serve sun positions, sunrise and sunset as json",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="listen on this Unix socket instead")
+    parser.add_argument(
+        "--window",
+        type=float,
+        default=WINDOW,
+        help=f"seconds to gather a batch (default {WINDOW})",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=CACHE_SIZE,
+        help=f"answers kept in the cache (default {CACHE_SIZE})",
+    )
+    return parser
+
+
+def main(argv=None):
+    """run the server until it is interrupted"""
+    args = build_parser().parse_args(argv)
+    address = args.unix if args.unix else (args.host, args.port)
+    service = SunService(window=args.window, cache_size=args.cache_size)
+    server = make_server(address, service)
+    print(f"serving on {args.unix or f'http://{args.host}:{server.server_port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # pragma: no cover
@@ -0,0 +1,129 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""Sun positions for evenly spaced times, by stepping
+
+In a DateTimeRange the hour angle moves by the same angle (0.25 degrees a
+minute) from one time to the next, and the declination and the equation
+of time hardly move at all. sunpositions takes advantage of that, with
+no numpy:
+
+- the sine and cosine of the hour angle are turned by the step with a
+  rotation (two multiplications and an addition each) instead of being
+  computed,
+- the declination and the equation of time (noaa.sun_ephemeris) are
+  computed once every ``refresh`` steps, at the middle of those steps,
+- the hour angle is computed exactly again at the start of each refresh,
+  so rounding errors of the rotation can not build up.
+
+What is left for each time is a square root, an asin, an acos and the
+refraction. Largest errors against noaa.sunposition over 2024 at 40N 105W
+and 60N 25E (``atm_corr=False``, the sun above the horizon):
+
+======================== ============ ===========
+step, refresh            altitude deg azimuth deg
+======================== ============ ===========
+1 second, 60 (a minute)  1.4e-4       1.4e-4
+1 second, 600            1.4e-3       1.4e-3
+1 minute, 60 (an hour)   8.4e-3       8.6e-3
+1 minute, 1              1e-13        1e-8
+======================== ============ ===========
+
+The error grows with the time between refreshes (refresh times the
+step). A refresh every minute or so is well inside the accuracy of the
+NOAA equations."""
+
+import datetime
+import math
+
+from pysunnoaa import noaa
+
+DEGREES = 180 / math.pi
+
+
+def sunpositions(latitude, longitude, timezone, thedates, atm_corr=True, refresh=60):
+    """yield (altitude, azimuth) for all the times of the DateTimeRange thedates
+
+    The slow terms are computed every refresh steps (see the module
+    docstring for the errors)"""
+    if refresh < 1:
+        raise ValueError(f"refresh must be at least 1, not {refresh}")
+    radians = math.radians
+    sin = math.sin
+    cos = math.cos
+    sqrt = math.sqrt
+    asin = math.asin
+    acos = math.acos
+    tan = math.tan
+    latitude_rad = radians(latitude)
+    sin_latitude = sin(latitude_rad)
+    cos_latitude = cos(latitude_rad)
+    # the hour angle moves 360 degrees in a day
+    step_rad = radians(thedates.step / datetime.timedelta(days=1) * 360)
+    cos_step = cos(step_rad)
+    sin_step = sin(step_rad)
+    count = len(thedates)
+    for first in range(0, count, refresh):
+        steps = min(refresh, count - first)
+        middle = thedates[first + steps // 2]
+        declin, eqtime = noaa.sun_ephemeris(noaa.julianday(middle, timezone))
+        declin_rad = radians(declin)
+        sin_declin = sin(declin_rad)
+        cos_declin = cos(declin_rad)
+        thedate = thedates[first]
+        true_solar_time = (
+            noaa.datetime2dayfraction(thedate) * 1440
+            + eqtime
+            + 4 * longitude
+            - 60 * timezone
+        ) % 1440
+        hour_angle_rad = radians(true_solar_time / 4 - 180)
+        cos_hour = cos(hour_angle_rad)
+        sin_hour = sin(hour_angle_rad)
+        for _ in range(steps):
+            cos_zenith = (
+                sin_latitude * sin_declin + cos_latitude * cos_declin * cos_hour
+            )
+            if cos_zenith > 1.0:
+                cos_zenith = 1.0
+            elif cos_zenith < -1.0:
+                cos_zenith = -1.0
+            altitude_rad = asin(cos_zenith)
+            altitude = altitude_rad * DEGREES
+            temp1 = (sin_latitude * cos_zenith - sin_declin) / (
+                cos_latitude * sqrt(1.0 - cos_zenith * cos_zenith)
+            )
+            if temp1 > 1.0:
+                temp1 = 1.0
+            elif temp1 < -1.0:
+                temp1 = -1.0
+            if sin_hour > 0:
+                azimuth = (acos(temp1) * DEGREES + 180) % 360
+            else:
+                azimuth = (540 - acos(temp1) * DEGREES) % 360
+            if atm_corr:
+                if altitude > 85:
+                    refraction = 0
+                elif altitude > 5:
+                    tan_altitude = tan(altitude_rad)
+                    refraction = (
+                        58.1 / tan_altitude
+                        - 0.07 / tan_altitude**3
+                        + 0.000086 / tan_altitude**5
+                    )
+                elif altitude > -0.575:
+                    refraction = 1735 + altitude * (
+                        -518.2
+                        + altitude * (103.4 + altitude * (-12.79 + altitude * 0.711))
+                    )
+                else:
+                    refraction = -20.772 / tan(altitude_rad)
+                altitude += refraction / 3600
+            yield altitude, azimuth
+            cos_hour, sin_hour = (
+                cos_hour * cos_step - sin_hour * sin_step,
+                sin_hour * cos_step + cos_hour * sin_step,
+            )
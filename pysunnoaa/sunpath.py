@@ -0,0 +1,257 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""Curves for sun path diagrams (needs NumPy)
+
+A sun path diagram shows the analemma of each hour (where the sun is at
+that clock time on every day of a year) and the arc of the sun across the
+sky on a few dates, usually the solstices and equinoxes::
+
+    from pysunnoaa import sunpath
+
+    altitudes, azimuths = sunpath.analemmas(latitude, longitude, timezone, 2024)
+    altitudes, azimuths = sunpath.day_arcs(
+        latitude, longitude, timezone, sunpath.key_dates(2024)
+    )
+
+With one site the analemmas have the shape (hours, days) and the arcs
+(dates, times). With arrays of sites there is a first axis for the sites.
+``horizon=0`` (or any altitude) puts nan where the sun is below it, so
+that the plotted curves stop at the horizon.
+
+The positions are those of vnoaa.sunposition_grid, computed another way:
+the hour angle at a site is the hour angle of its timezone plus its
+longitude, so its sine and cosine are products of a term for the time and
+one for the site, and the altitude and azimuth come from the sun vector
+(see vnoaa.sunvector_array) with one arcsin and one arctan2. No other
+trigonometry is done for each (site, time). With a horizon the refraction
+is computed only near and above it. The results differ from sunposition
+in the last digits."""
+
+import collections
+import datetime
+
+import numpy as np
+
+from pysunnoaa import noaa, vnoaa
+
+HOURS = tuple(range(24))
+DAY_STEP = datetime.timedelta(minutes=10)
+
+SunPath = collections.namedtuple(
+    "SunPath",
+    [
+        "hours",
+        "days",
+        "analemma_altitudes",
+        "analemma_azimuths",
+        "dates",
+        "arc_times",
+        "arc_altitudes",
+        "arc_azimuths",
+    ],
+)
+
+
+def key_dates(year):
+    """return the dates of the equinoxes and solstices of year
+
+    These are the usual calendar dates (March 20, June 21, September 22
+    and December 21), which can be a day off the astronomical ones"""
+    return [
+        datetime.date(year, 3, 20),
+        datetime.date(year, 6, 21),
+        datetime.date(year, 9, 22),
+        datetime.date(year, 12, 21),
+    ]
+
+
+def _grid(latitudes, longitudes, timezones, seconds, atm_corr, horizon, dtype):
+    """return the arrays (altitude, azimuth) of shape (sites, times)"""
+    altitudes = np.empty((len(latitudes), len(seconds)), dtype=dtype)
+    azimuths = np.empty_like(altitudes)
+    chunksize = max(1, vnoaa.GRID_BLOCK // max(1, len(seconds)))
+    unique_timezones, inverse = np.unique(timezones, return_inverse=True)
+    # the same local times in whole hour timezones are mostly the same
+    # instants, so the ephemeris is computed once for each distinct instant
+    instants, index = np.unique(
+        seconds[np.newaxis, :] - unique_timezones[:, np.newaxis] * 3600,
+        return_inverse=True,
+    )
+    sun_declin_deg_values, eq_of_time_minutes_values = (
+        values[index].reshape(len(unique_timezones), len(seconds))
+        for values in vnoaa.sun_ephemeris(noaa.epoch2julianday(instants))
+    )
+    for number, timezone in enumerate(unique_timezones):
+        rows = np.flatnonzero(inverse == number)
+        sun_declin_deg_value = sun_declin_deg_values[number]
+        eq_of_time_minutes_value = eq_of_time_minutes_values[number]
+        declin_rad = np.radians(sun_declin_deg_value)
+        sin_declin = np.sin(declin_rad)
+        cos_declin = np.cos(declin_rad)
+        # the hour angle at longitude 0, in the timezone
+        hour_rad = np.radians(
+            vnoaa.hour_angle_deg(
+                vnoaa.true_solar_time_min(
+                    seconds, eq_of_time_minutes_value, 0, timezone
+                )
+            )
+        )
+        cos_hour = np.cos(hour_rad)
+        sin_hour = np.sin(hour_rad)
+        for start in range(0, len(rows), chunksize):
+            block = rows[start : start + chunksize]
+            latitude_rad = np.radians(latitudes[block, np.newaxis])
+            longitude_rad = np.radians(longitudes[block, np.newaxis])
+            sin_latitude = np.sin(latitude_rad)
+            cos_latitude = np.cos(latitude_rad)
+            sin_longitude = np.sin(longitude_rad)
+            cos_longitude = np.cos(longitude_rad)
+            # the sine and cosine of the hour angle plus the longitude
+            cos_declin_cos_hour = cos_declin * (
+                cos_hour * cos_longitude - sin_hour * sin_longitude
+            )
+            east = -cos_declin * (sin_hour * cos_longitude + cos_hour * sin_longitude)
+            north = cos_latitude * sin_declin - sin_latitude * cos_declin_cos_hour
+            up = sin_latitude * sin_declin + cos_latitude * cos_declin_cos_hour
+            altitude = np.degrees(np.arcsin(np.clip(up, -1, 1)))
+            if atm_corr and horizon is None:
+                altitude += vnoaa.approx_atmospheric_refraction_deg(altitude)
+            elif atm_corr:
+                # the refraction is less than 1 degree near the horizon and
+                # below, so the times further under it stay under it
+                near = altitude > horizon - 1
+                altitude[near] += vnoaa.approx_atmospheric_refraction_deg(
+                    altitude[near]
+                )
+            azimuth = np.mod(np.degrees(np.arctan2(east, north)), 360)
+            if horizon is not None:
+                below = altitude < horizon
+                altitude[below] = np.nan
+                azimuth[below] = np.nan
+            altitudes[block] = altitude
+            azimuths[block] = azimuth
+    return altitudes, azimuths
+
+
+def _sites(latitudes, longitudes, timezones):
+    """return the sites as three 1-d arrays and whether there is one site"""
+    onesite = not (np.ndim(latitudes) or np.ndim(longitudes) or np.ndim(timezones))
+    latitudes, longitudes, timezones = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(latitudes, dtype=np.float64)),
+        np.atleast_1d(np.asarray(longitudes, dtype=np.float64)),
+        np.atleast_1d(np.asarray(timezones, dtype=np.float64)),
+    )
+    return latitudes, longitudes, timezones, onesite
+
+
+def _times(days, offsets):
+    """return the datetime64 times of days (D,) plus offsets (N,), (D, N)"""
+    days = np.asarray(days, dtype="datetime64[D]").astype("datetime64[us]")
+    return days[:, np.newaxis] + offsets[np.newaxis, :]
+
+
+def analemmas(
+    latitudes,
+    longitudes,
+    timezones,
+    year,
+    hours=HOURS,
+    atm_corr=True,
+    horizon=None,
+    dtype=np.float64,
+):
+    """return the arrays (altitude, azimuth) of the analemma of each hour
+
+    hours are the local clock hours (they can have fractions). The arrays
+    have the shape (hours, days of year), with a first axis for the sites
+    when latitudes, longitudes or timezones are arrays. Below the altitude
+    horizon (if not None) the values are nan"""
+    latitudes, longitudes, timezones, onesite = _sites(latitudes, longitudes, timezones)
+    days = np.arange(f"{year}-01-01", f"{year + 1}-01-01", dtype="datetime64[D]")
+    offsets = np.round(np.asarray(hours, dtype=np.float64) * 3600e6).astype(
+        "timedelta64[us]"
+    )
+    # (hours, days), so each hour is one curve
+    times = _times(days, offsets).T
+    seconds = vnoaa.epochseconds(times.ravel())
+    altitudes, azimuths = _grid(
+        latitudes, longitudes, timezones, seconds, atm_corr, horizon, dtype
+    )
+    shape = (len(latitudes),) + times.shape
+    altitudes, azimuths = altitudes.reshape(shape), azimuths.reshape(shape)
+    if onesite:
+        return altitudes[0], azimuths[0]
+    return altitudes, azimuths
+
+
+def day_arcs(
+    latitudes,
+    longitudes,
+    timezones,
+    dates,
+    step=DAY_STEP,
+    atm_corr=True,
+    horizon=None,
+    dtype=np.float64,
+):
+    """return the arrays (altitude, azimuth) of the path of the sun on dates
+
+    Each date goes from midnight to midnight (both included) every step.
+    The arrays have the shape (dates, times of a day), with a first axis
+    for the sites when latitudes, longitudes or timezones are arrays.
+    Below the altitude horizon (if not None) the values are nan"""
+    latitudes, longitudes, timezones, onesite = _sites(latitudes, longitudes, timezones)
+    count = datetime.timedelta(days=1) // step + 1
+    offsets = np.arange(count) * np.timedelta64(step // noaa._MICROSECOND, "us")
+    times = _times(dates, offsets)
+    seconds = vnoaa.epochseconds(times.ravel())
+    altitudes, azimuths = _grid(
+        latitudes, longitudes, timezones, seconds, atm_corr, horizon, dtype
+    )
+    shape = (len(latitudes),) + times.shape
+    altitudes, azimuths = altitudes.reshape(shape), azimuths.reshape(shape)
+    if onesite:
+        return altitudes[0], azimuths[0]
+    return altitudes, azimuths
+
+
+def sunpath(
+    latitudes,
+    longitudes,
+    timezones,
+    year,
+    hours=HOURS,
+    dates=None,
+    step=DAY_STEP,
+    atm_corr=True,
+    horizon=0,
+    dtype=np.float64,
+):
+    """return the SunPath of everything a sun path diagram of year needs
+
+    The analemmas of hours and the day arcs of dates (by default the
+    key_dates of year), cut at the horizon, with the days and the times of
+    day (as datetime64) that go with them"""
+    if dates is None:
+        dates = key_dates(year)
+    analemma_altitudes, analemma_azimuths = analemmas(
+        latitudes, longitudes, timezones, year, hours, atm_corr, horizon, dtype
+    )
+    arc_altitudes, arc_azimuths = day_arcs(
+        latitudes, longitudes, timezones, dates, step, atm_corr, horizon, dtype
+    )
+    count = datetime.timedelta(days=1) // step + 1
+    return SunPath(
+        np.asarray(hours),
+        np.arange(f"{year}-01-01", f"{year + 1}-01-01", dtype="datetime64[D]"),
+        analemma_altitudes,
+        analemma_azimuths,
+        np.asarray(dates, dtype="datetime64[D]"),
+        np.arange(count) * np.timedelta64(step // noaa._MICROSECOND, "us"),
+        arc_altitudes,
+        arc_azimuths,
+    )
@@ -0,0 +1,206 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""Precomputed sun position tables on disk
+
+write computes the sun positions of one site over a range of times and
+saves them in a binary file. SunTable opens the file with numpy.memmap,
+so reading it again costs page-ins instead of trig, and only the pages
+that are used are read. The times are evenly spaced, so the row of a
+datetime is found with arithmetic, not a search.
+
+The file is a 64 byte little endian header followed by two columns,
+altitude then azimuth, of float32 or float64:
+
+====== ======= ==================================================
+bytes  type    value
+====== ======= ==================================================
+0-7    8s      MAGIC
+8-9    uint16  VERSION
+10-11  uint16  itemsize of the columns, 4 or 8
+12-15  uint32  flags, bit 0 is atm_corr
+16-39  3 x f8  latitude, longitude, timezone
+40-63  3 x i8  start (local time, microseconds since 1970-01-01),
+               step (microseconds), number of rows
+====== ======= ==================================================
+
+Needs numpy."""
+
+import datetime
+import struct
+
+import numpy as np
+
+from pysunnoaa import noaa, vnoaa
+
+MAGIC = b"PSUNTBL\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sHHI3d3q")
+ATM_CORR = 1
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _microseconds(thedate):
+    # local wall-clock times, the offset of an aware datetime is dropped
+    return (thedate.replace(tzinfo=None) - _EPOCH) // _MICROSECOND
+
+
+def write(
+    path,
+    latitude,
+    longitude,
+    timezone,
+    start,
+    stop,
+    step=datetime.timedelta(minutes=1),
+    dtype=np.float32,
+    atm_corr=True,
+    chunksize=noaa.VECTORIZE_CHUNK,
+):
+    """compute the sun positions from start to stop and save them in path
+
+    The times are noaa.DateTimeRange(start, stop, step) in local time. The
+    positions are computed chunksize times at a time, so the memory used
+    does not grow with the range. Return the SunTable of the file"""
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"dtype must be float32 or float64, not {dtype}")
+    if step <= datetime.timedelta(0):
+        raise ValueError("step must be positive")
+    thedates = noaa.DateTimeRange(start, stop, step)
+    count = len(thedates)
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        dtype.itemsize,
+        ATM_CORR if atm_corr else 0,
+        latitude,
+        longitude,
+        timezone,
+        _microseconds(start),
+        step // _MICROSECOND,
+        count,
+    )
+    with open(path, "wb") as tablefile:
+        tablefile.write(header)
+        tablefile.truncate(HEADER.size + 2 * count * dtype.itemsize)
+    if count:
+        columns = np.memmap(
+            path,
+            dtype=dtype.newbyteorder("<"),
+            mode="r+",
+            offset=HEADER.size,
+            shape=(2, count),
+        )
+        for first in range(0, count, chunksize):
+            chunk = thedates[first : first + chunksize]
+            altitudes, azimuths = vnoaa.sunposition_array(
+                latitude, longitude, timezone, chunk.to_numpy(epoch=True), atm_corr
+            )
+            columns[0, first : first + len(chunk)] = altitudes
+            columns[1, first : first + len(chunk)] = azimuths
+        columns.flush()
+        del columns
+    return SunTable(path)
+
+
+class SunTable:
+    """a sun position table written by write, opened with numpy.memmap
+
+    altitude and azimuth are read-only memmap arrays, one row per time of
+    thedates. Nothing is read from the file until it is used"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as tablefile:
+            header = tablefile.read(HEADER.size)
+        if len(header) < HEADER.size or header[:8] != MAGIC:
+            raise ValueError(f"{path} is not a sun position table")
+        (
+            _,
+            version,
+            itemsize,
+            flags,
+            self.latitude,
+            self.longitude,
+            self.timezone,
+            self._start_us,
+            self._step_us,
+            count,
+        ) = HEADER.unpack(header)
+        if version != VERSION:
+            raise ValueError(f"{path} has table version {version}, not {VERSION}")
+        self.atm_corr = bool(flags & ATM_CORR)
+        self.dtype = np.dtype(f"<f{itemsize}")
+        if count:
+            columns = np.memmap(
+                path, dtype=self.dtype, mode="r", offset=HEADER.size, shape=(2, count)
+            )
+        else:
+            columns = np.empty((2, 0), dtype=self.dtype)
+        self.altitude, self.azimuth = columns
+
+    @property
+    def start(self):
+        return _EPOCH + datetime.timedelta(microseconds=self._start_us)
+
+    @property
+    def step(self):
+        return datetime.timedelta(microseconds=self._step_us)
+
+    @property
+    def thedates(self):
+        """the noaa.DateTimeRange of the rows"""
+        return noaa.DateTimeRange(
+            self.start, self.start + len(self) * self.step, self.step
+        )
+
+    def __len__(self):
+        return len(self.altitude)
+
+    def __repr__(self):
+        return (
+            f"SunTable({self.path!r}, latitude={self.latitude},"
+            f" longitude={self.longitude}, timezone={self.timezone},"
+            f" start={self.start!r}, step={self.step!r}, rows={len(self)})"
+        )
+
+    def index(self, thedate):
+        """return the row of thedate, or of the last time before it
+
+        Raise an IndexError when thedate is outside the table"""
+        row = (_microseconds(thedate) - self._start_us) // self._step_us
+        if not 0 <= row < len(self):
+            raise IndexError(f"{thedate} is not in the table {self!r}")
+        return row
+
+    def indices(self, thedates):
+        """the array of rows for an array of datetimes, as in index"""
+        microseconds = vnoaa._datetime64(thedates).astype(np.int64)
+        rows = (microseconds - self._start_us) // self._step_us
+        if rows.size and (rows.min() < 0 or rows.max() >= len(self)):
+            raise IndexError(f"some of the datetimes are not in the table {self!r}")
+        return rows
+
+    def sunposition(self, thedate):
+        """return (altitude, azimuth) at thedate, as in index"""
+        row = self.index(thedate)
+        return float(self.altitude[row]), float(self.azimuth[row])
+
+    def sunpositions(self, thedates):
+        """return (altitudes, azimuths) arrays for an array of datetimes"""
+        rows = self.indices(thedates)
+        return self.altitude[rows], self.azimuth[rows]
+
+    def between(self, start, stop):
+        """return (altitudes, azimuths) views of the rows from start to stop
+
+        No data is copied"""
+        first = max(0, -(-(_microseconds(start) - self._start_us) // self._step_us))
+        last = max(0, -(-(_microseconds(stop) - self._start_us) // self._step_us))
+        return self.altitude[first:last], self.azimuth[first:last]
@@ -0,0 +1,155 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""Cached sunrise, sunset and solar noon
+
+A service that is asked "when is sunrise here today" for the same few
+sites again and again can look the answer up instead of computing it.
+SunTimesCache keeps noaa.sun_times in a bounded LRU cache keyed on
+(latitude, longitude, timezone, date), with the latitude and longitude
+rounded to ``digits`` decimal places. It can be shared between threads.
+
+A cached day is computed once, for local midnight of the date at the
+rounded coordinates, so the answer does not depend on which call filled
+the cache. With the default digits=4 the rounding moves the times by less
+than 0.1 seconds. noaa.sunrise and noaa.sunset use the time of day of
+thedate as well, so they can differ from the cached times by up to a
+minute or so. Pass cache=False (or call noaa directly) for those.
+
+The module functions use the shared cache ``default``. Replace it to
+change its size::
+
+    suntimes.default = suntimes.SunTimesCache(maxsize=100_000)"""
+
+import datetime
+import math
+
+from pysunnoaa import noaa
+from pysunnoaa.lru import LRUCache
+
+
+class SunTimesCache:
+    """noaa.sun_times cached per site and calendar date
+
+    maxsize is the number of (site, date) entries kept. digits is the
+    number of decimal places the latitude and longitude are rounded to in
+    the key"""
+
+    def __init__(self, maxsize=4096, digits=4):
+        self.digits = digits
+        self.cache = LRUCache(maxsize)
+
+    @property
+    def hits(self):
+        return self.cache.hits
+
+    @property
+    def misses(self):
+        return self.cache.misses
+
+    def clear(self):
+        """empty the cache and reset hits and misses"""
+        self.cache.clear()
+
+    def key(self, latitude, longitude, timezone, thedate):
+        """return the cache key for the site and the date of thedate"""
+        if isinstance(thedate, datetime.datetime):
+            thedate = thedate.date()
+        return (
+            round(latitude, self.digits),
+            round(longitude, self.digits),
+            timezone,
+            thedate,
+        )
+
+    def _lookup(self, latitude, longitude, timezone, thedate):
+        """return (SunTimes with polar="clip", status) from the cache"""
+        key = self.key(latitude, longitude, timezone, thedate)
+        values = self.cache.get(key)
+        if values is None:
+            latitude, longitude, timezone, date = key
+            midnight = datetime.datetime.combine(date, datetime.time())
+            values = noaa.sun_times(
+                latitude, longitude, timezone, midnight, polar="clip", status=True
+            )
+            self.cache.put(key, values)
+        return values
+
+    def sun_times(
+        self, latitude, longitude, timezone, thedate, polar="raise", status=False
+    ):
+        """same as noaa.sun_times, from the cache"""
+        if polar not in noaa.POLAR_MODES:
+            raise ValueError(f"polar must be one of {noaa.POLAR_MODES}, not {polar!r}")
+        result, day_status = self._lookup(latitude, longitude, timezone, thedate)
+        if day_status != noaa.NORMAL:
+            if polar == "raise":
+                raise ValueError(
+                    f"the sun does not rise or set at latitude {latitude} on {thedate}"
+                )
+            if polar == "nan":
+                result = noaa.SunTimes(None, None, result.solar_noon, math.nan)
+        return (result, day_status) if status else result
+
+    def sunrise(self, latitude, longitude, timezone, thedate):
+        """same as noaa.sunrise, from the cache"""
+        return self.sun_times(latitude, longitude, timezone, thedate).sunrise
+
+    def sunset(self, latitude, longitude, timezone, thedate):
+        """same as noaa.sunset, from the cache"""
+        return self.sun_times(latitude, longitude, timezone, thedate).sunset
+
+    def solar_noon(self, latitude, longitude, timezone, thedate):
+        """return the datetime of solar noon, from the cache"""
+        result, _ = self._lookup(latitude, longitude, timezone, thedate)
+        return result.solar_noon
+
+
+default = SunTimesCache()
+
+
+def sun_times(
+    latitude, longitude, timezone, thedate, polar="raise", status=False, cache=True
+):
+    """noaa.sun_times from the default cache
+
+    cache=False bypasses the cache and returns noaa.sun_times"""
+    if not cache:
+        return noaa.sun_times(
+            latitude, longitude, timezone, thedate, polar=polar, status=status
+        )
+    return default.sun_times(
+        latitude, longitude, timezone, thedate, polar=polar, status=status
+    )
+
+
+def sunrise(latitude, longitude, timezone, thedate, cache=True):
+    """noaa.sunrise from the default cache
+
+    cache=False bypasses the cache and returns noaa.sunrise"""
+    if not cache:
+        return noaa.sunrise(latitude, longitude, timezone, thedate)
+    return default.sunrise(latitude, longitude, timezone, thedate)
+
+
+def sunset(latitude, longitude, timezone, thedate, cache=True):
+    """noaa.sunset from the default cache
+
+    cache=False bypasses the cache and returns noaa.sunset"""
+    if not cache:
+        return noaa.sunset(latitude, longitude, timezone, thedate)
+    return default.sunset(latitude, longitude, timezone, thedate)
+
+
+def solar_noon(latitude, longitude, timezone, thedate, cache=True):
+    """the datetime of solar noon from the default cache
+
+    cache=False bypasses the cache"""
+    if not cache:
+        return noaa.sun_times(
+            latitude, longitude, timezone, thedate, polar="clip"
+        ).solar_noon
+    return default.solar_noon(latitude, longitude, timezone, thedate)
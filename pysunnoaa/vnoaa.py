@@ -0,0 +1,580 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""Vectorized (NumPy) versions of the cells in noaa.py
+
+Every cell takes and returns arrays, so a whole time series is computed in
+one pass. The cells that are plain arithmetic in noaa.py already work on
+arrays and are reused as they are. The cells that call ``math`` or branch
+on their input are rewritten here with the same names and arguments.
+
+Times are naive local times, the same as in noaa.py. They can be given as
+``datetime64`` arrays, as sequences of ``datetime.datetime`` or as seconds
+since 1970-01-01 00:00:00 (local time)."""
+
+import numpy as np
+
+from pysunnoaa import noaa
+
+juliancentury = noaa.juliancentury  # 2. g2
+geom_mean_long_sun_deg = noaa.geom_mean_long_sun_deg  # 3. i2
+geom_mean_anom_sun_deg = noaa.geom_mean_anom_sun_deg  # 4. j2
+eccent_earth_orbit = noaa.eccent_earth_orbit  # 5. k2
+sun_true_long_deg = noaa.sun_true_long_deg  # 7. m2
+sun_true_anom_deg = noaa.sun_true_anom_deg  # 8. n2
+mean_obliq_ecliptic_deg = noaa.mean_obliq_ecliptic_deg  # 11. q2
+solar_noon_lst = noaa.solar_noon_lst  # 18. x2
+sunrise_time_lst = noaa.sunrise_time_lst  # 19. y2
+sunset_time_lst = noaa.sunset_time_lst  # 20. z2
+sunlight_duration_minutes = noaa.sunlight_duration_minutes  # 21. aa2
+solar_elevation_angle_deg = noaa.solar_elevation_angle_deg  # 25. ae2
+solar_elevation_corrected_for_atm_refraction_deg = (
+    noaa.solar_elevation_corrected_for_atm_refraction_deg
+)  # 27. ag2
+
+
+def _naive(thedate):
+    """return thedate without its tzinfo"""
+    if getattr(thedate, "tzinfo", None) is not None:
+        return thedate.replace(tzinfo=None)
+    return thedate
+
+
+def _datetime64(thedates):
+    """return the local times thedates as a datetime64[us] array
+
+    thedates can be a datetime64 array, a noaa.DateTimeRange or a sequence
+    of datetime.datetime, naive or aware"""
+    if isinstance(thedates, noaa.DateTimeRange):
+        return thedates.to_numpy()
+    arr = np.asarray(thedates)
+    if arr.dtype.kind == "O":
+        # local wall-clock times, numpy would convert aware datetimes to UTC
+        arr = np.array(
+            [_naive(thedate) for thedate in arr.ravel()], dtype="datetime64[us]"
+        ).reshape(arr.shape)
+    return arr.astype("datetime64[us]")
+
+
+def epochseconds(thedates):
+    """return the times as float seconds since 1970-01-01 00:00:00
+
+    thedates can be a datetime64 array, a noaa.DateTimeRange, a sequence of
+    datetime.datetime or numbers that already are epoch seconds"""
+    if isinstance(thedates, noaa.DateTimeRange):
+        return thedates.to_numpy(epoch=True)
+    arr = np.asarray(thedates)
+    if arr.dtype.kind in "OM":
+        return _datetime64(arr).astype(np.int64) / 1e6
+    return arr.astype(np.float64)
+
+
+def julianday(thedates, timezone=0):
+    """return the julian day for the local times
+
+    1. f2"""
+    return noaa.epoch2julianday(epochseconds(thedates), timezone)
+
+
+def sun_eq_of_ctr(juliancentury_value, geom_mean_anom_sun_deg_value):
+    """6. l2"""
+    g2 = juliancentury_value
+    j2 = np.radians(geom_mean_anom_sun_deg_value)
+    sin_j2 = np.sin(j2)
+    cos_j2 = np.cos(j2)
+    # sin(2x) and sin(3x) from sin(x) and cos(x), saves two trig calls
+    sin_2j2 = 2 * sin_j2 * cos_j2
+    sin_3j2 = sin_j2 * (3 - 4 * sin_j2 * sin_j2)
+    return (
+        sin_j2 * (1.914602 - g2 * (0.004817 + 0.000014 * g2))
+        + sin_2j2 * (0.019993 - 0.000101 * g2)
+        + sin_3j2 * 0.000289
+    )
+
+
+def sun_rad_vector_AUs(eccent_earth_orbit_value, sun_true_anom_deg_value):
+    """9. o2"""
+    k2 = eccent_earth_orbit_value
+    n2 = sun_true_anom_deg_value
+    return (1.000001018 * (1 - k2 * k2)) / (1 + k2 * np.cos(np.radians(n2)))
+
+
+def sun_app_long_deg(juliancentury_value, sun_true_long_deg_value):
+    """10. p2"""
+    g2 = juliancentury_value
+    m2 = sun_true_long_deg_value
+    return m2 - 0.00569 - 0.00478 * np.sin(np.radians(125.04 - 1934.136 * g2))
+
+
+def obliq_corr_deg(juliancentury_value, mean_obliq_ecliptic_deg_value):
+    """12. r2"""
+    g2 = juliancentury_value
+    q2 = mean_obliq_ecliptic_deg_value
+    return q2 + 0.00256 * np.cos(np.radians(125.04 - 1934.136 * g2))
+
+
+def sun_rt_ascen_deg(sun_app_long_deg_value, obliq_corr_deg_value):
+    """13. s2"""
+    p2 = np.radians(sun_app_long_deg_value)
+    r2 = np.radians(obliq_corr_deg_value)
+    return np.degrees(np.arctan2(np.cos(r2) * np.sin(p2), np.cos(p2)))
+
+
+def sun_declin_deg(sun_app_long_deg_value, obliq_corr_deg_value):
+    """14. t2"""
+    p2 = np.radians(sun_app_long_deg_value)
+    r2 = np.radians(obliq_corr_deg_value)
+    return np.degrees(np.arcsin(np.sin(r2) * np.sin(p2)))
+
+
+def var_y(obliq_corr_deg_value):
+    """15. u2"""
+    r2 = obliq_corr_deg_value
+    tan_half = np.tan(np.radians(r2 / 2))
+    return tan_half * tan_half
+
+
+def eq_of_time_minutes(
+    geom_mean_long_sun_deg_value,
+    geom_mean_anom_sun_deg_value,
+    eccent_earth_orbit_value,
+    var_y_value,
+):
+    """16. v2"""
+    i2 = np.radians(geom_mean_long_sun_deg_value)
+    j2 = np.radians(geom_mean_anom_sun_deg_value)
+    k2 = eccent_earth_orbit_value
+    u2 = var_y_value
+    sin_j2 = np.sin(j2)
+    sin_2i2 = np.sin(2 * i2)
+    cos_2i2 = np.cos(2 * i2)
+    # sin(4x) and sin(2x) by the double angle rule, saves two trig calls
+    sin_4i2 = 2 * sin_2i2 * cos_2i2
+    sin_2j2 = 2 * sin_j2 * np.cos(j2)
+    return 4 * np.degrees(
+        u2 * sin_2i2
+        - 2 * k2 * sin_j2
+        + 4 * k2 * u2 * sin_j2 * cos_2i2
+        - 0.5 * u2 * u2 * sin_4i2
+        - 1.25 * k2 * k2 * sin_2j2
+    )
+
+
+def ha_sunrise_cos(latitude, sun_declin_deg_value):
+    """vectorized noaa.ha_sunrise_cos"""
+    fixed_b3 = np.radians(latitude)
+    t2 = np.radians(sun_declin_deg_value)
+    return np.cos(np.radians(90.833)) / (np.cos(fixed_b3) * np.cos(t2)) - np.tan(
+        fixed_b3
+    ) * np.tan(t2)
+
+
+def polar_status(ha_sunrise_cos_value):
+    """vectorized noaa.polar_status, as an int8 array"""
+    return np.select(
+        [ha_sunrise_cos_value > 1, ha_sunrise_cos_value < -1],
+        [noaa.POLAR_NIGHT, noaa.POLAR_DAY],
+        noaa.NORMAL,
+    ).astype(np.int8)
+
+
+def ha_sunrise_deg(latitude, sun_declin_deg_value):
+    """17. w2
+
+    nan when the sun does not rise or set that day"""
+    with np.errstate(invalid="ignore"):
+        return np.degrees(np.arccos(ha_sunrise_cos(latitude, sun_declin_deg_value)))
+
+
+def true_solar_time_min(thedates, eq_of_time_minutes_value, longitude, timezone):
+    """22. ab2"""
+    e2 = np.mod(epochseconds(thedates), 86400) / 86400
+    v2 = eq_of_time_minutes_value
+    fixed_b4 = longitude
+    fixed_b5 = timezone
+    return np.mod(e2 * 1440 + v2 + 4 * fixed_b4 - 60 * fixed_b5, 1440)
+
+
+def hour_angle_deg(true_solar_time_min_value):
+    """23. ac2"""
+    quarter = np.asarray(true_solar_time_min_value) / 4
+    return np.where(quarter < 0, quarter + 180, quarter - 180)
+
+
+def solar_zenith_angle_deg(latitude, sun_declin_deg_value, hour_angle_deg_value):
+    """24. ad2"""
+    fixed_b3 = np.radians(latitude)
+    t2 = np.radians(sun_declin_deg_value)
+    ac2 = np.radians(hour_angle_deg_value)
+    cos_t2 = np.cos(t2)
+    cos_zenith = np.sin(fixed_b3) * np.sin(t2) + np.cos(fixed_b3) * cos_t2 * np.cos(ac2)
+    return np.degrees(np.arccos(np.clip(cos_zenith, -1, 1)))
+
+
+def approx_atmospheric_refraction_deg(solar_elevation_angle_deg_value):
+    """26. af2"""
+    ae2 = np.asarray(solar_elevation_angle_deg_value, dtype=np.float64)
+    result = np.zeros_like(ae2)
+    # each branch is evaluated only on the elements that take it
+    high = (ae2 > 5) & (ae2 <= 85)
+    low = (ae2 > -0.575) & (ae2 <= 5)
+    below = ae2 <= -0.575
+    inv_tan = 1 / np.tan(np.radians(ae2[high]))
+    inv_tan2 = inv_tan * inv_tan
+    result[high] = inv_tan * (58.1 - inv_tan2 * (0.07 - 0.000086 * inv_tan2))
+    e = ae2[low]
+    result[low] = 1735 + e * (-518.2 + e * (103.4 + e * (-12.79 + e * 0.711)))
+    result[below] = -20.772 / np.tan(np.radians(ae2[below]))
+    return result / 3600
+
+
+def solar_azimuth_angle_deg_cw_from_n(
+    latitude, hour_angle_deg_value, solar_zenith_angle_deg_value, sun_declin_deg_value
+):
+    """28. ah2"""
+    fixed_b3 = np.radians(latitude)
+    ac2 = hour_angle_deg_value
+    ad2 = np.radians(solar_zenith_angle_deg_value)
+    t2 = np.radians(sun_declin_deg_value)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        temp1 = ((np.sin(fixed_b3) * np.cos(ad2)) - np.sin(t2)) / (
+            np.cos(fixed_b3) * np.sin(ad2)
+        )
+    acos_deg = np.degrees(np.arccos(np.clip(temp1, -1, 1)))
+    return np.where(ac2 > 0, np.mod(acos_deg + 180, 360), np.mod(540 - acos_deg, 360))
+
+
+def sun_ephemeris(jul_day):
+    """vectorized noaa.sun_ephemeris
+
+    return the arrays (sun_declin_deg, eq_of_time_minutes)"""
+    juliancentury_value = juliancentury(jul_day)
+    geom_mean_long_sun_deg_value = geom_mean_long_sun_deg(juliancentury_value)
+    geom_mean_anom_sun_deg_value = geom_mean_anom_sun_deg(juliancentury_value)
+    eccent_earth_orbit_value = eccent_earth_orbit(juliancentury_value)
+    mean_obliq_ecliptic_deg_value = mean_obliq_ecliptic_deg(juliancentury_value)
+    obliq_corr_deg_value = obliq_corr_deg(
+        juliancentury_value, mean_obliq_ecliptic_deg_value
+    )
+    var_y_value = var_y(obliq_corr_deg_value)
+    eq_of_time_minutes_value = eq_of_time_minutes(
+        geom_mean_long_sun_deg_value,
+        geom_mean_anom_sun_deg_value,
+        eccent_earth_orbit_value,
+        var_y_value,
+    )
+    sun_eq_of_ctr_value = sun_eq_of_ctr(
+        juliancentury_value, geom_mean_anom_sun_deg_value
+    )
+    sun_true_long_deg_value = sun_true_long_deg(
+        geom_mean_long_sun_deg_value, sun_eq_of_ctr_value
+    )
+    sun_app_long_deg_value = sun_app_long_deg(
+        juliancentury_value, sun_true_long_deg_value
+    )
+    sun_declin_deg_value = sun_declin_deg(sun_app_long_deg_value, obliq_corr_deg_value)
+    return sun_declin_deg_value, eq_of_time_minutes_value
+
+
+def sunposition_from_ephemeris(
+    latitude,
+    longitude,
+    timezone,
+    thedates,
+    sun_declin_deg_value,
+    eq_of_time_minutes_value,
+    atm_corr=True,
+):
+    """vectorized noaa.sunposition_from_ephemeris
+
+    The arguments broadcast against each other, so a column of sites
+    against a row of times gives a (sites, times) result"""
+    true_solar_time_min_value = true_solar_time_min(
+        thedates, eq_of_time_minutes_value, longitude, timezone
+    )
+    hour_angle_deg_value = hour_angle_deg(true_solar_time_min_value)
+    solar_zenith_angle_deg_value = solar_zenith_angle_deg(
+        latitude, sun_declin_deg_value, hour_angle_deg_value
+    )
+    solar_elevation_angle_deg_value = solar_elevation_angle_deg(
+        solar_zenith_angle_deg_value
+    )
+    sunazm = solar_azimuth_angle_deg_cw_from_n(
+        latitude,
+        hour_angle_deg_value,
+        solar_zenith_angle_deg_value,
+        sun_declin_deg_value,
+    )
+    if atm_corr:
+        approx_atmospheric_refraction_deg_value = approx_atmospheric_refraction_deg(
+            solar_elevation_angle_deg_value
+        )
+        sunalt = solar_elevation_corrected_for_atm_refraction_deg(
+            solar_elevation_angle_deg_value, approx_atmospheric_refraction_deg_value
+        )
+        return sunalt, sunazm
+    else:
+        return solar_elevation_angle_deg_value, sunazm
+
+
+def sunposition_array(latitude, longitude, timezone, thedates, atm_corr=True):
+    """return the arrays (altitude, azimuth) for all the times in thedates
+
+    This is the vectorized version of noaa.sunposition"""
+    seconds = epochseconds(thedates)
+    sun_declin_deg_value, eq_of_time_minutes_value = sun_ephemeris(
+        noaa.epoch2julianday(seconds, timezone)
+    )
+    return sunposition_from_ephemeris(
+        latitude,
+        longitude,
+        timezone,
+        seconds,
+        sun_declin_deg_value,
+        eq_of_time_minutes_value,
+        atm_corr=atm_corr,
+    )
+
+
+def sunvector_from_ephemeris(
+    latitude,
+    longitude,
+    timezone,
+    thedates,
+    sun_declin_deg_value,
+    eq_of_time_minutes_value,
+    atm_corr=True,
+    dtype=np.float64,
+):
+    """vectorized noaa.sunvector_from_ephemeris
+
+    return a C-contiguous array of the broadcast shape of the arguments
+    plus a last axis of 3 for (east, north, up)"""
+    hour_angle_rad = np.radians(
+        hour_angle_deg(
+            true_solar_time_min(thedates, eq_of_time_minutes_value, longitude, timezone)
+        )
+    )
+    latitude_rad = np.radians(latitude)
+    declin_rad = np.radians(sun_declin_deg_value)
+    sin_latitude = np.sin(latitude_rad)
+    cos_latitude = np.cos(latitude_rad)
+    sin_declin = np.sin(declin_rad)
+    cos_declin = np.cos(declin_rad)
+    cos_declin_cos_hour = cos_declin * np.cos(hour_angle_rad)
+    east = -cos_declin * np.sin(hour_angle_rad)
+    north = cos_latitude * sin_declin - sin_latitude * cos_declin_cos_hour
+    up = sin_latitude * sin_declin + cos_latitude * cos_declin_cos_hour
+    east, north, up = np.broadcast_arrays(east, north, up)
+    if atm_corr:
+        altitude = np.degrees(np.arcsin(np.clip(up, -1, 1)))
+        altitude_rad = np.radians(
+            altitude + approx_atmospheric_refraction_deg(altitude)
+        )
+        horizontal = np.hypot(east, north)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(horizontal > 0, np.cos(altitude_rad) / horizontal, 1.0)
+        east = east * scale
+        north = north * scale
+        up = np.sin(altitude_rad)
+    result = np.empty(east.shape + (3,), dtype=dtype)
+    result[..., 0] = east
+    result[..., 1] = north
+    result[..., 2] = up
+    return result
+
+
+def sunvector_array(
+    latitude, longitude, timezone, thedates, atm_corr=True, dtype=np.float64
+):
+    """return the sun unit vectors for all the times in thedates
+
+    The result is a C-contiguous (N, 3) array of (east, north, up) of the
+    given dtype, ready for ray casting. This is the vectorized version of
+    noaa.sunvector. It does not compute the azimuth, so it is faster than
+    sunposition_array followed by a conversion of the angles"""
+    seconds = np.ravel(epochseconds(thedates))
+    sun_declin_deg_value, eq_of_time_minutes_value = sun_ephemeris(
+        noaa.epoch2julianday(seconds, timezone)
+    )
+    return sunvector_from_ephemeris(
+        latitude,
+        longitude,
+        timezone,
+        seconds,
+        sun_declin_deg_value,
+        eq_of_time_minutes_value,
+        atm_corr=atm_corr,
+        dtype=dtype,
+    )
+
+
+# number of (site, time) elements computed at once by sunposition_grid
+GRID_BLOCK = 1 << 18
+
+
+def sunposition_grid(
+    latitudes,
+    longitudes,
+    timezones,
+    thedates,
+    atm_corr=True,
+    dtype=np.float64,
+    chunksize=None,
+):
+    """return the arrays (altitude, azimuth) of shape (sites, times)
+
+    latitudes, longitudes and timezones have one value per site (or one
+    value for all sites). thedates are local times, the same for every site.
+    The ephemeris is computed once for each distinct timezone and shared by
+    its sites. The sites are computed chunksize at a time (by default about
+    GRID_BLOCK elements), so memory stays small for large grids.
+    The results are C-contiguous arrays of the given dtype"""
+    latitudes, longitudes, timezones = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(latitudes, dtype=np.float64)),
+        np.atleast_1d(np.asarray(longitudes, dtype=np.float64)),
+        np.atleast_1d(np.asarray(timezones, dtype=np.float64)),
+    )
+    seconds = epochseconds(thedates)
+    shape = (len(latitudes), len(seconds))
+    altitudes = np.empty(shape, dtype=dtype)
+    azimuths = np.empty(shape, dtype=dtype)
+    if chunksize is None:
+        chunksize = max(1, GRID_BLOCK // max(1, len(seconds)))
+    for timezone in np.unique(timezones):
+        rows = np.flatnonzero(timezones == timezone)
+        sun_declin_deg_value, eq_of_time_minutes_value = sun_ephemeris(
+            noaa.epoch2julianday(seconds, timezone)
+        )
+        for start in range(0, len(rows), chunksize):
+            block = rows[start : start + chunksize]
+            sunalt, sunazm = sunposition_from_ephemeris(
+                latitudes[block, np.newaxis],
+                longitudes[block, np.newaxis],
+                timezone,
+                seconds,
+                sun_declin_deg_value,
+                eq_of_time_minutes_value,
+                atm_corr=atm_corr,
+            )
+            altitudes[block] = sunalt
+            azimuths[block] = sunazm
+    return altitudes, azimuths
+
+
+def dayfraction2datetime64(dayfraction, thedates):
+    """return midnight of thedates plus the dayfraction, as datetime64[us]
+
+    nan in dayfraction gives NaT"""
+    midnight = _datetime64(thedates).astype("datetime64[D]").astype("datetime64[us]")
+    dayfraction = np.asarray(dayfraction)
+    isnan = np.isnan(dayfraction)
+    microseconds = np.round(np.where(isnan, 0, dayfraction) * 86400e6)
+    result = midnight + microseconds.astype(np.int64).astype("timedelta64[us]")
+    result[isnan] = np.datetime64("NaT")
+    return result
+
+
+def daylight_mask(latitude, longitude, timezone, thedates, margin_seconds=600):
+    """return a bool array, True for the times in daylight
+
+    A time is in daylight when it is between margin_seconds before the
+    sunrise and margin_seconds after the sunset of its local day (or of
+    the day before or after, for a sunset after midnight), or on a polar
+    day. The sunrise and sunset are computed once for each midnight, and
+    the window of a day covers those of both its midnights"""
+    seconds = epochseconds(thedates)
+    if seconds.size == 0:
+        return np.zeros(seconds.shape, dtype=bool)
+    days = np.floor(seconds / 86400)
+    first = days.min() - 1
+    daynumbers = np.arange(first, days.max() + 3)
+    midnights = (daynumbers * 86400).astype(np.int64).astype("datetime64[s]")
+    times, day_status = sun_times(
+        latitude, longitude, timezone, midnights, polar="clip", status=True
+    )
+    # seconds from the midnight of their date, a polar day covers the date
+    sunrises = epochseconds(times.sunrise) - daynumbers * 86400
+    sunsets = epochseconds(times.sunset) - daynumbers * 86400
+    polar_day = day_status == noaa.POLAR_DAY
+    sunrises[polar_day] = np.minimum(sunrises[polar_day], 0)
+    sunsets[polar_day] = np.maximum(sunsets[polar_day], 86400)
+    daystarts = daynumbers[:-1] * 86400
+    starts = daystarts + np.minimum(sunrises[:-1], sunrises[1:]) - margin_seconds
+    stops = daystarts + np.maximum(sunsets[:-1], sunsets[1:]) + margin_seconds
+    index = (days - first).astype(np.intp)
+    mask = np.zeros(seconds.shape, dtype=bool)
+    for shift in (-1, 0, 1):
+        mask |= (seconds >= starts[index + shift]) & (seconds <= stops[index + shift])
+    return mask
+
+
+def sun_times(latitudes, longitudes, timezones, thedates, polar="nan", status=False):
+    """vectorized noaa.sun_times for sites and dates
+
+    return noaa.SunTimes of arrays. sunrise, sunset and solar_noon are
+    datetime64[us], sunlight_duration_minutes is float. With one value of
+    latitudes, longitudes and timezones the arrays have the shape of
+    thedates (D,). With arrays of sites (S,) they have the shape (S, D).
+    The ephemeris is computed once for each distinct timezone.
+
+    polar says what to do when the sun does not rise or set: "nan" gives
+    NaT times and a nan duration, "clip" gives the sunrise and sunset 12
+    hours from solar noon (polar day) or at solar noon (polar night). No
+    exceptions are raised either way. With status=True return
+    (SunTimes, status) where status is an int8 array of noaa.NORMAL,
+    noaa.POLAR_DAY and noaa.POLAR_NIGHT"""
+    if polar not in ("nan", "clip"):
+        raise ValueError(f"polar must be 'nan' or 'clip', not {polar!r}")
+    persite = np.ndim(latitudes) or np.ndim(longitudes) or np.ndim(timezones)
+    latitudes, longitudes, timezones = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(latitudes, dtype=np.float64)),
+        np.atleast_1d(np.asarray(longitudes, dtype=np.float64)),
+        np.atleast_1d(np.asarray(timezones, dtype=np.float64)),
+    )
+    thedates = _datetime64(thedates)
+    seconds = epochseconds(thedates)
+    unique_timezones, inverse = np.unique(timezones, return_inverse=True)
+    sun_declin_deg_value, eq_of_time_minutes_value = sun_ephemeris(
+        noaa.epoch2julianday(seconds, unique_timezones[:, np.newaxis])
+    )
+    ha_sunrise_cos_value = ha_sunrise_cos(
+        latitudes[:, np.newaxis], sun_declin_deg_value[inverse]
+    )
+    if polar == "clip":
+        ha_sunrise_cos_value = np.clip(ha_sunrise_cos_value, -1, 1)
+    with np.errstate(invalid="ignore"):
+        ha_sunrise_deg_value = np.degrees(np.arccos(ha_sunrise_cos_value))
+    solar_noon_lst_value = solar_noon_lst(
+        longitudes[:, np.newaxis],
+        timezones[:, np.newaxis],
+        eq_of_time_minutes_value[inverse],
+    )
+    result = noaa.SunTimes(
+        dayfraction2datetime64(
+            sunrise_time_lst(ha_sunrise_deg_value, solar_noon_lst_value), thedates
+        ),
+        dayfraction2datetime64(
+            sunset_time_lst(ha_sunrise_deg_value, solar_noon_lst_value), thedates
+        ),
+        dayfraction2datetime64(solar_noon_lst_value, thedates),
+        sunlight_duration_minutes(ha_sunrise_deg_value),
+    )
+    if status:
+        # the status needs the unclipped cosine: clipping to [-1, 1] hides
+        # the |cos| > 1 of the polar days and nights
+        day_status = polar_status(
+            ha_sunrise_cos(latitudes[:, np.newaxis], sun_declin_deg_value[inverse])
+            if polar == "clip"
+            else ha_sunrise_cos_value
+        )
+    if not persite:
+        result = noaa.SunTimes(*(values[0] for values in result))
+        if status:
+            day_status = day_status[0]
+    if status:
+        return result, day_status
+    return result
@@ -0,0 +1,132 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for aio.py"""
+
+import asyncio
+import concurrent.futures
+import datetime
+
+from pysunnoaa import aio, noaa
+
+THEDATES = noaa.datetimerange(
+    datetime.datetime(2024, 6, 21), datetime.datetime(2024, 6, 22), 3
+)
+
+
+class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+    """a thread pool that counts the calls submitted to it"""
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def test_sunposition_async():
+    thedate = datetime.datetime(2010, 6, 21, 9, 54)
+    result = asyncio.run(aio.sunposition_async(40, -105, -6, thedate))
+    assert result == noaa.sunposition(40, -105, -6, thedate)
+
+
+def test_sunpositions_async_inline_and_executor():
+    expected = list(noaa.sunpositions(40, -105, -6, THEDATES))
+    with CountingExecutor() as executor:
+
+        async def main():
+            small = await aio.sunpositions_async(
+                40, -105, -6, list(THEDATES)[:10], executor=executor
+            )
+            big = await aio.sunpositions_async(
+                40, -105, -6, THEDATES, executor=executor
+            )
+            return small, big
+
+        small, big = asyncio.run(main())
+        assert executor.submitted == 1  # only the big one
+    assert small == expected[:10]
+    assert big == expected
+
+
+def test_sunpositions_async_coalesces():
+    with CountingExecutor() as executor:
+
+        async def main():
+            requests = [
+                aio.sunpositions_async(40, -105, -6, THEDATES, executor=executor)
+                for _ in range(5)
+            ]
+            requests.append(
+                aio.sunpositions_async(41, -105, -6, THEDATES, executor=executor)
+            )
+            return await asyncio.gather(*requests)
+
+        results = asyncio.run(main())
+        assert executor.submitted == 2  # one per site
+    assert all(result == results[0] for result in results[:5])
+    assert results[0] is not results[1]  # each caller has its own list
+    assert results[5] != results[0]
+    assert aio._inflight == {}
+
+
+def test_sunpositions_async_cancel_one():
+    with CountingExecutor() as executor:
+
+        async def main():
+            first = asyncio.ensure_future(
+                aio.sunpositions_async(40, -105, -6, THEDATES, executor=executor)
+            )
+            second = asyncio.ensure_future(
+                aio.sunpositions_async(40, -105, -6, THEDATES, executor=executor)
+            )
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        result = asyncio.run(main())
+    assert result == list(noaa.sunpositions(40, -105, -6, THEDATES))
+
+
+def test_asunpositions():
+    expected = list(noaa.sunpositions(40, -105, -6, THEDATES))
+    with CountingExecutor() as executor:
+
+        async def main(thedates, **kwargs):
+            return [
+                position
+                async for position in aio.asunpositions(
+                    40, -105, -6, thedates, executor=executor, **kwargs
+                )
+            ]
+
+        assert asyncio.run(main(THEDATES, chunksize=100)) == expected
+        assert executor.submitted == 5  # 480 times in chunks of 100
+        # an iterator is cut into lists, computed with the scalar code
+        thedates = list(THEDATES)
+        expected_scalar = list(noaa.sunpositions(40, -105, -6, thedates))
+        assert asyncio.run(main(iter(thedates), chunksize=1000)) == expected_scalar
+        assert executor.submitted == 6
+        assert asyncio.run(main(THEDATES[:5])) == expected[:5]  # inline
+        assert executor.submitted == 6
+
+
+def test_asunpositions_stop_early():
+    with CountingExecutor() as executor:
+
+        async def main():
+            positions = aio.asunpositions(
+                40, -105, -6, THEDATES, executor=executor, chunksize=10
+            )
+            async for position in positions:
+                break
+            await positions.aclose()
+            return position
+
+        assert asyncio.run(main()) == noaa.sunposition(40, -105, -6, THEDATES[0])
+        assert executor.submitted == 2  # one chunk ahead, not all 48
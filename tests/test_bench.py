@@ -0,0 +1,79 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for bench.py"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from pysunnoaa import bench
+
+
+def test_bench_parallel():
+    result = bench.bench_parallel(workers=(1, 2), days=1, minutes=60)
+    assert list(result) == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "values, percent, expected",
+    [
+        ([1, 2, 3, 4], 50, 2),  # values, percent, expected
+        ([1, 2, 3, 4], 99, 4),  # values, percent, expected
+        ([1, 2, 3, 4], 0, 1),  # values, percent, expected
+        ([5], 90, 5),  # values, percent, expected
+    ],
+)
+def test_percentile(values, percent, expected):
+    assert bench.percentile(values, percent) == expected
+
+
+def test_measure():
+    calls = []
+    result = bench.measure(lambda: calls.append(1), ops=10, repeat=5)
+    assert result["calls"] == 5
+    assert len(calls) == 5 + 2  # the warm up and the traced call
+    assert result["min_s"] <= result["p50_s"] <= result["p99_s"] <= result["max_s"]
+    assert result["ops_per_sec"] == 10 / result["p50_s"]
+    assert result["peak_memory_bytes"] >= 0
+
+
+def test_main_json(tmp_path, capsys):
+    path = tmp_path / "results.json"
+    names = ["sunposition", "sunposition_cells", "sunpositions_day_1h"]
+    argv = ["--only", *names, "--repeat", "3", "--no-imports", "--json", str(path)]
+    assert bench.main(argv) == 0
+    results = json.loads(path.read_text())
+    assert list(results["benchmarks"]) == names
+    assert results["benchmarks"]["sunpositions_day_1h"]["ops"] == 24
+    assert "sunpositions_day_1h" in capsys.readouterr().out
+
+
+def test_import_time():
+    assert 0 < bench.import_time("pysunnoaa.noaa", repeat=1) < 10
+
+
+def test_import_is_light():
+    """importing noaa or the command line loads no optional backend"""
+    code = (
+        "import sys, pysunnoaa, pysunnoaa.noaa, pysunnoaa.cli;"
+        "print(sorted(name for name in ('numpy', 'concurrent.futures', 'csv',"
+        " 'pysunnoaa.vnoaa', 'pysunnoaa.parallel') if name in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert completed.stdout.strip() == "[]"
+
+
+def test_lazy_submodules():
+    import pysunnoaa
+
+    assert pysunnoaa.lru.LRUCache
+    with pytest.raises(AttributeError):
+        pysunnoaa.nothing
@@ -0,0 +1,179 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for cellgraph.py"""
+
+import datetime
+import inspect
+
+import pytest
+
+from pysunnoaa import cellgraph, noaa
+from tests.test_noaa import almostequal
+
+
+@pytest.mark.parametrize("name", list(cellgraph.CELLS))
+def test_CELLS_match_noaa(name):
+    """every cell exists in noaa and takes as many arguments as listed"""
+    column, argnames = cellgraph.CELLS[name]
+    func = getattr(noaa, name)
+    assert func.__doc__.split()[-1] == column
+    params = [
+        param
+        for param in inspect.signature(func).parameters.values()
+        if param.default is inspect.Parameter.empty
+    ]
+    assert len(params) <= len(argnames) <= len(inspect.signature(func).parameters)
+
+
+@pytest.mark.parametrize(
+    "outputs, expected",
+    [
+        (
+            "juliancentury",
+            ["julianday", "juliancentury"],
+        ),  # outputs, expected
+        (
+            ["q2", "g2"],
+            ["julianday", "juliancentury", "mean_obliq_ecliptic_deg"],
+        ),  # outputs, expected
+        (
+            "sunlight_duration_minutes",
+            [
+                "julianday",
+                "juliancentury",
+                "geom_mean_long_sun_deg",
+                "geom_mean_anom_sun_deg",
+                "sun_eq_of_ctr",
+                "sun_true_long_deg",
+                "sun_app_long_deg",
+                "mean_obliq_ecliptic_deg",
+                "obliq_corr_deg",
+                "sun_declin_deg",
+                "ha_sunrise_deg",
+                "sunlight_duration_minutes",
+            ],
+        ),  # outputs, expected
+    ],
+)
+def test_dependencies(outputs, expected):
+    result = cellgraph.dependencies(outputs)
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "outputs, expected",
+    [
+        ("sun_declin_deg", {"thedate", "timezone"}),  # outputs, expected
+        ("ha_sunrise_deg", {"latitude", "thedate", "timezone"}),  # outputs, expected
+        ("ah2", set(cellgraph.INPUTS)),  # outputs, expected
+    ],
+)
+def test_inputs_needed(outputs, expected):
+    result = cellgraph.inputs_needed(outputs)
+    assert result == expected
+
+
+def test_cellname():
+    assert cellgraph.cellname("t2") == "sun_declin_deg"
+    assert cellgraph.cellname("sun_declin_deg") == "sun_declin_deg"
+    with pytest.raises(KeyError):
+        cellgraph.cellname("zz2")
+
+
+@pytest.mark.parametrize(
+    "outputs, expected",
+    [
+        (
+            ["sun_declin_deg"],
+            {"sun_declin_deg": 23.4383121595139},
+        ),  # outputs, expected
+        (
+            ["solar_elevation_corrected_for_atm_refraction_deg", "ah2"],
+            {
+                "solar_elevation_corrected_for_atm_refraction_deg": -25.2334819743467,
+                "solar_azimuth_angle_deg_cw_from_n": 345.86910228316,
+            },
+        ),  # outputs, expected
+    ],
+)
+def test_evaluate(outputs, expected):
+    result = cellgraph.evaluate(
+        outputs,
+        latitude=40,
+        longitude=-105,
+        timezone=-6,
+        thedate=datetime.datetime(2010, 6, 21, 0, 6),
+    )
+    assert set(result) == set(cellgraph.dependencies(outputs))
+    for name, value in expected.items():
+        assert almostequal(result[name], value)
+
+
+def test_evaluate_missing_input():
+    with pytest.raises(ValueError):
+        cellgraph.evaluate("ha_sunrise_deg", thedate=datetime.datetime(2010, 6, 21))
+
+
+def test_evaluate_vectorized():
+    np = pytest.importorskip("numpy")
+    thedates = [
+        datetime.datetime(2010, 6, 21, 0, 6),
+        datetime.datetime(2010, 6, 21, 14, 6),
+    ]
+    result = cellgraph.evaluate(
+        ["sunrise_time_lst", "ah2"],
+        latitude=40,
+        longitude=-105,
+        timezone=-6,
+        thedate=np.array(thedates, dtype="datetime64[us]"),
+        vectorized=True,
+    )
+    for i, thedate in enumerate(thedates):
+        expected = cellgraph.evaluate(
+            ["sunrise_time_lst", "ah2"],
+            latitude=40,
+            longitude=-105,
+            timezone=-6,
+            thedate=thedate,
+        )
+        for name, value in expected.items():
+            assert almostequal(result[name][i], value)
+
+
+def test_row():
+    thedate = datetime.datetime(2010, 6, 21, 0, 6)
+    result = cellgraph.row(40, -105, -6, thedate)
+    assert result.thedate == thedate
+    assert almostequal(result.julianday, 2455368.75416667)
+    assert almostequal(result.sun_declin_deg, 23.4383121595139)
+    assert almostequal(result.solar_azimuth_angle_deg_cw_from_n, 345.86910228316)
+    assert list(result.asdict()) == list(cellgraph.INPUTS) + list(cellgraph.CELLS)
+    assert result == cellgraph.row(40, -105, -6, thedate)
+    with pytest.raises(AttributeError):
+        result.not_a_cell = 1  # __slots__ has no room for it
+
+
+@pytest.mark.parametrize("structured", [False, True])  # structured
+def test_rows(structured):
+    np = pytest.importorskip("numpy")
+    thedates = list(
+        noaa.datetimerange(
+            datetime.datetime(2023, 9, 21), datetime.datetime(2023, 9, 22), 97
+        )
+    )
+    latitude, longitude, timezone = 37.4219444444444, -122.079583333333, -8
+    result = cellgraph.rows(latitude, longitude, timezone, thedates, structured)
+    if structured:
+        assert result.dtype.names == tuple(cellgraph.CELLS)
+    else:
+        assert list(result) == list(cellgraph.CELLS)
+        assert all(column.flags.c_contiguous for column in result.values())
+    for i, thedate in enumerate(thedates):
+        expected = cellgraph.row(latitude, longitude, timezone, thedate)
+        for name in cellgraph.CELLS:
+            assert almostequal(result[name][i], getattr(expected, name))
+    assert isinstance(result["julianday"], np.ndarray)
@@ -0,0 +1,292 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for cli.py"""
+
+import argparse
+import csv
+import datetime
+import json
+from io import StringIO
+
+import pytest
+
+from pysunnoaa import cli
+from tests.test_noaa import almostequal
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("10", datetime.timedelta(minutes=10)),  # text, expected
+        ("0.5", datetime.timedelta(seconds=30)),  # text, expected
+        ("15s", datetime.timedelta(seconds=15)),  # text, expected
+        ("5m", datetime.timedelta(minutes=5)),  # text, expected
+        ("1h", datetime.timedelta(hours=1)),  # text, expected
+    ],
+)
+def test_parse_step(text, expected):
+    result = cli.parse_step(text)
+    assert result == expected
+
+
+@pytest.mark.parametrize("text", ["", "h", "ten", "0", "-5m"])  # text
+def test_parse_step_invalid(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        cli.parse_step(text)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("40", 40.0),  # text, expected
+        ("-90", -90.0),  # text, expected
+        ("90", 90.0),  # text, expected
+    ],
+)
+def test_parse_latitude(text, expected):
+    assert cli.parse_latitude(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "north", "95", "-90.5", "nan"])  # text
+def test_parse_latitude_invalid(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        cli.parse_latitude(text)
+
+
+def test_writelines():
+    out = StringIO()
+    cli.writelines((f"{i}\n" for i in range(5)), out, buffer_rows=2)
+    assert out.getvalue() == "0\n1\n2\n3\n4\n"
+
+
+POSITIONS_ARGS = [
+    "positions",
+    "--lat",
+    "40",
+    "--lon",
+    "-105",
+    "--tz",
+    "-6",
+    "--start",
+    "2010-06-21T00:06",
+    "--stop",
+    "2010-06-21T00:24",
+    "--step",
+    "6",
+]
+# from the spreadsheet
+EXPECTED_POSITIONS = [
+    ("2010-06-21T00:06:00", -25.2334819743467, 345.86910228316),
+    ("2010-06-21T00:12:00", -25.499566275192, 347.363394492955),
+    ("2010-06-21T00:18:00", -25.7363046548659, 348.866858015593),
+]
+
+
+@pytest.mark.parametrize(
+    "fmt, sep",
+    [("csv", ","), ("tsv", "\t")],  # fmt, sep
+)
+def test_positions_csv(fmt, sep):
+    out = StringIO()
+    assert cli.main(POSITIONS_ARGS + ["--format", fmt], out) == 0
+    lines = out.getvalue().splitlines()
+    assert lines[0] == sep.join(["datetime", "altitude", "azimuth"])
+    assert len(lines) == len(EXPECTED_POSITIONS) + 1
+    for line, (thedate, altitude, azimuth) in zip(lines[1:], EXPECTED_POSITIONS):
+        r_date, r_alt, r_azm = line.split(sep)
+        assert r_date == thedate
+        assert almostequal(float(r_alt), altitude)
+        assert almostequal(float(r_azm), azimuth)
+
+
+def test_positions_jsonl():
+    out = StringIO()
+    cli.main(POSITIONS_ARGS + ["--format", "jsonl", "--no-atm-corr"], out)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [row["datetime"] for row in rows] == [row[0] for row in EXPECTED_POSITIONS]
+    assert almostequal(rows[0]["altitude"], -25.245718494866)
+    assert almostequal(rows[0]["azimuth"], 345.86910228316)
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"--lat": "95"},  # changes
+        {"--start": "2010-06-21T00:06-06:00"},  # changes
+        {"--stop": "2010-06-21T00:24-06:00"},  # changes
+    ],
+)
+def test_positions_bad_arguments(changes):
+    args = list(POSITIONS_ARGS)
+    for name, value in changes.items():
+        args[args.index(name) + 1] = value
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main(args, StringIO())
+    assert excinfo.value.code == 2
+
+
+SITES_CSV = """id,lat,lon,tz
+boulder,40,-105,-6
+mountainview,37.4219444444444,-122.079583333333,-8
+"""
+
+
+BATCH_TIMES = [
+    "--start",
+    "2023-09-21T05:33",
+    "--stop",
+    "2023-09-21T05:35",
+    "--step",
+    "1",
+]
+
+
+@pytest.fixture
+def sitesfile(tmp_path):
+    path = tmp_path / "sites.csv"
+    path.write_text(SITES_CSV)
+    return path
+
+
+def test_readsites(sitesfile):
+    result = cli.readsites(sitesfile)
+    assert result == [
+        ("boulder", 40.0, -105.0, -6.0),
+        ("mountainview", 37.4219444444444, -122.079583333333, -8.0),
+    ]
+
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        "broken,40,-105\n",  # row
+        "boulder,41,-105,-6\n",  # row
+        "denver,95,-105,-6\n",  # row
+    ],
+)
+def test_readsites_bad_row(tmp_path, row):
+    path = tmp_path / "sites.csv"
+    path.write_text(SITES_CSV + row)
+    with pytest.raises(ValueError):
+        cli.readsites(path)
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main(["batch", "--sites", str(path)] + BATCH_TIMES, StringIO())
+    assert excinfo.value.code == 2
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "boulder,40,-105\n",  # text
+        "boulder,forty,-105,-6\n",  # text
+        "id,lat,lon,tz,elevation\n",  # text
+    ],
+)
+def test_readsites_bad_first_row(tmp_path, text):
+    """only a header of four fields is skipped, not a bad first site"""
+    path = tmp_path / "sites.csv"
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        cli.readsites(path)
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main(["batch", "--sites", str(path)] + BATCH_TIMES, StringIO())
+    assert excinfo.value.code == 2
+
+
+@pytest.mark.parametrize(
+    "jobs, batch_rows",
+    [
+        ("1", cli.BATCH_ROWS),  # jobs, batch_rows
+        ("2", cli.BATCH_ROWS),  # jobs, batch_rows
+        ("2", 1),  # jobs, batch_rows
+    ],
+)
+def test_batch_combined(sitesfile, monkeypatch, jobs, batch_rows):
+    monkeypatch.setattr(cli, "BATCH_ROWS", batch_rows)
+    out = StringIO()
+    args = ["batch", "--sites", str(sitesfile), "--jobs", jobs] + BATCH_TIMES
+    assert cli.main(args, out) == 0
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "id,datetime,altitude,azimuth"
+    assert [line.split(",")[:2] for line in lines[1:]] == [
+        ["boulder", "2023-09-21T05:33:00"],
+        ["boulder", "2023-09-21T05:34:00"],
+        ["mountainview", "2023-09-21T05:33:00"],
+        ["mountainview", "2023-09-21T05:34:00"],
+    ]
+    # from the spreadsheet
+    assert almostequal(float(lines[3].split(",")[2]), -5.17796026715717)
+    assert almostequal(float(lines[3].split(",")[3]), 85.1264242410581)
+
+
+@pytest.mark.parametrize(
+    "fmt",
+    [
+        "csv",  # fmt
+        "tsv",  # fmt
+        "jsonl",  # fmt
+    ],
+)
+def test_formatrows_siteid(fmt):
+    """ids with separators, quotes and backslashes are quoted"""
+    siteid = 'a,b\tc "d" \\e'
+    thedates = [datetime.datetime(2023, 9, 21, 5, 33)]
+    lines = list(cli.formatrows(thedates, [(1.5, 2.5)], fmt, siteid=siteid))
+    if fmt == "jsonl":
+        row = json.loads(lines[0])
+        assert row["id"] == siteid
+        assert row["altitude"] == 1.5
+        return
+    dialect = "excel" if fmt == "csv" else "excel-tab"
+    rows = list(csv.reader(lines, dialect=dialect))
+    assert rows == [
+        ["id", "datetime", "altitude", "azimuth"],
+        [siteid, "2023-09-21T05:33:00", "1.5", "2.5"],
+    ]
+
+
+def test_batch_output_dir(sitesfile, tmp_path):
+    output_dir = tmp_path / "out"
+    args = ["batch", "--sites", str(sitesfile), "--output-dir", str(output_dir)]
+    out = StringIO()
+    cli.main(args + BATCH_TIMES + ["--format", "jsonl"], out)
+    assert out.getvalue() == ""
+    assert sorted(path.name for path in output_dir.iterdir()) == [
+        "boulder.jsonl",
+        "mountainview.jsonl",
+    ]
+    lines = (output_dir / "mountainview.jsonl").read_text().splitlines()
+    row = json.loads(lines[0])
+    assert row["datetime"] == "2023-09-21T05:33:00"
+    assert almostequal(row["altitude"], -5.17796026715717)
+
+
+@pytest.mark.parametrize(
+    "siteid",
+    [
+        "../boulder",  # siteid
+        "a/b",  # siteid
+        "a\\b",  # siteid
+        "",  # siteid
+    ],
+)
+def test_batch_output_dir_bad_id(tmp_path, siteid):
+    path = tmp_path / "sites.csv"
+    path.write_text(f"{siteid},40,-105,-6\n")
+    output_dir = tmp_path / "out"
+    args = ["batch", "--sites", str(path), "--output-dir", str(output_dir)]
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main(args + BATCH_TIMES, StringIO())
+    assert excinfo.value.code == 2
+    assert not output_dir.exists()
+
+
+def test_batch_no_sites_file(tmp_path):
+    args = ["batch", "--sites", str(tmp_path / "missing.csv")] + BATCH_TIMES
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main(args, StringIO())
+    assert excinfo.value.code == 2
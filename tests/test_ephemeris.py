@@ -0,0 +1,91 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for ephemeris.py"""
+
+import datetime
+
+import pytest
+
+from pysunnoaa import ephemeris, noaa
+
+
+@pytest.mark.parametrize(
+    "thedate, timezone, expected",
+    [
+        (datetime.datetime(1970, 1, 1), 0, 0),  # thedate, timezone, expected
+        (datetime.datetime(1970, 1, 1), -6, 21600),  # thedate, timezone, expected
+        (
+            datetime.datetime(2024, 6, 21, 10, 30, 15),
+            5.5,
+            1718946015,
+        ),  # thedate, timezone, expected
+    ],
+)
+def test_utcseconds(thedate, timezone, expected):
+    result = ephemeris.utcseconds(thedate, timezone)
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "granularity, expected",
+    [
+        ("instant", 0),  # granularity, expected
+        ("day", 86400),  # granularity, expected
+        (300, 300),  # granularity, expected
+    ],
+)
+def test_Ephemeris_granularity(granularity, expected):
+    result = ephemeris.Ephemeris(granularity).granularity
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "granularity",
+    ["fortnight", -1],  # granularity
+)
+def test_Ephemeris_bad_granularity(granularity):
+    with pytest.raises(ValueError):
+        ephemeris.Ephemeris(granularity)
+
+
+@pytest.mark.parametrize(
+    "granularity, places",
+    [
+        ("instant", None),  # granularity, places
+        ("second", 5),  # granularity, places
+        ("minute", 3),  # granularity, places
+        ("hour", 1),  # granularity, places
+    ],
+)
+def test_Ephemeris_sunpositions(granularity, places):
+    thedates = list(
+        noaa.datetimerange(
+            datetime.datetime(2024, 6, 21, 6),
+            datetime.datetime(2024, 6, 21, 18),
+            minutes=17,
+        )
+    )
+    sites = [(40, -105, -6), (60, 25, 2), (-33.9, 151.2, 10)]
+    eph = ephemeris.Ephemeris(granularity)
+    for latitude, longitude, timezone in sites:
+        expected = noaa.sunpositions(latitude, longitude, timezone, thedates)
+        result = eph.sunpositions(latitude, longitude, timezone, thedates)
+        for (r_alt, r_azm), (e_alt, e_azm) in zip(result, expected):
+            if places is None:
+                assert (r_alt, r_azm) == (e_alt, e_azm)
+            else:
+                assert round(abs(r_alt - e_alt), places) == 0
+                assert round(abs(r_azm - e_azm), places) == 0
+
+
+def test_Ephemeris_shared_between_sites():
+    eph = ephemeris.Ephemeris("minute")
+    thedate = datetime.datetime(2024, 6, 21, 12)
+    eph.sunposition(40, -105, -6, thedate)
+    # the same instant, seen from a site one time zone to the east
+    eph.sunposition(40, -90, -5, thedate + datetime.timedelta(hours=1))
+    assert (eph.cache.hits, eph.cache.misses) == (1, 1)
@@ -0,0 +1,78 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for incidence.py"""
+
+import datetime
+import math
+
+import pytest
+
+from pysunnoaa import noaa
+from tests.test_noaa import almostequal
+
+np = pytest.importorskip("numpy")
+from pysunnoaa import incidence  # noqa: E402
+
+THEDATES = noaa.datetimerange(
+    datetime.datetime(2024, 6, 21), datetime.datetime(2024, 6, 22), 37
+)
+
+
+@pytest.mark.parametrize(
+    "tilt, azimuth, expected",
+    [
+        (0, 123, (0, 0, 1)),  # tilt, azimuth, expected
+        (90, 0, (0, 1, 0)),  # tilt, azimuth, expected
+        (90, 90, (1, 0, 0)),  # tilt, azimuth, expected
+        (90, 270, (-1, 0, 0)),  # tilt, azimuth, expected
+        (180, 0, (0, 0, -1)),  # tilt, azimuth, expected
+    ],
+)
+def test_surface_normals(tilt, azimuth, expected):
+    result = incidence.surface_normals(tilt, azimuth)
+    assert result.shape == (1, 3)
+    for value, expected_value in zip(result[0], expected):
+        assert almostequal(value, expected_value)
+
+
+@pytest.mark.parametrize(
+    "tilts, azimuths",
+    [
+        ([0, 30, 90, 45], [180, 180, 90, 300]),  # tilts, azimuths
+        (20, [0, 90, 180, 270]),  # tilts, azimuths
+    ],
+)
+def test_cos_incidence_site(tilts, azimuths):
+    result = incidence.cos_incidence_site(40, -105, -6, THEDATES, tilts, azimuths)
+    tilts, azimuths = np.broadcast_arrays(tilts, azimuths)
+    assert result.shape == (len(tilts), len(THEDATES))
+    assert result.flags.c_contiguous
+    for row, tilt, azimuth in zip(result, tilts, azimuths):
+        tilt = math.radians(tilt)
+        for value, thedate in zip(row, THEDATES):
+            altitude, sunazm = noaa.sunposition(40, -105, -6, thedate)
+            zenith = math.radians(90 - altitude)
+            across = math.sin(zenith) * math.sin(tilt)
+            expected = math.cos(zenith) * math.cos(tilt) + across * math.cos(
+                math.radians(sunazm - azimuth)
+            )
+            assert almostequal(value, expected)
+
+
+def test_cos_incidence_clip_float32():
+    tilts, azimuths = [0, 90, 90], [0, 90, 270]
+    expected = incidence.cos_incidence_site(40, -105, -6, THEDATES, tilts, azimuths)
+    assert (expected < 0).any()
+    result = incidence.cos_incidence_site(
+        40, -105, -6, THEDATES, tilts, azimuths, clip=True, dtype=np.float32
+    )
+    assert result.dtype == np.float32
+    assert (result >= 0).all()
+    assert np.allclose(result, np.maximum(expected, 0), atol=1e-6)
+    # a flat surface sees the sun by the up component of the sun vectors
+    sunvectors = incidence.vnoaa.sunvector_array(40, -105, -6, THEDATES)
+    assert np.array_equal(expected[0], sunvectors[:, 2])
@@ -0,0 +1,92 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for instrument.py"""
+
+import datetime
+import json
+
+import pytest
+
+from pysunnoaa import instrument, noaa
+
+THEDATE = datetime.datetime(2010, 6, 21, 9, 54)
+
+
+def test_Profile_counts():
+    sunposition = noaa.sunposition
+    expected = noaa.sunposition(40, -105, -6, THEDATE)
+    with instrument.Profile() as prof:
+        assert noaa.sunposition(40, -105, -6, THEDATE) == expected
+        noaa.sunrise(40, -105, -6, THEDATE)
+        noaa.sunset(40, -105, -6, THEDATE)
+    assert noaa.sunposition is sunposition  # put back
+    result = prof.asdict()
+    assert result["noaa.sunposition"]["calls"] == 1
+    assert result["noaa.sunrise"]["calls"] == 1
+    assert result["noaa.sunset"]["calls"] == 1
+    assert result["noaa.julianday"]["calls"] == 3
+    assert result["noaa.approx_atmospheric_refraction_deg"]["calls"] == 1
+    assert "noaa.sunpositions" not in result  # not called
+    assert all(stats["seconds"] >= 0 for stats in result.values())
+    assert list(result)[0] in ("noaa.sunposition", "noaa.sunrise", "noaa.sunset")
+
+
+def test_Profile_fused():
+    with instrument.Profile(cells=False) as prof:
+        noaa.sunposition(40, -105, -6, THEDATE)
+    assert list(prof.asdict()) == ["noaa.sunposition"]
+
+
+def test_Profile_generator():
+    thedates = list(noaa.datetimerange(THEDATE, THEDATE + datetime.timedelta(hours=1)))
+    with instrument.Profile(cells=False) as prof:
+        positions = noaa.sunpositions(40, -105, -6, thedates)
+        assert next(positions) == noaa.sunposition(40, -105, -6, THEDATE)
+        assert len(list(positions)) == 59
+    result = prof.asdict()
+    assert result["noaa.sunpositions"]["calls"] == 1
+    assert result["noaa.sunposition"]["calls"] == 61
+    assert result["noaa.sunpositions"]["seconds"] >= (
+        result["noaa.sunposition"]["seconds"] * 59 / 61
+    )
+
+
+def test_Profile_nested():
+    with instrument.Profile():
+        with pytest.raises(RuntimeError):
+            with instrument.Profile():
+                pass
+    with instrument.Profile():
+        pass
+
+
+def test_Profile_exports(tmp_path):
+    with instrument.Profile(trace=True) as prof:
+        noaa.sunrise(40, -105, -6, THEDATE)
+    path = tmp_path / "profile.json"
+    prof.write_json(path)
+    assert json.loads(path.read_text()) == prof.asdict()
+    path = tmp_path / "trace.json"
+    prof.write_chrome_trace(path)
+    events = json.loads(path.read_text())["traceEvents"]
+    assert {event["name"] for event in events} == set(prof.asdict())
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+    assert "noaa.sunrise" in prof.report()
+    with pytest.raises(ValueError):
+        instrument.Profile().chrome_trace()
+
+
+def test_Profile_vnoaa():
+    np = pytest.importorskip("numpy")
+    from pysunnoaa import vnoaa
+
+    thedates = np.arange("2024-06-21", "2024-06-22", dtype="datetime64[h]")
+    with instrument.Profile() as prof:
+        vnoaa.sunposition_array(40, -105, -6, thedates)
+    result = prof.asdict()
+    assert result["vnoaa.sunposition_array"]["calls"] == 1
+    assert result["vnoaa.solar_zenith_angle_deg"]["calls"] == 1
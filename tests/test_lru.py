@@ -0,0 +1,42 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for lru.py"""
+
+import pytest
+
+from pysunnoaa.lru import LRUCache
+
+
+def test_LRUCache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert "a" in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+
+def test_LRUCache_counters():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("x", "default") == "default"
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+@pytest.mark.parametrize(
+    "maxsize",
+    [0, -1],  # maxsize
+)
+def test_LRUCache_bad_maxsize(maxsize):
+    with pytest.raises(ValueError):
+        LRUCache(maxsize)
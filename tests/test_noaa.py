@@ -8,6 +8,7 @@
 
 import pytest
 import datetime
+import math
 import csv
 from io import StringIO
 from pysunnoaa import noaa
@@ -145,6 +146,51 @@ def test_julianday(dt, timezone, expected):
     assert almostequal(result, expected)
 
 
+@pytest.mark.parametrize(
+    "dt, expected",
+    [
+        (datetime.datetime(1970, 1, 1), 0),  # dt, expected
+        (datetime.datetime(1969, 12, 31, 23), -3600),  # dt, expected
+        (
+            datetime.datetime(2024, 6, 21, 10, 30, 15, 500000),
+            1718965815.5,
+        ),  # dt, expected
+    ],
+)
+def test_datetime2epochseconds(dt, expected):
+    result = noaa.datetime2epochseconds(dt)
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "seconds, timezone, expected",
+    [
+        (0, 0, 2440587.5),  # seconds, timezone, expected
+        (1277078760, -6, 2455368.75416667),  # seconds, timezone, expected
+        (1695274380, -8, 2460209.06458333),  # seconds, timezone, expected
+    ],
+)
+def test_epoch2julianday(seconds, timezone, expected):
+    result = noaa.epoch2julianday(seconds, timezone)
+    assert almostequal(result, expected)
+
+
+@pytest.mark.parametrize(
+    "dt, timezone",
+    [
+        (datetime.datetime(2010, 6, 21, 0, 6), -6),  # dt, timezone
+        (datetime.datetime(1900, 3, 1, 23, 59, 59, 999999), 5.5),  # dt, timezone
+        (datetime.datetime(2099, 12, 31, 12), 0),  # dt, timezone
+    ],
+)
+def test_julianday_matches_julian(dt, timezone):
+    """julianday gives the same result as the julian package it replaced"""
+    julian = pytest.importorskip("julian")
+    expected = julian.to_jd(dt - datetime.timedelta(hours=timezone))
+    result = noaa.julianday(dt, timezone)
+    assert abs(result - expected) < 1e-9
+
+
 @pytest.mark.parametrize(
     "jul_day, expected",
     [
@@ -692,6 +738,130 @@ def test_datetimerange(start, stop, minutes_step, expected):
     assert list(result) == expected
 
 
+@pytest.mark.parametrize(
+    "start, stop, minutes, seconds, expected",
+    [
+        (
+            datetime.datetime(2024, 2, 3, 1),
+            datetime.datetime(2024, 2, 3, 1, 2),
+            0,
+            30,
+            [
+                datetime.datetime(2024, 2, 3, 1, 0, 0),
+                datetime.datetime(2024, 2, 3, 1, 0, 30),
+                datetime.datetime(2024, 2, 3, 1, 1, 0),
+                datetime.datetime(2024, 2, 3, 1, 1, 30),
+            ],
+        ),  # start, stop, minutes, seconds, expected
+        (
+            datetime.datetime(2024, 2, 3, 1),
+            datetime.datetime(2024, 2, 3, 1, 0, 1),
+            0,
+            0.25,
+            [
+                datetime.datetime(2024, 2, 3, 1, 0, 0),
+                datetime.datetime(2024, 2, 3, 1, 0, 0, 250000),
+                datetime.datetime(2024, 2, 3, 1, 0, 0, 500000),
+                datetime.datetime(2024, 2, 3, 1, 0, 0, 750000),
+            ],
+        ),  # start, stop, minutes, seconds, expected
+        (
+            datetime.datetime(2024, 2, 3, 2),
+            datetime.datetime(2024, 2, 3, 1),
+            -25,
+            0,
+            [
+                datetime.datetime(2024, 2, 3, 2),
+                datetime.datetime(2024, 2, 3, 1, 35),
+                datetime.datetime(2024, 2, 3, 1, 10),
+            ],
+        ),  # start, stop, minutes, seconds, expected
+        (
+            datetime.datetime(2024, 2, 3, 2),
+            datetime.datetime(2024, 2, 3, 1),
+            25,
+            0,
+            [],
+        ),  # start, stop, minutes, seconds, expected
+    ],
+)
+def test_DateTimeRange(start, stop, minutes, seconds, expected):
+    result = noaa.datetimerange(start, stop, minutes, seconds)
+    assert len(result) == len(expected)
+    assert list(result) == expected
+    assert list(result) == expected  # it can be used again
+    assert [result[i] for i in range(len(result))] == expected
+    assert [result[i] for i in range(-len(result), 0)] == expected
+    assert list(result[1:]) == expected[1:]
+    assert list(result[::-2]) == expected[::-2]
+
+
+def test_DateTimeRange_errors():
+    thedates = noaa.datetimerange(
+        datetime.datetime(2024, 2, 3, 1), datetime.datetime(2024, 2, 3, 3), 60
+    )
+    with pytest.raises(IndexError):
+        thedates[2]
+    with pytest.raises(ValueError):
+        noaa.datetimerange(thedates.start, thedates.stop, 0)
+
+
+def test_DateTimeRange_hash():
+    start = datetime.datetime(2024, 2, 3, 1)
+    thedates = noaa.datetimerange(start, datetime.datetime(2024, 2, 3, 3), 60)
+    same = noaa.datetimerange(start, datetime.datetime(2024, 2, 3, 2, 1), 60)
+    assert thedates == same and hash(thedates) == hash(same)
+    assert thedates[:1] == same[:1] and hash(thedates[:1]) == hash(same[:1])
+    assert hash(thedates[2:]) == hash(same[:0])
+    cache = {thedates: "cached"}
+    assert cache[same] == "cached"
+    assert noaa.datetimerange(start, datetime.datetime(2024, 2, 3, 3), 30) not in cache
+
+
+def test_DateTimeRange_to_numpy():
+    np = pytest.importorskip("numpy")
+    thedates = noaa.datetimerange(
+        datetime.datetime(1970, 1, 1), datetime.datetime(1970, 1, 1, 0, 1), 0, 15
+    )
+    result = thedates.to_numpy()
+    assert result.dtype == np.dtype("datetime64[us]")
+    assert result.tolist() == list(thedates)
+    assert thedates.to_numpy(epoch=True).tolist() == [0.0, 15.0, 30.0, 45.0]
+    assert thedates[2:].to_numpy(epoch=True).tolist() == [30.0, 45.0]
+    # an aware range is in local wall-clock time, like the datetimes
+    aware = noaa.datetimerange(
+        datetime.datetime(
+            1970, 1, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=-6))
+        ),
+        datetime.datetime(
+            1970, 1, 1, 0, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=-6))
+        ),
+        0,
+        15,
+    )
+    assert aware.to_numpy(epoch=True).tolist() == [0.0, 15.0, 30.0, 45.0]
+
+
+@pytest.mark.parametrize(
+    "jul_day, expected",
+    [
+        (
+            2455368.75416667,
+            (23.4383121595139, -1.70630784072322),
+        ),  # jul_day, expected
+        (
+            2460209.06458333,
+            (0.66936449061751, 6.83497572573191),
+        ),  # jul_day, expected
+    ],
+)
+def test_sun_ephemeris(jul_day, expected):
+    result_declin, result_eqtime = noaa.sun_ephemeris(jul_day)
+    expected_declin, expected_eqtime = expected
+    assert almostequal(result_declin, expected_declin)
+    assert almostequal(result_eqtime, expected_eqtime)
+
+
 @pytest.mark.parametrize(
     "latitude, longitude, timezone, thedate, atm_corr, expected",
     [
@@ -738,6 +908,57 @@ def test_sunposition(latitude, longitude, timezone, thedate, atm_corr, expected)
     assert almostequal(result_azm, expected_azm)
 
 
+@pytest.mark.parametrize(
+    "latitude, longitude, timezone, atm_corr",
+    [
+        (40, -105, -6, True),  # latitude, longitude, timezone, atm_corr
+        (40, -105, -6, False),  # latitude, longitude, timezone, atm_corr
+        (-33.9, 151.2, 10, True),  # latitude, longitude, timezone, atm_corr
+        (69.6, 18.9, 5.5, False),  # latitude, longitude, timezone, atm_corr
+    ],
+)
+def test_sunvector(latitude, longitude, timezone, atm_corr):
+    """the vector points at the altitude and azimuth of sunposition"""
+    thedates = noaa.datetimerange(
+        datetime.datetime(2024, 6, 21), datetime.datetime(2024, 6, 22), 37
+    )
+    for thedate in thedates:
+        east, north, up = noaa.sunvector(
+            latitude, longitude, timezone, thedate, atm_corr
+        )
+        altitude, azimuth = noaa.sunposition(
+            latitude, longitude, timezone, thedate, atm_corr
+        )
+        assert almostequal(east * east + north * north + up * up, 1)
+        assert almostequal(math.degrees(math.asin(up)), altitude)
+        difference = abs(math.degrees(math.atan2(east, north)) % 360 - azimuth)
+        assert almostequal(min(difference, 360 - difference), 0, places=6)
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, timezone, atm_corr",
+    [
+        (40, -105, -6, True),  # latitude, longitude, timezone, atm_corr
+        (40, -105, -6, False),  # latitude, longitude, timezone, atm_corr
+        (-33.9, 151.2, 10, True),  # latitude, longitude, timezone, atm_corr
+        (69.6, 18.9, 5.5, True),  # latitude, longitude, timezone, atm_corr
+    ],
+)
+def test_sunposition_same_as_sunposition_cells(
+    latitude, longitude, timezone, atm_corr
+):
+    """the fused sunposition gives exactly the results of the cells"""
+    thedates = noaa.datetimerange(
+        datetime.datetime(2024, 3, 1), datetime.datetime(2024, 3, 3), 7
+    )
+    for thedate in thedates:
+        result = noaa.sunposition(latitude, longitude, timezone, thedate, atm_corr)
+        expected = noaa.sunposition_cells(
+            latitude, longitude, timezone, thedate, atm_corr
+        )
+        assert result == expected
+
+
 @pytest.mark.parametrize(
     "latitude, longitude, timezone, thedates, atm_corr, expected",
     [
@@ -2875,6 +3096,21 @@ def test_sunpositions(latitude, longitude, timezone, thedates, atm_corr, expecte
         assert almostequal(r2, e2)
 
 
+def test_sunpositions_vectorized():
+    """a long DateTimeRange takes the vnoaa path and gives the same results"""
+    pytest.importorskip("numpy")
+    thedates = noaa.datetimerange(
+        datetime.datetime(2024, 6, 21), datetime.datetime(2024, 6, 22), 0, 90
+    )
+    assert len(thedates) >= noaa.VECTORIZE_MIN
+    result = list(noaa.sunpositions(40, -105, -6, thedates))
+    expected = [noaa.sunposition(40, -105, -6, thedate) for thedate in thedates]
+    assert len(result) == len(expected)
+    for (r1, r2), (e1, e2) in zip(result, expected):
+        assert almostequal(r1, e1)
+        assert almostequal(r2, e2)
+
+
 @pytest.mark.parametrize(
     "latitude, longitude, timezone, thedate, expected",
     [
@@ -2914,3 +3150,106 @@ def test_sunrise(latitude, longitude, timezone, thedate, expected):
 def test_sunset(latitude, longitude, timezone, thedate, expected):
     result = noaa.sunset(latitude, longitude, timezone, thedate)
     assert result == expected
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, timezone, thedate, expected",
+    [
+        (
+            40,
+            -105,
+            -6,
+            datetime.datetime(2010, 6, 21),
+            (
+                datetime.datetime(2010, 6, 21, 5, 31, 15, 842680),
+                datetime.datetime(2010, 6, 21, 20, 32, 8, 805539),
+                datetime.datetime(2010, 6, 21, 13, 1, 42, 324110),
+                900.8827143269305,
+            ),
+        ),  # latitude, longitude, timezone, thedate, expected
+    ],
+)
+def test_sun_times(latitude, longitude, timezone, thedate, expected):
+    result = noaa.sun_times(latitude, longitude, timezone, thedate)
+    assert result.sunrise == noaa.sunrise(latitude, longitude, timezone, thedate)
+    assert result.sunset == noaa.sunset(latitude, longitude, timezone, thedate)
+    assert result[:3] == expected[:3]
+    assert almostequal(result.sunlight_duration_minutes, expected[3])
+
+
+@pytest.mark.parametrize(
+    "latitude, thedate, expected_status",
+    [
+        (40, datetime.datetime(2010, 6, 21), noaa.NORMAL),
+        (80, datetime.datetime(2024, 6, 21), noaa.POLAR_DAY),
+        (80, datetime.datetime(2024, 12, 21), noaa.POLAR_NIGHT),
+        (-80, datetime.datetime(2024, 6, 21), noaa.POLAR_NIGHT),
+    ],  # latitude, thedate, expected_status
+)
+def test_sun_times_polar(latitude, thedate, expected_status):
+    if expected_status != noaa.NORMAL:
+        with pytest.raises(ValueError):
+            noaa.sun_times(latitude, 0, 0, thedate)
+    result, status = noaa.sun_times(latitude, 0, 0, thedate, polar="nan", status=True)
+    assert status == expected_status
+    if status == noaa.NORMAL:
+        assert result == noaa.sun_times(latitude, 0, 0, thedate)
+    else:
+        assert result.sunrise is None and result.sunset is None
+        assert math.isnan(result.sunlight_duration_minutes)
+    result = noaa.sun_times(latitude, 0, 0, thedate, polar="clip")
+    if status == noaa.POLAR_DAY:
+        assert result.sunlight_duration_minutes == 1440
+    elif status == noaa.POLAR_NIGHT:
+        assert result.sunlight_duration_minutes == 0
+        assert result.sunrise == result.sunset == result.solar_noon
+
+
+def test_sun_times_polar_mode():
+    with pytest.raises(ValueError):
+        noaa.sun_times(40, -105, -6, datetime.datetime(2010, 6, 21), polar="skip")
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, timezone, minutes",
+    [
+        (40, -105, -6, 37),  # latitude, longitude, timezone, minutes
+        (65, -150, -8, 41),  # latitude, longitude, timezone, minutes
+        (-78, 166, 12, 43),  # latitude, longitude, timezone, minutes
+    ],
+)
+def test_daylightpositions(latitude, longitude, timezone, minutes):
+    thedates = list(
+        noaa.datetimerange(
+            datetime.datetime(2024, 1, 1), datetime.datetime(2025, 1, 1), minutes
+        )
+    )
+    expected = list(noaa.sunpositions(latitude, longitude, timezone, thedates))
+    result = list(noaa.daylightpositions(latitude, longitude, timezone, thedates))
+    assert len(result) == len(expected)
+    assert any(position is None for position in result)
+    for position, (altitude, azimuth) in zip(result, expected):
+        if position is None:
+            assert altitude < -0.3  # the sun is below the horizon
+        else:
+            assert position == (altitude, azimuth)  # bit for bit
+    skipped = list(
+        noaa.daylightpositions(latitude, longitude, timezone, thedates, skip=True)
+    )
+    assert skipped == [
+        (thedate, position)
+        for thedate, position in zip(thedates, result)
+        if position is not None
+    ]
+
+
+def test_daylightpositions_night():
+    start = datetime.datetime(2024, 6, 21)
+    thedates = list(noaa.datetimerange(start, start + datetime.timedelta(days=1)))
+    margin = datetime.timedelta(0)
+    result = list(
+        noaa.daylightpositions(40, -105, -6, thedates, margin=margin, night=0)
+    )
+    sunrise = noaa.sunrise(40, -105, -6, datetime.datetime(2024, 6, 21))
+    assert result[: sunrise.hour * 60].count(0) == sunrise.hour * 60
+    assert result[12 * 60] != 0
@@ -0,0 +1,75 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for parallel.py"""
+
+import concurrent.futures
+import datetime
+
+import pytest
+
+from pysunnoaa import noaa, parallel
+
+START = datetime.datetime(2024, 6, 21)
+STOP = datetime.datetime(2024, 6, 21, 6)
+
+
+@pytest.mark.parametrize(
+    "iterable, chunksize, expected",
+    [
+        (range(7), 3, [[0, 1, 2], [3, 4, 5], [6]]),  # iterable, chunksize, expected
+        (iter(range(4)), 2, [[0, 1], [2, 3]]),  # iterable, chunksize, expected
+        ([], 2, []),  # iterable, chunksize, expected
+    ],
+)
+def test_chunks(iterable, chunksize, expected):
+    result = list(parallel.chunks(iterable, chunksize))
+    assert result == expected
+
+
+def test_chunks_DateTimeRange():
+    thedates = noaa.datetimerange(START, STOP, 60)
+    result = list(parallel.chunks(thedates, 4))
+    assert all(isinstance(chunk, noaa.DateTimeRange) for chunk in result)
+    assert [len(chunk) for chunk in result] == [4, 2]
+    assert [thedate for chunk in result for thedate in chunk] == list(thedates)
+
+
+def _square(x):
+    return x * x
+
+
+def test_ordered_map():
+    with concurrent.futures.ProcessPoolExecutor(2) as executor:
+        result = list(
+            parallel.ordered_map(
+                _square, ((i,) for i in range(20)), max_inflight=3, executor=executor
+            )
+        )
+    assert result == [i * i for i in range(20)]
+
+
+@pytest.mark.parametrize(
+    "thedates",
+    [
+        noaa.datetimerange(START, STOP, 7),  # thedates
+        list(noaa.datetimerange(START, STOP, 7)),  # thedates
+    ],
+)
+def test_sunpositions(thedates):
+    expected = list(noaa.sunpositions(40, -105, -6, thedates))
+    result = list(noaa.sunpositions(40, -105, -6, thedates, workers=2))
+    assert result == expected
+    result = list(parallel.sunpositions(40, -105, -6, thedates, workers=2, chunksize=5))
+    assert result == expected
+
+
+def test_sitepositions():
+    sites = [(40, -105, -6), (-33.9, 151.2, 10), (60, 25, 2)]
+    thedates = noaa.datetimerange(START, STOP, 30)
+    result = list(parallel.sitepositions(sites, thedates, workers=2))
+    expected = [list(noaa.sunpositions(*site, thedates)) for site in sites]
+    assert result == expected
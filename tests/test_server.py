@@ -0,0 +1,281 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for server.py and loadgen.py"""
+
+import concurrent.futures
+import datetime
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from pysunnoaa import loadgen, noaa, server
+
+
+@pytest.fixture
+def service():
+    service = server.SunService()
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def running(service):
+    """a server on a free localhost port, in a thread"""
+    httpd = server.make_server(("127.0.0.1", 0), service)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(connection, path):
+    connection.request("GET", path)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_Batcher():
+    calls = []
+
+    def func(items):
+        calls.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = server.Batcher(func, window=0.2)
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(batcher.submit, range(8)))
+    batcher.close()
+    assert results == [item * 2 for item in range(8)]
+    assert sum(calls) == 8
+    assert batcher.batches == len(calls) < 8
+
+
+def test_Batcher_error():
+    def func(items):
+        raise ZeroDivisionError
+
+    batcher = server.Batcher(func)
+    with pytest.raises(ZeroDivisionError):
+        batcher.submit(1)
+    batcher.close()
+
+
+def test_Batcher_item_error():
+    """a bad item in a batch fails only its own request"""
+    thedate = datetime.datetime(2024, 6, 21, 12)
+    bad = (-90, 0, 0, thedate, True)  # math domain error in noaa
+    good = (40, -105, -6, thedate, True)
+    batcher = server.Batcher(server.sunposition_batch, window=0.2)
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        badresult = executor.submit(batcher.submit, bad)
+        goodresult = executor.submit(batcher.submit, good)
+        assert goodresult.result() == noaa.sunposition(*good)
+        with pytest.raises(ValueError):
+            badresult.result()
+    batcher.close()
+    assert batcher.batches == 1
+
+
+@pytest.mark.parametrize(
+    "count",
+    [
+        3,  # count
+        200,  # count
+    ],
+)
+def test_sunposition_batch(count):
+    thedate = datetime.datetime(2024, 6, 21)
+    items = [
+        (40, -105, -6, thedate + datetime.timedelta(minutes=7 * i), i % 3 > 0)
+        for i in range(count)
+    ]
+    items.append(items[0])
+    results = server.sunposition_batch(items)
+    assert len(results) == len(items)
+    assert results[-1] == results[0]
+    for item, (altitude, azimuth) in zip(items, results):
+        expected_alt, expected_azm = noaa.sunposition(*item)
+        assert altitude == pytest.approx(expected_alt, abs=1e-9)
+        assert azimuth == pytest.approx(expected_azm, abs=1e-9)
+
+
+@pytest.mark.parametrize(
+    "count",
+    [
+        1,  # count
+        noaa.VECTORIZE_MIN,  # count
+    ],
+)
+def test_sunposition_batch_domain(count):
+    """a bad item gets the same answer in a batch of any size"""
+    thedate = datetime.datetime(2024, 6, 21, 12)
+    bad = (-90, 0, 0, thedate, True)  # math domain error in noaa
+    items = [
+        (40, -105, -6, thedate + datetime.timedelta(minutes=i), True)
+        for i in range(count)
+    ]
+    items.insert(count // 2, bad)
+    results = server.sunposition_batch(items)
+    assert isinstance(results.pop(count // 2), ValueError)
+    del items[count // 2]
+    for item, (altitude, azimuth) in zip(items, results):
+        expected_alt, expected_azm = noaa.sunposition(*item)
+        assert altitude == pytest.approx(expected_alt, abs=1e-9)
+        assert azimuth == pytest.approx(expected_azm, abs=1e-9)
+
+
+def test_sunposition_batch_error(monkeypatch):
+    """when vnoaa fails, the items are computed one at a time"""
+    vnoaa = pytest.importorskip("pysunnoaa.vnoaa")
+
+    def sunposition_array(*args):
+        raise ValueError
+
+    monkeypatch.setattr(vnoaa, "sunposition_array", sunposition_array)
+    thedate = datetime.datetime(2024, 6, 21, 12)
+    items = [
+        (40, -105, -6, thedate + datetime.timedelta(minutes=i), True)
+        for i in range(noaa.VECTORIZE_MIN)
+    ]
+    items.append((-90, 0, 0, thedate, True))  # math domain error in noaa
+    results = server.sunposition_batch(items)
+    assert isinstance(results.pop(), ValueError)
+    assert results == [noaa.sunposition(*item) for item in items[:-1]]
+
+
+@pytest.mark.parametrize(
+    "path, status, expected",
+    [
+        (
+            "/sunposition?lat=40&lon=-105&tz=-6&date=2010-06-21T09:54",
+            200,
+            noaa.sunposition(40, -105, -6, datetime.datetime(2010, 6, 21, 9, 54)),
+        ),  # path, status, expected
+        (
+            "/sunposition?lat=40&lon=-105&tz=-6&date=2010-06-21T09:54&atm_corr=0",
+            200,
+            noaa.sunposition(
+                40, -105, -6, datetime.datetime(2010, 6, 21, 9, 54), atm_corr=False
+            ),
+        ),  # path, status, expected
+        ("/sunposition?lat=40&lon=-105&date=2010-06-21", 400, None),
+        ("/sunposition?lat=91&lon=-105&tz=-6&date=2010-06-21", 400, None),
+        ("/sunposition?lat=-90&lon=0&tz=0&date=2024-06-21T12:00", 500, None),
+        ("/sunposition?lat=40&lon=-105&tz=nan&date=2010-06-21", 400, None),
+        ("/sunposition?lat=40&lon=-105&tz=-6&date=June", 400, None),
+        ("/sunposition?lat=40&lon=-105&tz=-6&date=2010-06-21&atm_corr=2", 400, None),
+        ("/sunpositions?lat=40&lon=-105&tz=-6&start=2010-06-21&step=0", 400, None),
+        ("/moonposition?lat=40", 404, None),
+    ],
+)
+def test_SunService_handle(service, path, status, expected):
+    path, _, query = path.partition("?")
+    result_status, body = service.handle(path, query)
+    assert result_status == status
+    result = json.loads(body)
+    if expected is None:
+        assert "error" in result
+    else:
+        assert (result["altitude"], result["azimuth"]) == expected
+
+
+def test_SunService_cache(service):
+    query = "lat=40&lon=-105&tz=-6&date=2010-06-21T09:54"
+    first = service.handle("/sunposition", query)
+    assert service.handle("/sunposition", query) == first
+    assert service.handle("/sunposition", query) == first
+    assert service.cache.hits == 2
+    assert service.batcher.batches == 1
+
+
+@pytest.mark.parametrize(
+    "stop, cached",
+    [
+        ("2010-06-22", True),  # stop, cached
+        ("2010-06-22T00:01", False),  # stop, cached
+    ],
+)
+def test_SunService_seriescache(service, stop, cached):
+    """the long sunpositions answers are not kept"""
+    query = f"lat=40&lon=-105&tz=-6&start=2010-06-21&stop={stop}&step=1"
+    first = service.handle("/sunpositions", query)
+    assert service.handle("/sunpositions", query) == first
+    assert len(service.seriescache) == int(cached)
+    assert service.seriescache.hits == int(cached)
+    assert len(service.cache) == 0
+
+
+def test_server(running):
+    connection = http.client.HTTPConnection("127.0.0.1", running.server_port)
+    status, result = get(
+        connection,
+        "/sunpositions?lat=40&lon=-105&tz=-6"
+        "&start=2024-06-21&stop=2024-06-22&step=10m",
+    )
+    assert status == 200
+    thedates = noaa.DateTimeRange(
+        datetime.datetime(2024, 6, 21),
+        datetime.datetime(2024, 6, 22),
+        datetime.timedelta(minutes=10),
+    )
+    expected = list(noaa.sunpositions(40, -105, -6, thedates))
+    assert list(zip(result["altitude"], result["azimuth"])) == expected
+    # the same connection is kept for the next requests
+    thedate = datetime.datetime(2024, 6, 21)
+    status, result = get(connection, "/sunrise?lat=40&lon=-105&tz=-6&date=2024-06-21")
+    assert status == 200
+    assert result == {
+        "sunrise": noaa.sunrise(40, -105, -6, thedate).isoformat(),
+        "status": "normal",
+    }
+    status, result = get(connection, "/sunset?lat=80&lon=0&tz=0&date=2024-06-21")
+    assert result == {"sunset": None, "status": "polar day"}
+    status, result = get(connection, "/sunset?lat=40")
+    assert status == 400
+    connection.close()
+
+
+def test_server_unix(tmp_path, service):
+    if not hasattr(socket, "AF_UNIX"):
+        pytest.skip("no Unix sockets")
+    path = str(tmp_path / "sun.sock")
+    httpd = server.make_server(path, service)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        connection = server.UnixHTTPConnection(path)
+        status, result = get(
+            connection, "/sunposition?lat=40&lon=-105&tz=-6&date=2010-06-21T09:54"
+        )
+        connection.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    assert status == 200
+    assert (result["altitude"], result["azimuth"]) == noaa.sunposition(
+        40, -105, -6, datetime.datetime(2010, 6, 21, 9, 54)
+    )
+
+
+def test_loadgen(running):
+    paths = loadgen.make_paths("sunposition", 20)
+    assert len(set(paths)) == 20
+    results = loadgen.run(
+        lambda: http.client.HTTPConnection("127.0.0.1", running.server_port),
+        paths,
+        requests=50,
+        concurrency=4,
+    )
+    assert results["requests"] == 50
+    assert results["errors"] == 0
+    assert results["min"] <= results["p50"] <= results["p99"] <= results["max"]
+    assert running.service.batcher.batches <= 20
+    assert "requests/s" in loadgen.format_results(results)
@@ -0,0 +1,76 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for stepper.py"""
+
+import datetime
+
+import pytest
+
+from pysunnoaa import noaa, stepper
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, timezone, start, stop, step, refresh, atm_corr, places",
+    [
+        (
+            40,
+            -105,
+            -6,
+            datetime.datetime(2024, 6, 21, 5),
+            datetime.datetime(2024, 6, 21, 6),
+            datetime.timedelta(seconds=1),
+            60,
+            False,
+            3,
+        ),  # latitude, longitude, timezone, start, stop, step, refresh, atm_corr, places
+        (
+            60,
+            25,
+            2,
+            datetime.datetime(2024, 3, 20),
+            datetime.datetime(2024, 3, 21),
+            datetime.timedelta(minutes=7),
+            1,
+            True,
+            7,
+        ),  # latitude, longitude, timezone, start, stop, step, refresh, atm_corr, places
+        (
+            -34,
+            151,
+            10,
+            datetime.datetime(2024, 12, 22),
+            datetime.datetime(2024, 12, 21),
+            datetime.timedelta(minutes=-1),
+            30,
+            True,
+            1,
+        ),  # latitude, longitude, timezone, start, stop, step, refresh, atm_corr, places
+    ],
+)
+def test_sunpositions(
+    latitude, longitude, timezone, start, stop, step, refresh, atm_corr, places
+):
+    thedates = noaa.DateTimeRange(start, stop, step)
+    result = list(
+        stepper.sunpositions(latitude, longitude, timezone, thedates, atm_corr, refresh)
+    )
+    assert len(result) == len(thedates)
+    for thedate, (altitude, azimuth) in zip(thedates, result):
+        expected_alt, expected_azm = noaa.sunposition(
+            latitude, longitude, timezone, thedate, atm_corr
+        )
+        assert round(altitude - expected_alt, places) == 0
+        difference = abs(azimuth - expected_azm)
+        assert round(min(difference, 360 - difference), places) == 0
+
+
+def test_sunpositions_bad_refresh():
+    thedates = noaa.datetimerange(
+        datetime.datetime(2024, 6, 21), datetime.datetime(2024, 6, 22)
+    )
+    with pytest.raises(ValueError):
+        list(stepper.sunpositions(40, -105, -6, thedates, refresh=0))
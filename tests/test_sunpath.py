@@ -0,0 +1,101 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for sunpath.py"""
+
+import datetime
+
+import pytest
+
+from pysunnoaa import noaa
+from tests.test_noaa import almostequal
+
+np = pytest.importorskip("numpy")
+from pysunnoaa import sunpath  # noqa: E402
+
+
+def assert_positions(altitude, azimuth, expected, places=7):
+    expected_alt, expected_azm = expected
+    assert almostequal(altitude, expected_alt, places)
+    difference = abs(azimuth - expected_azm)
+    assert almostequal(min(difference, 360 - difference), 0, places)
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, timezone, atm_corr",
+    [
+        (40, -105, -6, True),  # latitude, longitude, timezone, atm_corr
+        (-33.9, 151.2, 10, False),  # latitude, longitude, timezone, atm_corr
+        (69.6, 18.9, 5.5, True),  # latitude, longitude, timezone, atm_corr
+    ],
+)
+def test_analemmas(latitude, longitude, timezone, atm_corr):
+    hours = [0, 9.5, 12, 17]
+    altitudes, azimuths = sunpath.analemmas(
+        latitude, longitude, timezone, 2023, hours, atm_corr
+    )
+    assert altitudes.shape == azimuths.shape == (4, 365)
+    for row, hour in enumerate(hours):
+        for day in range(0, 365, 17):
+            thedate = datetime.datetime(2023, 1, 1) + datetime.timedelta(
+                days=day, hours=hour
+            )
+            assert_positions(
+                altitudes[row, day],
+                azimuths[row, day],
+                noaa.sunposition(latitude, longitude, timezone, thedate, atm_corr),
+            )
+
+
+def test_day_arcs():
+    dates = sunpath.key_dates(2024)
+    altitudes, azimuths = sunpath.day_arcs(
+        40, -105, -6, dates, step=datetime.timedelta(minutes=30)
+    )
+    assert altitudes.shape == (4, 49)
+    for row, date in enumerate(dates):
+        start = datetime.datetime.combine(date, datetime.time())
+        for column in range(49):
+            thedate = start + datetime.timedelta(minutes=30 * column)
+            assert_positions(
+                altitudes[row, column],
+                azimuths[row, column],
+                noaa.sunposition(40, -105, -6, thedate),
+            )
+
+
+def test_horizon_and_sites():
+    latitudes, longitudes, timezones = [40, -33.9, 40], [-105, 151.2, 0], [-6, 10, 0]
+    altitudes, azimuths = sunpath.analemmas(
+        latitudes, longitudes, timezones, 2024, dtype=np.float32
+    )
+    assert altitudes.shape == (3, 24, 366)
+    assert altitudes.dtype == np.float32 and altitudes.flags.c_contiguous
+    for site in range(3):
+        one_alt, one_azm = sunpath.analemmas(
+            latitudes[site], longitudes[site], timezones[site], 2024
+        )
+        assert np.allclose(altitudes[site], one_alt, atol=1e-4)
+    cut_alt, cut_azm = sunpath.analemmas(
+        latitudes, longitudes, timezones, 2024, dtype=np.float32, horizon=0
+    )
+    below = altitudes < 0
+    assert below.any() and (~below).any()
+    assert np.isnan(cut_alt[below]).all() and np.isnan(cut_azm[below]).all()
+    assert np.array_equal(cut_alt[~below], altitudes[~below])
+
+
+def test_sunpath():
+    result = sunpath.sunpath(40, -105, -6, 2024, hours=[10, 14])
+    assert result.days.shape == (366,)
+    assert result.analemma_altitudes.shape == (2, 366)
+    assert list(result.dates) == [
+        np.datetime64(date) for date in sunpath.key_dates(2024)
+    ]
+    assert result.arc_times.shape == (145,)
+    assert result.arc_altitudes.shape == (4, 145)
+    assert np.nanmin(result.arc_altitudes) >= 0  # cut at the horizon
+    assert np.isnan(result.arc_altitudes[:, 0]).all()  # midnight
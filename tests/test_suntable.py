@@ -0,0 +1,96 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for suntable.py"""
+
+import datetime
+
+import pytest
+
+from pysunnoaa import noaa
+
+np = pytest.importorskip("numpy")
+from pysunnoaa import suntable, vnoaa  # noqa: E402
+
+START = datetime.datetime(2024, 6, 21)
+STOP = datetime.datetime(2024, 6, 22)
+STEP = datetime.timedelta(minutes=7)
+
+
+@pytest.mark.parametrize(
+    "dtype, atm_corr, chunksize",
+    [
+        (np.float64, True, 50),  # dtype, atm_corr, chunksize
+        (np.float32, False, 1 << 16),  # dtype, atm_corr, chunksize
+    ],
+)
+def test_write(tmp_path, dtype, atm_corr, chunksize):
+    path = tmp_path / "site.sun"
+    table = suntable.write(
+        path, 40, -105, -6, START, STOP, STEP, dtype, atm_corr, chunksize
+    )
+    assert path.stat().st_size == suntable.HEADER.size + 2 * len(table) * (
+        np.dtype(dtype).itemsize
+    )
+    table = suntable.SunTable(path)
+    assert (table.latitude, table.longitude, table.timezone) == (40, -105, -6)
+    assert (table.start, table.step, table.atm_corr) == (START, STEP, atm_corr)
+    assert table.thedates == noaa.DateTimeRange(START, STOP, STEP)
+    assert table.altitude.dtype == dtype
+    expected_alt, expected_azm = vnoaa.sunposition_array(
+        40, -105, -6, table.thedates.to_numpy(), atm_corr
+    )
+    assert (table.altitude == expected_alt.astype(dtype)).all()
+    assert (table.azimuth == expected_azm.astype(dtype)).all()
+
+
+def test_SunTable_lookup(tmp_path):
+    table = suntable.write(tmp_path / "site.sun", 40, -105, -6, START, STOP, STEP)
+    thedate = datetime.datetime(2024, 6, 21, 9, 48)
+    assert table.index(thedate) == 84
+    assert table.index(thedate + datetime.timedelta(minutes=6)) == 84
+    assert table.sunposition(thedate) == (
+        float(table.altitude[84]),
+        float(table.azimuth[84]),
+    )
+    thedates = np.array([START, thedate], dtype="datetime64[us]")
+    assert table.indices(thedates).tolist() == [0, 84]
+    altitudes, azimuths = table.sunpositions(thedates)
+    assert altitudes.tolist() == [table.altitude[0], table.altitude[84]]
+    with pytest.raises(IndexError):
+        table.index(table.thedates.stop)
+    with pytest.raises(IndexError):
+        table.indices([START - STEP])
+
+
+def test_SunTable_aware(tmp_path):
+    """aware datetimes are looked up by their local wall-clock time"""
+    table = suntable.write(tmp_path / "site.sun", 40, -105, -6, START, STOP, STEP)
+    tzinfo = datetime.timezone(datetime.timedelta(hours=-6))
+    thedate = datetime.datetime(2024, 6, 21, 9, 48, tzinfo=tzinfo)
+    assert table.index(thedate) == 84
+    assert table.indices([START.replace(tzinfo=tzinfo), thedate]).tolist() == [0, 84]
+    altitudes, _ = table.between(thedate, thedate + STEP)
+    assert altitudes.tolist() == [table.altitude[84]]
+
+
+def test_SunTable_between(tmp_path):
+    table = suntable.write(tmp_path / "site.sun", 40, -105, -6, START, STOP, STEP)
+    altitudes, azimuths = table.between(
+        datetime.datetime(2024, 6, 21, 0, 1), datetime.datetime(2024, 6, 21, 0, 21)
+    )
+    assert altitudes.tolist() == table.altitude[1:3].tolist()
+    assert np.shares_memory(azimuths, table.azimuth)
+    assert len(table.between(START - STEP * 10, START)[0]) == 0
+
+
+def test_SunTable_bad_file(tmp_path):
+    path = tmp_path / "not.sun"
+    path.write_bytes(b"something else" * 10)
+    with pytest.raises(ValueError):
+        suntable.SunTable(path)
+    with pytest.raises(ValueError):
+        suntable.write(path, 40, -105, -6, START, STOP, STEP, dtype=np.int32)
@@ -0,0 +1,102 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for suntimes.py"""
+
+import datetime
+import math
+import threading
+
+import pytest
+
+from pysunnoaa import noaa, suntimes
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, timezone, thedate",
+    [
+        (40, -105, -6, datetime.datetime(2010, 6, 21)),
+        (37.4219444444444, -122.079583333333, -8, datetime.date(2023, 9, 21)),
+        (-34, 151, 10, datetime.datetime(2024, 12, 21)),
+    ],  # latitude, longitude, timezone, thedate
+)
+def test_SunTimesCache_matches_noaa(latitude, longitude, timezone, thedate):
+    cache = suntimes.SunTimesCache()
+    result = cache.sun_times(latitude, longitude, timezone, thedate)
+    midnight = datetime.datetime(thedate.year, thedate.month, thedate.day)
+    expected = noaa.sun_times(latitude, longitude, timezone, midnight)
+    tolerance = datetime.timedelta(seconds=0.1)
+    assert abs(result.sunrise - expected.sunrise) < tolerance
+    assert abs(result.sunset - expected.sunset) < tolerance
+    assert abs(result.solar_noon - expected.solar_noon) < tolerance
+    assert cache.sunrise(latitude, longitude, timezone, thedate) == result.sunrise
+    assert cache.sunset(latitude, longitude, timezone, thedate) == result.sunset
+    assert cache.solar_noon(latitude, longitude, timezone, thedate) == (
+        result.solar_noon
+    )
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_SunTimesCache_key():
+    cache = suntimes.SunTimesCache(maxsize=2, digits=2)
+    cache.sunrise(40.001, -105.001, -6, datetime.datetime(2010, 6, 21, 9, 54))
+    # same rounded site and calendar date
+    cache.sunrise(40.0, -105.0, -6, datetime.datetime(2010, 6, 21, 17))
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.sunrise(40, -105, -6, datetime.datetime(2010, 6, 22))
+    cache.sunrise(40, -105, -7, datetime.datetime(2010, 6, 22))
+    assert len(cache.cache) == 2
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache.cache)) == (0, 0, 0)
+
+
+def test_SunTimesCache_polar():
+    cache = suntimes.SunTimesCache()
+    thedate = datetime.datetime(2024, 6, 21)
+    with pytest.raises(ValueError):
+        cache.sunrise(80, 0, 0, thedate)
+    result, status = cache.sun_times(80, 0, 0, thedate, polar="nan", status=True)
+    assert status == noaa.POLAR_DAY
+    assert result.sunrise is None and math.isnan(result.sunlight_duration_minutes)
+    result = cache.sun_times(80, 0, 0, thedate, polar="clip")
+    assert result.sunlight_duration_minutes == 1440
+    assert cache.misses == 1
+
+
+def test_bypass_cache():
+    thedate = datetime.datetime(2010, 6, 21, 9, 54)
+    suntimes.default.clear()
+    result = suntimes.sunrise(40, -105, -6, thedate, cache=False)
+    assert result == noaa.sunrise(40, -105, -6, thedate)
+    assert suntimes.sunset(40, -105, -6, thedate, cache=False) == noaa.sunset(
+        40, -105, -6, thedate
+    )
+    assert (suntimes.default.hits, suntimes.default.misses) == (0, 0)
+    suntimes.sunrise(40, -105, -6, thedate)
+    suntimes.solar_noon(40, -105, -6, thedate)
+    assert (suntimes.default.hits, suntimes.default.misses) == (1, 1)
+
+
+def test_SunTimesCache_threads():
+    cache = suntimes.SunTimesCache(maxsize=8)
+    thedates = [datetime.date(2024, 1, day) for day in range(1, 21)]
+    expected = [cache.sunrise(40, -105, -6, thedate) for thedate in thedates]
+    errors = []
+
+    def work():
+        for _ in range(20):
+            for thedate, sunrise in zip(thedates, expected):
+                if cache.sunrise(40, -105, -6, thedate) != sunrise:
+                    errors.append(thedate)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(cache.cache) == 8
+    assert cache.hits + cache.misses == 20 + 4 * 20 * 20
@@ -0,0 +1,370 @@
+# Copyright (c) 2024 Santosh Philip
+# =======================================================================
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# =======================================================================
+"""pytests for vnoaa.py"""
+
+import datetime
+
+import pytest
+
+from pysunnoaa import noaa
+from tests.test_noaa import almostequal
+
+np = pytest.importorskip("numpy")
+from pysunnoaa import vnoaa  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "thedates, expected",
+    [
+        (
+            [datetime.datetime(1970, 1, 2, 0, 0, 1)],
+            [86401.0],
+        ),  # thedates, expected
+        (
+            np.array(["1970-01-01T00:01:00.5"], dtype="datetime64[ms]"),
+            [60.5],
+        ),  # thedates, expected
+        ([10, 20.5], [10.0, 20.5]),  # thedates, expected
+        (
+            [
+                datetime.datetime(
+                    1970,
+                    1,
+                    2,
+                    0,
+                    0,
+                    1,
+                    tzinfo=datetime.timezone(datetime.timedelta(hours=-6)),
+                )
+            ],
+            [86401.0],
+        ),  # thedates, expected
+    ],
+)
+def test_epochseconds(thedates, expected):
+    result = vnoaa.epochseconds(thedates)
+    assert result.tolist() == expected
+
+
+def test_sunpositions_aware():
+    """aware datetimes give the same positions, however many there are"""
+    tzinfo = datetime.timezone(datetime.timedelta(hours=-6))
+    thedates = noaa.datetimerange(
+        datetime.datetime(2024, 6, 21, tzinfo=tzinfo),
+        datetime.datetime(2024, 6, 22, tzinfo=tzinfo),
+        10,
+    )
+    assert len(thedates) >= noaa.VECTORIZE_MIN
+    expected = [noaa.sunposition(40, -105, -6, thedate) for thedate in thedates]
+    naive = [thedate.replace(tzinfo=None) for thedate in thedates]
+    assert expected == [noaa.sunposition(40, -105, -6, thedate) for thedate in naive]
+    for dates in (thedates, list(thedates)):
+        altitudes, azimuths = vnoaa.sunposition_array(40, -105, -6, dates)
+        for altitude, azimuth, (expected_alt, expected_azm) in zip(
+            altitudes, azimuths, expected
+        ):
+            assert almostequal(altitude, expected_alt)
+            assert almostequal(azimuth, expected_azm)
+
+
+@pytest.mark.parametrize(
+    "dt, timezone, expected",
+    [
+        (
+            datetime.datetime(2010, 6, 21, 0, 6),
+            -6,
+            2455368.75416667,
+        ),  # dt, timezone, expected
+        (
+            datetime.datetime(2023, 9, 21, 5, 33),
+            -8,
+            2460209.06458333,
+        ),  # dt, timezone, expected
+    ],
+)
+def test_julianday(dt, timezone, expected):
+    result = vnoaa.julianday([dt], timezone)
+    assert almostequal(result[0], expected)
+
+
+@pytest.mark.parametrize(
+    "ae2",
+    [
+        [86.0, 45.0, 5.5, 2.0, 0.0, -0.5, -3.0, -45.0],  # ae2
+    ],
+)
+def test_approx_atmospheric_refraction_deg(ae2):
+    result = vnoaa.approx_atmospheric_refraction_deg(np.array(ae2))
+    for value, res in zip(ae2, result):
+        assert almostequal(res, noaa.approx_atmospheric_refraction_deg(value))
+
+
+@pytest.mark.parametrize(
+    "ab2",
+    [
+        [-8.0, 0.0, 100.0, 720.0, 1439.0],  # ab2
+    ],
+)
+def test_hour_angle_deg(ab2):
+    result = vnoaa.hour_angle_deg(np.array(ab2))
+    for value, res in zip(ab2, result):
+        assert res == noaa.hour_angle_deg(value)
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, timezone, thedate, atm_corr, expected",
+    [
+        (
+            40,
+            -105,
+            -6,
+            datetime.datetime(2010, 6, 21, 0, 6),
+            True,
+            (-25.2334819743467, 345.86910228316),
+        ),  # latitude, longitude, timezone, thedate, atm_corr, expected
+        (
+            37.4219444444444,
+            -122.079583333333,
+            -8,
+            datetime.datetime(2023, 9, 21, 5, 33),
+            True,
+            (-5.17796026715717, 85.1264242410581),
+        ),  # latitude, longitude, timezone, thedate, atm_corr, expected
+        (
+            40,
+            -105,
+            -6,
+            datetime.datetime(2010, 6, 21, 0, 6),
+            False,
+            (-25.245718494866, 345.86910228316),
+        ),  # latitude, longitude, timezone, thedate, atm_corr, expected
+        (
+            37.4219444444444,
+            -122.079583333333,
+            -8,
+            datetime.datetime(2023, 9, 21, 5, 33),
+            False,
+            (-5.24086479367834, 85.1264242410581),
+        ),  # latitude, longitude, timezone, thedate, atm_corr, expected
+    ],
+)
+def test_sunposition_array(latitude, longitude, timezone, thedate, atm_corr, expected):
+    result_alt, result_azm = vnoaa.sunposition_array(
+        latitude, longitude, timezone, [thedate], atm_corr
+    )
+    expected_alt, expected_azm = expected
+    assert almostequal(result_alt[0], expected_alt)
+    assert almostequal(result_azm[0], expected_azm)
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, timezone, start, stop, minutes, atm_corr",
+    [
+        (
+            40,
+            -105,
+            -6,
+            datetime.datetime(2010, 6, 21),
+            datetime.datetime(2010, 6, 22),
+            7,
+            True,
+        ),  # latitude, longitude, timezone, start, stop, minutes, atm_corr
+        (
+            -33.9,
+            151.2,
+            10,
+            datetime.datetime(2024, 12, 21),
+            datetime.datetime(2024, 12, 22),
+            13,
+            False,
+        ),  # latitude, longitude, timezone, start, stop, minutes, atm_corr
+    ],
+)
+def test_sunposition_array_matches_sunpositions(
+    latitude, longitude, timezone, start, stop, minutes, atm_corr
+):
+    thedates = list(noaa.datetimerange(start, stop, minutes))
+    result_alt, result_azm = vnoaa.sunposition_array(
+        latitude, longitude, timezone, thedates, atm_corr
+    )
+    expected = noaa.sunpositions(latitude, longitude, timezone, thedates, atm_corr)
+    for r_alt, r_azm, (e_alt, e_azm) in zip(result_alt, result_azm, expected):
+        assert almostequal(r_alt, e_alt)
+        assert almostequal(r_azm, e_azm)
+
+
+@pytest.mark.parametrize(
+    "latitudes, longitudes, timezones, dtype, chunksize",
+    [
+        (
+            [40, 37.4219444444444, -33.9, 60],
+            [-105, -122.079583333333, 151.2, 25],
+            [-6, -8, 10, -6],
+            np.float64,
+            None,
+        ),  # latitudes, longitudes, timezones, dtype, chunksize
+        (
+            [40, 37.4219444444444, -33.9],
+            [-105, -122.079583333333, 151.2],
+            -6,
+            np.float32,
+            1,
+        ),  # latitudes, longitudes, timezones, dtype, chunksize
+    ],
+)
+def test_sunposition_grid(latitudes, longitudes, timezones, dtype, chunksize):
+    thedates = np.arange(
+        "2024-03-20T00:00", "2024-03-21T00:00", 37, dtype="datetime64[m]"
+    )
+    result_alt, result_azm = vnoaa.sunposition_grid(
+        latitudes, longitudes, timezones, thedates, dtype=dtype, chunksize=chunksize
+    )
+    assert result_alt.shape == (len(latitudes), len(thedates))
+    assert result_alt.dtype == dtype and result_azm.dtype == dtype
+    assert result_alt.flags.c_contiguous and result_azm.flags.c_contiguous
+    timezones = np.broadcast_to(timezones, len(latitudes))
+    places = 7 if dtype == np.float64 else 3
+    for i, (latitude, longitude, timezone) in enumerate(
+        zip(latitudes, longitudes, timezones)
+    ):
+        expected_alt, expected_azm = vnoaa.sunposition_array(
+            latitude, longitude, timezone, thedates
+        )
+        for r_alt, r_azm, e_alt, e_azm in zip(
+            result_alt[i], result_azm[i], expected_alt, expected_azm
+        ):
+            assert almostequal(r_alt, e_alt, places)
+            assert almostequal(r_azm, e_azm, places)
+
+
+@pytest.mark.parametrize(
+    "atm_corr, dtype",
+    [
+        (True, np.float64),  # atm_corr, dtype
+        (False, np.float64),  # atm_corr, dtype
+        (True, np.float32),  # atm_corr, dtype
+    ],
+)
+def test_sunvector_array(atm_corr, dtype):
+    thedates = noaa.datetimerange(
+        datetime.datetime(2024, 6, 21), datetime.datetime(2024, 6, 22), 7
+    )
+    result = vnoaa.sunvector_array(40, -105, -6, thedates, atm_corr, dtype=dtype)
+    assert result.shape == (len(thedates), 3)
+    assert result.dtype == dtype
+    assert result.flags.c_contiguous
+    places = 7 if dtype == np.float64 else 5
+    for vector, thedate in zip(result, thedates):
+        expected = noaa.sunvector(40, -105, -6, thedate, atm_corr)
+        for value, expected_value in zip(vector.tolist(), expected):
+            assert almostequal(value, expected_value, places)
+
+
+@pytest.mark.parametrize(
+    "thedates",
+    [
+        [
+            datetime.datetime(2010, 6, 21),
+            datetime.datetime(2023, 9, 21),
+        ],  # thedates
+        [
+            datetime.datetime(
+                2024, 6, 21, 23, tzinfo=datetime.timezone(datetime.timedelta(hours=-6))
+            ),
+            datetime.datetime(2023, 9, 21, 1, tzinfo=datetime.timezone.utc),
+        ],  # thedates
+    ],
+)
+def test_sun_times_one_site(thedates):
+    result = vnoaa.sun_times(40, -105, -6, thedates)
+    assert result.sunrise.shape == (2,)
+    for i, thedate in enumerate(thedates):
+        expected = noaa.sun_times(40, -105, -6, thedate)
+        for name in ("sunrise", "sunset", "solar_noon"):
+            difference = getattr(result, name)[i] - np.datetime64(
+                getattr(expected, name)
+            )
+            assert abs(difference) <= np.timedelta64(1, "us")
+        assert almostequal(
+            result.sunlight_duration_minutes[i], expected.sunlight_duration_minutes
+        )
+
+
+def test_sun_times_sites():
+    sites = [(40, -105, -6), (37.4219444444444, -122.079583333333, -8), (-34, 151, 10)]
+    latitudes, longitudes, timezones = zip(*sites)
+    thedates = noaa.datetimerange(
+        datetime.datetime(2024, 1, 1), datetime.datetime(2024, 12, 31), 60 * 24 * 30
+    )
+    result = vnoaa.sun_times(latitudes, longitudes, timezones, thedates)
+    assert result.sunset.shape == (len(sites), len(thedates))
+    for i, site in enumerate(sites):
+        for j, thedate in enumerate(thedates):
+            expected = noaa.sunrise(*site, thedate)
+            difference = result.sunrise[i, j] - np.datetime64(expected)
+            assert abs(difference) <= np.timedelta64(1, "us")
+
+
+def test_sun_times_polar():
+    result = vnoaa.sun_times(
+        [80, 80], 0, 0, [datetime.datetime(2024, 6, 21), datetime.datetime(2024, 3, 1)]
+    )
+    assert np.isnat(result.sunrise[:, 0]).all()
+    assert np.isnan(result.sunlight_duration_minutes[:, 0]).all()
+    assert not np.isnat(result.sunrise[:, 1]).any()
+
+
+def test_sun_times_polar_status():
+    latitudes = [40, 80, 80, -80]
+    thedates = [datetime.datetime(2024, 6, 21), datetime.datetime(2024, 12, 21)]
+    result, status = vnoaa.sun_times(latitudes, 0, 0, thedates, status=True)
+    assert status.dtype == np.int8
+    for i, latitude in enumerate(latitudes):
+        for j, thedate in enumerate(thedates):
+            expected, expected_status = noaa.sun_times(
+                latitude, 0, 0, thedate, polar="nan", status=True
+            )
+            assert status[i, j] == expected_status
+            assert np.isnat(result.sunrise[i, j]) == (expected.sunrise is None)
+    result = vnoaa.sun_times(latitudes, 0, 0, thedates, polar="clip")
+    assert result.sunlight_duration_minutes[1].tolist() == [1440, 0]
+    assert result.sunlight_duration_minutes[3].tolist() == [0, 1440]
+
+
+def test_daylightpositions_vectorized():
+    thedates = noaa.datetimerange(
+        datetime.datetime(2024, 1, 1), datetime.datetime(2024, 3, 1), 13
+    )
+    for latitude, longitude, timezone in [(40, -105, -6), (-78, 166, 12)]:
+        expected = list(noaa.sunpositions(latitude, longitude, timezone, thedates))
+        result = list(noaa.daylightpositions(latitude, longitude, timezone, thedates))
+        for position, (altitude, azimuth) in zip(result, expected):
+            if position is None:
+                assert altitude < -0.3
+            else:
+                assert position == (altitude, azimuth)
+        skipped = noaa.daylightpositions(
+            latitude, longitude, timezone, thedates, skip=True
+        )
+        assert [thedate for thedate, _ in skipped] == [
+            thedate
+            for thedate, position in zip(thedates, result)
+            if position is not None
+        ]
+
+
+def test_daylight_mask():
+    thedates = np.arange("2024-06-21", "2024-06-22", dtype="datetime64[m]")
+    mask = vnoaa.daylight_mask(40, -105, -6, thedates, margin_seconds=0)
+    times = noaa.sun_times(40, -105, -6, datetime.datetime(2024, 6, 21))
+    sunrise = np.datetime64(times.sunrise)
+    sunset = np.datetime64(times.sunset)
+    # the window covers the sunrises of both midnights, a few seconds apart
+    slack = np.timedelta64(2, "m")
+    assert mask[(thedates > sunrise + slack) & (thedates < sunset - slack)].all()
+    assert not mask[(thedates < sunrise - slack) | (thedates > sunset + slack)].any()
+    assert vnoaa.daylight_mask(40, -105, -6, thedates[:0]).shape == (0,)